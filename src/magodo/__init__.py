@@ -1,19 +1,81 @@
-"""A Python library for working with the todo.txt format."""
+"""A Python library for working with the todo.txt format.
 
-import logging as _logging
+NOTE: This package's submodules (and their third-party dependencies) are only
+  imported once one of the names they provide is first accessed (see PEP 562),
+  which keeps `import magodo` cheap for short-lived processes (e.g. shell
+  prompts).
+"""
 
-from . import dates, tags, types
-from ._common import DEFAULT_PRIORITY, PUNCTUATION
-from ._magic import MagicTodoMixin
-from ._todo import Todo
+from __future__ import annotations
+
+from importlib import import_module as _import_module
+
+
+# HACK: We avoid importing the (slow to import) typing module at runtime.
+# Type checkers treat any variable named TYPE_CHECKING specially.
+TYPE_CHECKING = False
+if TYPE_CHECKING:  # pragma: no cover
+    from typing import Any, Dict, List
+
+    from . import (
+        archive,
+        bulk,
+        clock,
+        daemon,
+        dates,
+        lint,
+        records,
+        scan,
+        schema,
+        tags,
+        types,
+    )
+    from ._common import DEFAULT_PRIORITY, PUNCTUATION
+    from ._graph import TodoGraph
+    from ._index import DateIndex
+    from ._journal import TodoJournal
+    from ._lazy import LazyTodo
+    from ._magic import MagicTodoMixin
+    from ._packed import PackedTodo, PackedTodos
+    from ._persistent import PersistentTodos, TodoDiff
+    from ._queue import NextActions
+    from ._search import SearchIndex
+    from ._stats import StatsSnapshot, TodoStats
+    from ._store import TodoSnapshot, TodoStore
+    from ._todo import Todo
+    from ._workspace import SourcedTodo, Workspace
 
 
 __all__ = [
     "DEFAULT_PRIORITY",
+    "DateIndex",
+    "LazyTodo",
     "MagicTodoMixin",
+    "NextActions",
     "PUNCTUATION",
+    "PackedTodo",
+    "PackedTodos",
+    "PersistentTodos",
+    "SearchIndex",
+    "SourcedTodo",
+    "StatsSnapshot",
     "Todo",
+    "TodoDiff",
+    "TodoGraph",
+    "TodoJournal",
+    "TodoSnapshot",
+    "TodoStats",
+    "TodoStore",
+    "Workspace",
+    "archive",
+    "bulk",
+    "clock",
+    "daemon",
     "dates",
+    "lint",
+    "records",
+    "scan",
+    "schema",
     "tags",
     "types",
 ]
@@ -22,4 +84,74 @@ __author__ = "Bryan M Bugyi"
 __email__ = "bryanbugyi34@gmail.com"
 __version__ = "1.1.1"
 
-_logging.getLogger(__name__).addHandler(_logging.NullHandler())
+# Maps each lazily loaded name to the (relative) name of the module that
+# provides it. Submodules map to themselves.
+_LAZY_NAMES: Dict[str, str] = {
+    "DEFAULT_PRIORITY": "._common",
+    "DateIndex": "._index",
+    "LazyTodo": "._lazy",
+    "MagicTodoMixin": "._magic",
+    "NextActions": "._queue",
+    "PUNCTUATION": "._common",
+    "PackedTodo": "._packed",
+    "PackedTodos": "._packed",
+    "PersistentTodos": "._persistent",
+    "SearchIndex": "._search",
+    "SourcedTodo": "._workspace",
+    "StatsSnapshot": "._stats",
+    "Todo": "._todo",
+    "TodoDiff": "._persistent",
+    "TodoGraph": "._graph",
+    "TodoJournal": "._journal",
+    "TodoSnapshot": "._store",
+    "TodoStats": "._stats",
+    "TodoStore": "._store",
+    "Workspace": "._workspace",
+    "archive": ".archive",
+    "bulk": ".bulk",
+    "clock": ".clock",
+    "daemon": ".daemon",
+    "dates": ".dates",
+    "lint": ".lint",
+    "records": ".records",
+    "scan": ".scan",
+    "schema": ".schema",
+    "tags": ".tags",
+    "types": ".types",
+}
+_null_handler_added = False
+
+
+def __getattr__(name: str) -> Any:
+    """Imports the submodule that provides `name` on first access."""
+    module_name = _LAZY_NAMES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    _add_null_handler()
+
+    module = _import_module(module_name, __name__)
+    value = module if module_name == f".{name}" else getattr(module, name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    """Includes lazily loaded names in `dir(magodo)`."""
+    return sorted(set(globals()) | set(__all__))
+
+
+def _add_null_handler() -> None:
+    """Adds a NullHandler to this library's logger (but only once).
+
+    We defer this until some real work is done since the logging module is
+    one of the most expensive imports in the standard library.
+    """
+    global _null_handler_added  # pylint: disable=global-statement
+    if _null_handler_added:
+        return
+
+    import logging  # pylint: disable=import-outside-toplevel
+
+    logging.getLogger(__name__).addHandler(logging.NullHandler())
+    _null_handler_added = True
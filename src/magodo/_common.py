@@ -2,10 +2,59 @@
 
 from __future__ import annotations
 
-from typing import Final
+from contextlib import contextmanager, suppress
+import os
+from pathlib import Path
+from typing import TYPE_CHECKING, Final, Iterator, TextIO
 
-from .types import Priority
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .types import PathLike, Priority, TodoProto
 
 
 DEFAULT_PRIORITY: Final[Priority] = "O"
 PUNCTUATION: Final = ",.?!;"
+
+
+@contextmanager
+def atomic_open(path: PathLike) -> Iterator[TextIO]:
+    """Opens a temporary file that replaces `path` once we are done with it.
+
+    The temporary file lives in the same directory as `path` and is fsync'ed
+    before being renamed over `path`, so readers only ever see either the old
+    file or the complete new one. If the body of the `with` statement raises,
+    the temporary file is removed and `path` is left untouched.
+    """
+    # These modules are imported here since they are slow to import and
+    # most users of this module never write a file.
+    import shutil
+    import tempfile
+
+    path = Path(path)
+    fd, tmp_name = tempfile.mkstemp(
+        dir=path.parent, prefix=f".{path.name}.", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, "w") as tmp_file:
+            yield tmp_file
+            tmp_file.flush()
+            os.fsync(tmp_file.fileno())
+
+        if path.exists():
+            shutil.copymode(path, tmp_name)
+        os.replace(tmp_name, path)
+    except BaseException:
+        with suppress(FileNotFoundError):
+            os.unlink(tmp_name)
+        raise
+
+
+def to_source_line(todo: TodoProto) -> str:
+    """Converts `todo` to a line, reusing its source line if it has one.
+
+    Todo classes that do not keep track of their source lines (i.e. that do
+    not define a `to_source_line()` method) are converted using `to_line()`.
+    """
+    method = getattr(todo, "to_source_line", None)
+    line: str = todo.to_line() if method is None else method()
+    return line
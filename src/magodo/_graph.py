@@ -0,0 +1,350 @@
+"""Contains the TodoGraph class definition."""
+
+from __future__ import annotations
+
+import heapq
+from typing import Dict, Final, Generic, Iterable, List, Optional, Set
+
+from .types import T
+
+
+ID_KEY: Final = "id"
+PARENT_KEY: Final = "p"
+DEPENDS_KEY: Final = "dep"
+
+
+class TodoGraph(Generic[T]):
+    """A dependency graph over todos that are linked using metadata.
+
+    Todos are named using 'id' metadata (e.g. 'id:3') and linked using the
+    following metadata tags:
+
+      - 'dep:<id>[,<id>...]': This todo depends on the named todos.
+      - 'p:<id>': This todo is a subtask of the named todo, which depends on
+        all of its subtasks.
+
+    An open todo is blocked while any of the todos it depends on are still
+    open. Only direct dependencies count: once a todo is done, it no longer
+    blocks its dependents (even if some of its own dependencies are still
+    open). The number of open todos that block each todo is cached and only
+    the counts of the todos that are linked to a changed todo are adjusted
+    when a todo is added, updated (e.g. completed), or removed. References
+    to ids that no todo uses are ignored.
+    """
+
+    def __init__(self, todos: Iterable[T] = ()) -> None:
+        self._todos: Dict[str, T] = {}
+        # Maps 'id' metadata values to todo idents.
+        self._idents_by_id: Dict[str, str] = {}
+        # Maps 'id' metadata values to the idents of the todos that refer to
+        # them using 'dep' metadata (or 'p' metadata, for `_children`).
+        self._dependents: Dict[str, Set[str]] = {}
+        self._children: Dict[str, Set[str]] = {}
+        # Maps the idents of blocked open todos to their open blocker counts.
+        self._blocked: Dict[str, int] = {}
+
+        for todo in todos:
+            self._link(todo)
+
+        for ident in self._todos:
+            self._refresh(ident)
+
+    def __contains__(self, ident: object) -> bool:  # noqa: D105
+        return ident in self._todos
+
+    def __len__(self) -> int:  # noqa: D105
+        return len(self._todos)
+
+    def add(self, todo: T) -> List[T]:
+        """Adds `todo` to this graph.
+
+        Returns:
+            The open todos that were unblocked by this change (see
+            `update()`).
+
+        Raises:
+            ValueError: If another todo already uses `todo`'s 'id'.
+        """
+        if todo.ident in self._todos:
+            return self.update(todo.ident, todo)
+
+        self._link(todo)
+        return self._refresh_all(self._affected(todo) | {todo.ident})
+
+    def update(self, ident: str, todo: T) -> List[T]:
+        """Replaces the todo identified by `ident` with `todo`.
+
+        Completing a todo only requires the blocked counts of the todos that
+        depend on it to be adjusted.
+
+        Returns:
+            The open todos that were blocked before this change, but are not
+            blocked anymore (e.g. because `todo` was their last open
+            dependency).
+
+        Raises:
+            KeyError: If this graph has no todo with the given ident.
+            ValueError: If another todo already uses `todo`'s 'id'.
+        """
+        old_todo = self._todos[ident]
+        affected = self._affected(old_todo)
+        self._unlink(ident)
+        try:
+            self._link(todo)
+        except ValueError:
+            # Unlinking also dropped the old todo's blocked count.
+            self._link(old_todo)
+            self._refresh(ident)
+            raise
+
+        affected |= self._affected(todo)
+        affected.add(todo.ident)
+        return self._refresh_all(affected)
+
+    def remove(self, ident: str) -> List[T]:
+        """Removes the todo identified by `ident` from this graph.
+
+        Returns:
+            The open todos that were unblocked by this change (see
+            `update()`).
+
+        Raises:
+            KeyError: If this graph has no todo with the given ident.
+        """
+        affected = self._affected(self._todos[ident])
+        self._unlink(ident)
+        return self._refresh_all(affected)
+
+    def is_blocked(self, ident: str) -> bool:
+        """Is the todo identified by `ident` an open todo that is blocked?"""
+        return ident in self._blocked
+
+    def blocked(self) -> List[T]:
+        """Returns every open todo that is blocked."""
+        return [self._todos[ident] for ident in self._blocked]
+
+    def unblocked(self) -> List[T]:
+        """Returns every open todo that is not blocked."""
+        return [
+            todo
+            for ident, todo in self._todos.items()
+            if not todo.done and ident not in self._blocked
+        ]
+
+    def blockers(self, ident: str) -> List[T]:
+        """Returns the open todos that block the todo identified by `ident`.
+
+        Raises:
+            KeyError: If this graph has no todo with the given ident.
+        """
+        return [
+            self._todos[blocker]
+            for blocker in self._blocker_idents(self._todos[ident])
+            if not self._todos[blocker].done
+        ]
+
+    def subtree(self, ident: str) -> List[T]:
+        """Returns the todo identified by `ident` and all of its subtasks.
+
+        Subtasks are found by following 'p' metadata and are returned in
+        breadth-first order.
+
+        Raises:
+            KeyError: If this graph has no todo with the given ident.
+        """
+        result = [self._todos[ident]]
+        seen = {ident}
+        for todo in result:
+            todo_id = todo.metadata.get(ID_KEY)
+            if not todo_id:
+                continue
+
+            children = [
+                self._todos[child]
+                for child in self._children.get(todo_id, ())
+                if child not in seen
+            ]
+            for child in sorted(children):
+                seen.add(child.ident)
+                result.append(child)
+        return result
+
+    def topological_order(self) -> List[T]:
+        """Returns every todo, ordered so that todos follow their blockers.
+
+        Todos that are not ordered by the graph are returned in their
+        standard sort order (Kahn's algorithm is used with a heap).
+
+        Raises:
+            ValueError: If the graph contains a cycle.
+        """
+        # We push each todo's rank (i.e. its index in sorted order) onto the
+        # heap, since comparing ints is much cheaper than comparing todos.
+        sorted_todos = sorted(self._todos.values())
+        rank = {todo.ident: idx for idx, todo in enumerate(sorted_todos)}
+        in_degrees = {
+            ident: len(self._blocker_idents(todo))
+            for ident, todo in self._todos.items()
+        }
+        heap = [
+            rank[ident] for ident, count in in_degrees.items() if not count
+        ]
+        heapq.heapify(heap)
+
+        result: List[T] = []
+        while heap:
+            todo = sorted_todos[heapq.heappop(heap)]
+            result.append(todo)
+            for dependent in self._dependent_idents(todo):
+                in_degrees[dependent] -= 1
+                if not in_degrees[dependent]:
+                    heapq.heappush(heap, rank[dependent])
+
+        if len(result) < len(self._todos):
+            cycle = self.find_cycle() or []
+            raise ValueError(
+                "Unable to order todos since their dependencies contain a"
+                f" cycle: {[todo.metadata.get(ID_KEY) for todo in cycle]}"
+            )
+        return result
+
+    def find_cycle(self) -> Optional[List[T]]:
+        """Returns the todos that make up a dependency cycle (if one exists).
+
+        Each todo in the returned list blocks the todo that follows it (and
+        the last todo blocks the first).
+        """
+        # Maps each visited ident to True while it is on the current DFS
+        # path (and to False once all of its dependents have been visited).
+        on_path: Dict[str, bool] = {}
+        for root in self._todos:
+            if root in on_path:
+                continue
+
+            on_path[root] = True
+            path = [root]
+            stack = [iter(self._dependent_idents(self._todos[root]))]
+            while stack:
+                dependent = next(stack[-1], None)
+                if dependent is None:
+                    on_path[path.pop()] = False
+                    stack.pop()
+                elif on_path.get(dependent):
+                    cycle = path[path.index(dependent) :]
+                    return [self._todos[ident] for ident in cycle]
+                elif dependent not in on_path:
+                    on_path[dependent] = True
+                    path.append(dependent)
+                    todo = self._todos[dependent]
+                    stack.append(iter(self._dependent_idents(todo)))
+        return None
+
+    def _link(self, todo: T) -> None:
+        """Adds `todo` and its references to this graph's indexes."""
+        ident = todo.ident
+        todo_id = todo.metadata.get(ID_KEY)
+        if todo_id:
+            other_ident = self._idents_by_id.get(todo_id)
+            if other_ident is not None and other_ident != ident:
+                raise ValueError(
+                    f"Multiple todos use the same id: {ID_KEY}:{todo_id}"
+                )
+            self._idents_by_id[todo_id] = ident
+
+        self._todos[ident] = todo
+        for dep_id in _depends_on(todo):
+            self._dependents.setdefault(dep_id, set()).add(ident)
+        if parent_id := todo.metadata.get(PARENT_KEY):
+            self._children.setdefault(parent_id, set()).add(ident)
+
+    def _unlink(self, ident: str) -> None:
+        """Removes the todo identified by `ident` from this graph's indexes."""
+        todo = self._todos.pop(ident)
+        self._blocked.pop(ident, None)
+
+        todo_id = todo.metadata.get(ID_KEY)
+        if todo_id and self._idents_by_id.get(todo_id) == ident:
+            del self._idents_by_id[todo_id]
+
+        for dep_id in _depends_on(todo):
+            _discard(self._dependents, dep_id, ident)
+        if parent_id := todo.metadata.get(PARENT_KEY):
+            _discard(self._children, parent_id, ident)
+
+    def _blocker_idents(self, todo: T) -> Set[str]:
+        """Returns the idents of the todos that `todo` depends on."""
+        result = {
+            self._idents_by_id[dep_id]
+            for dep_id in _depends_on(todo)
+            if dep_id in self._idents_by_id
+        }
+        if todo_id := todo.metadata.get(ID_KEY):
+            result.update(self._children.get(todo_id, ()))
+        return result
+
+    def _dependent_idents(self, todo: T) -> Set[str]:
+        """Returns the idents of the todos that depend on `todo`."""
+        result: Set[str] = set()
+        if todo_id := todo.metadata.get(ID_KEY):
+            result.update(self._dependents.get(todo_id, ()))
+        parent_id = todo.metadata.get(PARENT_KEY)
+        if parent_id and parent_id in self._idents_by_id:
+            result.add(self._idents_by_id[parent_id])
+        return result
+
+    def _affected(self, todo: T) -> Set[str]:
+        """Returns the idents of the todos whose counts `todo` contributes to.
+        """
+        return self._dependent_idents(todo) - {todo.ident}
+
+    def _refresh_all(self, idents: Iterable[str]) -> List[T]:
+        """Refreshes the blocked counts of the given todos.
+
+        Returns:
+            The todos that were blocked before, but are not blocked anymore.
+        """
+        unblocked: List[T] = []
+        for ident in idents:
+            if ident not in self._todos:
+                continue
+
+            was_blocked = ident in self._blocked
+            self._refresh(ident)
+            if was_blocked and ident not in self._blocked:
+                unblocked.append(self._todos[ident])
+        return unblocked
+
+    def _refresh(self, ident: str) -> None:
+        """Recomputes the open blocker count of the todo identified by `ident`.
+        """
+        todo = self._todos[ident]
+        count = 0
+        if not todo.done:
+            count = sum(
+                not self._todos[blocker].done
+                for blocker in self._blocker_idents(todo)
+            )
+
+        if count:
+            self._blocked[ident] = count
+        else:
+            self._blocked.pop(ident, None)
+
+
+def _depends_on(todo: T) -> List[str]:
+    """Returns the ids named by `todo`'s 'dep' metadata."""
+    value = todo.metadata.get(DEPENDS_KEY)
+    if not value:
+        return []
+    return [dep_id for dep_id in value.split(",") if dep_id]
+
+
+def _discard(index: Dict[str, Set[str]], key: str, ident: str) -> None:
+    """Removes `ident` from `index[key]` (and drops empty sets)."""
+    idents = index.get(key)
+    if idents is None:
+        return
+
+    idents.discard(ident)
+    if not idents:
+        del index[key]
@@ -0,0 +1,139 @@
+"""Contains the DateIndex class definition."""
+
+from __future__ import annotations
+
+from bisect import bisect_left, insort
+import datetime as dt
+import itertools as it
+from typing import Dict, Final, Iterable, List, Optional, Tuple
+
+from .types import TodoProto
+
+
+# Date fields that every todo has.
+TODO_DATE_FIELDS: Final = ("create_date", "done_date")
+
+# An index entry: (date ordinal, insertion sequence number, todo ident).
+_Entry = Tuple[int, int, str]
+
+
+class DateIndex:
+    """A sorted index over the dates associated with a collection of todos.
+
+    Each indexed field (the `create_date` and `done_date` attributes plus any
+    metadata keys whose values are dates, e.g. 'due') is backed by a list of
+    entries kept sorted by date ordinal, so range lookups are a pair of
+    bisections and todos can be added / removed incrementally without ever
+    re-sorting the whole list.
+
+    Args:
+        date_keys: Metadata keys whose values should be parsed as dates and
+          indexed (e.g. ['due']).
+    """
+
+    def __init__(self, date_keys: Iterable[str] = ()) -> None:
+        self.date_keys = tuple(date_keys)
+        self.fields = TODO_DATE_FIELDS + self.date_keys
+
+        self._entries: Dict[str, List[_Entry]] = {
+            field: [] for field in self.fields
+        }
+        self._todo_entries: Dict[str, List[Tuple[str, _Entry]]] = {}
+        self._counter = it.count()
+
+    @classmethod
+    def from_todos(
+        cls, todos: Iterable[TodoProto], date_keys: Iterable[str] = ()
+    ) -> DateIndex:
+        """Builds a new DateIndex from an iterable of todos."""
+        index = cls(date_keys)
+        for todo in todos:
+            index.add(todo)
+        return index
+
+    def __contains__(self, ident: object) -> bool:  # noqa: D105
+        return ident in self._todo_entries
+
+    def __len__(self) -> int:  # noqa: D105
+        return len(self._todo_entries)
+
+    def add(self, todo: TodoProto) -> None:
+        """Adds `todo` to this index (or replaces an older version of it)."""
+        ident = todo.ident
+        if ident in self._todo_entries:
+            self.remove(ident)
+
+        todo_entries = []
+        for field in self.fields:
+            ordinal = self._ordinal(todo, field)
+            if ordinal is None:
+                continue
+
+            entry = (ordinal, next(self._counter), ident)
+            insort(self._entries[field], entry)
+            todo_entries.append((field, entry))
+
+        self._todo_entries[ident] = todo_entries
+
+    def update(self, todo: TodoProto) -> None:
+        """Re-indexes a todo whose dates have (possibly) changed."""
+        self.add(todo)
+
+    def remove(self, ident: str) -> None:
+        """Removes the todo identified by `ident` from this index.
+
+        Raises:
+            KeyError: If no todo with the given ident has been indexed.
+        """
+        for field, entry in self._todo_entries.pop(ident):
+            entries = self._entries[field]
+            del entries[bisect_left(entries, entry)]
+
+    def range(
+        self, field: str, start: dt.date = None, end: dt.date = None
+    ) -> List[str]:
+        """Returns the idents of todos whose `field` is in [start, end].
+
+        Both bounds are inclusive and either may be omitted. The idents are
+        returned in date order (ties are broken by insertion order).
+        """
+        entries = self._entries[field]
+        lo = 0 if start is None else bisect_left(entries, (start.toordinal(),))
+        hi = (
+            len(entries)
+            if end is None
+            else bisect_left(entries, (end.toordinal() + 1,))
+        )
+        return [ident for (_, _, ident) in entries[lo:hi]]
+
+    def before(self, field: str, date: dt.date) -> List[str]:
+        """Returns the idents of todos whose `field` comes before `date`."""
+        return self.range(field, end=date - dt.timedelta(days=1))
+
+    def after(self, field: str, date: dt.date) -> List[str]:
+        """Returns the idents of todos whose `field` comes after `date`."""
+        return self.range(field, start=date + dt.timedelta(days=1))
+
+    def _ordinal(self, todo: TodoProto, field: str) -> Optional[int]:
+        date: Optional[dt.date]
+        if field == "create_date":
+            date = todo.create_date
+        elif field == "done_date":
+            date = todo.done_date
+        elif isinstance(
+            typed_value := getattr(todo, "typed_metadata", {}).get(field),
+            dt.date,
+        ):
+            # The todo's metadata schema has already decoded this date.
+            date = typed_value
+        else:
+            value = todo.metadata.get(field)
+            if value is None:
+                return None
+
+            try:
+                date = dt.date.fromisoformat(value)
+            except ValueError:
+                return None
+
+        return None if date is None else date.toordinal()
@@ -0,0 +1,411 @@
+"""Contains the TodoJournal class definition."""
+
+from __future__ import annotations
+
+import fcntl
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import (
+    Any,
+    Dict,
+    Final,
+    Iterator,
+    List,
+    Literal,
+    Optional,
+    TextIO,
+    Tuple,
+    Type,
+)
+import uuid
+
+from eris import Err
+
+from ._common import atomic_open, to_source_line
+from ._todo import Todo
+from .clock import lazily_frozen
+from .types import PathLike, TodoProto
+
+
+DEFAULT_COMPACT_THRESHOLD: Final = 1000
+JOURNAL_SUFFIX: Final = ".journal"
+LOCK_SUFFIX: Final = ".lock"
+PENDING_SUFFIX: Final = ".new"
+REJECTED_SUFFIX: Final = ".rejected"
+
+# The kinds of operations that are recorded in a journal.
+Operation = Literal["add", "edit", "complete", "delete"]
+
+
+class TodoJournal:
+    """A todo.txt file paired with an append-only journal of edits.
+
+    Instead of rewriting the todo.txt file after every edit, each operation
+    (add / edit / complete / delete) is appended to a journal file (which
+    lives next to the todo.txt file) and fsync'ed before the operation is
+    applied in memory. The journal is replayed whenever the todo.txt file is
+    loaded and is folded back into the todo.txt file by `compact()`, which is
+    also called automatically once the journal has recorded
+    `compact_threshold` operations (so the journal never grows without
+    bound).
+
+    Each todo is identified by a journal ident that stays stable across
+    reloads and compactions. (Note that these idents are unrelated to the
+    `ident` attribute of the todos themselves.)
+
+    Lines in the todo.txt file that cannot be parsed are preserved, but are
+    moved to the end of the file by `compact()`.
+
+    Only one TodoJournal (in any process) can use a todo.txt file's journal
+    at a time, which is enforced using a lock file that lives next to the
+    journal.
+
+    NOTE: The journal's header records a digest of the todo.txt file. If the
+      todo.txt file is modified by some other program before the journal is
+      compacted, the journal is replayed against the new file instead: each
+      edited / completed / deleted todo is matched by the line it had before
+      the operation was applied. Operations that no longer apply (e.g.
+      because their todo was also changed by the other program) are moved to
+      a side file (e.g. 'todo.txt.journal.rejected') so that they are never
+      silently lost.
+
+    Args:
+        path: The todo.txt file.
+        todo_cls: The Todo class used to parse each line.
+        compact_threshold: The journal is compacted once it has recorded
+          this many operations. If this is None, the journal is only
+          compacted when `compact()` is called.
+
+    Raises:
+        ValueError: If the journal is already in use.
+    """
+
+    def __init__(
+        self,
+        path: PathLike,
+        *,
+        todo_cls: Type[TodoProto] = Todo,
+        compact_threshold: Optional[int] = DEFAULT_COMPACT_THRESHOLD,
+    ) -> None:
+        self.path = Path(path)
+        self.journal_path = self.path.with_name(
+            self.path.name + JOURNAL_SUFFIX
+        )
+        # Guards the journal, which only one TodoJournal can use at a time.
+        self.lock_path = _with_suffix(self.journal_path, LOCK_SUFFIX)
+        # The journal written by `compact()` before it is committed.
+        self.pending_path = _with_suffix(self.journal_path, PENDING_SUFFIX)
+        # Journaled operations that no longer apply are moved here.
+        self.rejected_path = _with_suffix(self.journal_path, REJECTED_SUFFIX)
+        self.todo_cls = todo_cls
+        self.compact_threshold = compact_threshold
+
+        self._todos: Dict[str, TodoProto] = {}
+        self._bad_lines: List[str] = []
+        self._journal_file: Optional[TextIO] = None
+        self._lock_file: Optional[TextIO] = None
+        self._journal_size = 0
+
+        self._lock()
+        try:
+            self._load()
+        except BaseException:
+            self.close()
+            raise
+
+    def __enter__(self) -> TodoJournal:  # noqa: D105
+        return self
+
+    def __exit__(self, *args: Any) -> None:  # noqa: D105
+        self.close()
+
+    def __contains__(self, ident: object) -> bool:  # noqa: D105
+        return ident in self._todos
+
+    def __getitem__(self, ident: str) -> TodoProto:  # noqa: D105
+        return self._todos[ident]
+
+    def __iter__(self) -> Iterator[str]:  # noqa: D105
+        return iter(self._todos)
+
+    def __len__(self) -> int:  # noqa: D105
+        return len(self._todos)
+
+    @property
+    def journal_size(self) -> int:
+        """The number of operations recorded since the last compaction."""
+        return self._journal_size
+
+    def items(self) -> Iterator[Tuple[str, TodoProto]]:
+        """Yields an (ident, todo) pair for each todo (in file order)."""
+        yield from self._todos.items()
+
+    def todos(self) -> List[TodoProto]:
+        """Returns all todos (in file order)."""
+        return list(self._todos.values())
+
+    def add(self, todo: TodoProto) -> str:
+        """Adds a new todo and returns its (newly generated) ident."""
+        ident = uuid.uuid4().hex
+        self._record("add", ident, todo)
+        return ident
+
+    def edit(self, ident: str, todo: TodoProto) -> None:
+        """Replaces the todo identified by `ident` with `todo`."""
+        self._check_ident(ident)
+        self._record("edit", ident, todo)
+
+    def complete(self, ident: str) -> TodoProto:
+        """Marks the todo identified by `ident` done and returns it."""
+        self._check_ident(ident)
+        done_todo: TodoProto = self._todos[ident].new(done=True)
+        self._record("complete", ident, done_todo)
+        return done_todo
+
+    def delete(self, ident: str) -> None:
+        """Deletes the todo identified by `ident`."""
+        self._check_ident(ident)
+        self._record("delete", ident, None)
+
+    def compact(self) -> None:
+        """Folds the journal back into the todo.txt file.
+
+        The new journal (whose header records the new file's digest and the
+        ident of each todo in it) is written to a pending file first, then
+        the new todo.txt file is written atomically, and then the pending
+        journal replaces the old one. Should we crash before the last step,
+        the pending journal is picked up the next time the todo.txt file is
+        loaded (if the todo.txt file was replaced) or discarded (if it was
+        not).
+        """
+        # Todos that have not changed since they were loaded are written
+        # verbatim.
+        lines = [to_source_line(todo) + "\n" for todo in self._todos.values()]
+        lines.extend(line + "\n" for line in self._bad_lines)
+        contents = "".join(lines)
+
+        with atomic_open(self.pending_path) as pending_file:
+            pending_file.write(_header(contents, list(self._todos)))
+        with atomic_open(self.path) as todo_file:
+            todo_file.write(contents)
+
+        self._close_journal()
+        os.replace(self.pending_path, self.journal_path)
+        self._journal_size = 0
+
+    def close(self) -> None:
+        """Closes the journal file (if it is open) and releases its lock."""
+        self._close_journal()
+        if self._lock_file is not None:
+            # Closing the file releases the lock.
+            self._lock_file.close()
+            self._lock_file = None
+
+    def _lock(self) -> None:
+        lock_file = self.lock_path.open("a")
+        try:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lock_file.close()
+            raise ValueError(
+                f"Journal is already in use: {self.journal_path}"
+            ) from None
+        self._lock_file = lock_file
+
+    def _load(self) -> None:
+        contents = self.path.read_text() if self.path.exists() else ""
+        digest = _digest(contents)
+        entries = self._read_journal(self.journal_path)
+        header = entries[0] if entries else None
+        if self.pending_path.exists():
+            pending_entries = self._read_journal(self.pending_path)
+            if pending_entries and pending_entries[0].get("sha256") == digest:
+                # We crashed in the middle of a compaction (right after the
+                # todo.txt file was replaced).
+                os.replace(self.pending_path, self.journal_path)
+                entries = pending_entries
+                header = entries[0]
+            else:
+                self.pending_path.unlink()
+
+        stale_entries: List[Dict[str, Any]] = []
+        if header is not None and header.get("sha256") != digest:
+            # This journal belongs to an older version of the todo.txt file.
+            stale_entries = entries[1:]
+            entries = []
+            header = None
+
+        idents = None
+        if header is not None and header["idents"] is not None:
+            idents = iter(header["idents"])
+        lineno = 0
+        # Every todo shares the same (default) timestamps, but the clock is
+        # only read if some todo actually needs it.
+        with lazily_frozen(getattr(self.todo_cls, "clock", None)):
+            for line in contents.splitlines():
+                if not line.strip():
+                    continue
+
+                todo_result = self.todo_cls.from_line(line)
+                if isinstance(todo_result, Err):
+                    self._bad_lines.append(line)
+                    continue
+
+                lineno += 1
+                ident = next(idents) if idents is not None else f"L{lineno}"
+                self._todos[ident] = todo_result.ok()
+
+        if header is None:
+            file_idents = list(self._todos)
+            kept_entries = self._replay_stale(stale_entries)
+            with atomic_open(self.journal_path) as journal_file:
+                journal_file.write(_header(contents, file_idents))
+                for entry in kept_entries:
+                    journal_file.write(json.dumps(entry) + "\n")
+            self._journal_size = len(kept_entries)
+            return
+
+        for entry in entries[1:]:
+            self._apply(entry["op"], entry["ident"], self._entry_todo(entry))
+            self._journal_size += 1
+
+    def _replay_stale(
+        self, entries: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """Replays a stale journal's entries against the todo.txt file.
+
+        Returns:
+            The entries that were applied (with their idents translated to
+            the idents of the freshly loaded todos). The entries that no
+            longer apply are appended to the rejected file.
+        """
+        # Maps each source line to the idents of the loaded todos that have
+        # that line (and have not been matched to a journal ident yet).
+        unmatched: Dict[str, List[str]] = {}
+        for todo_ident, todo in self._todos.items():
+            unmatched.setdefault(to_source_line(todo), []).append(todo_ident)
+
+        # Maps the stale journal's idents to our idents.
+        idents: Dict[str, str] = {}
+        kept: List[Dict[str, Any]] = []
+        rejected: List[Dict[str, Any]] = []
+        for entry in entries:
+            op = entry["op"]
+            ident: Optional[str] = entry["ident"]
+            if op != "add":
+                ident = idents.get(entry["ident"])
+                candidates = unmatched.get(entry.get("old", ""), [])
+                if ident is None and candidates:
+                    ident = candidates.pop(0)
+                if ident not in self._todos:
+                    rejected.append(entry)
+                    continue
+
+            assert ident is not None
+            idents[entry["ident"]] = ident
+            self._apply(op, ident, self._entry_todo(entry))
+            kept.append(dict(entry, ident=ident))
+
+        if rejected:
+            with self.rejected_path.open("a") as rejected_file:
+                for entry in rejected:
+                    rejected_file.write(json.dumps(entry) + "\n")
+                rejected_file.flush()
+                os.fsync(rejected_file.fileno())
+        return kept
+
+    def _entry_todo(self, entry: Dict[str, Any]) -> Optional[TodoProto]:
+        entry_line = entry.get("line")
+        return None if entry_line is None else self._parse(entry_line)
+
+    def _read_journal(self, path: Path) -> List[Dict[str, Any]]:
+        if not path.exists():
+            return []
+
+        entries = []
+        with path.open() as journal_file:
+            for line in journal_file:
+                if not line.endswith("\n"):
+                    # A torn write (we must have crashed while writing it).
+                    break
+                entries.append(json.loads(line))
+        return entries
+
+    def _record(
+        self, op: Operation, ident: str, todo: Optional[TodoProto]
+    ) -> None:
+        entry: Dict[str, Any] = {"op": op, "ident": ident}
+        if todo is not None:
+            entry["line"] = to_source_line(todo)
+        if op != "add":
+            # Lets us find this todo again if the todo.txt file is modified
+            # by some other program before this entry is compacted.
+            entry["old"] = to_source_line(self._todos[ident])
+
+        journal_file = self._open_journal()
+        journal_file.write(json.dumps(entry) + "\n")
+        journal_file.flush()
+        os.fsync(journal_file.fileno())
+        self._journal_size += 1
+
+        self._apply(op, ident, todo)
+        if (
+            self.compact_threshold is not None
+            and self._journal_size >= self.compact_threshold
+        ):
+            self.compact()
+
+    def _apply(
+        self, op: Operation, ident: str, todo: Optional[TodoProto]
+    ) -> None:
+        if op == "delete":
+            del self._todos[ident]
+        else:
+            assert todo is not None
+            self._todos[ident] = todo
+
+    def _parse(self, line: str) -> TodoProto:
+        todo: TodoProto = self.todo_cls.from_line(line).unwrap()
+        return todo
+
+    def _check_ident(self, ident: str) -> None:
+        if ident not in self._todos:
+            raise KeyError(ident)
+
+    def _open_journal(self) -> TextIO:
+        if self._lock_file is None:
+            self._lock()
+        if self._journal_file is None:
+            self._journal_file = self.journal_path.open("a")
+        return self._journal_file
+
+    def _close_journal(self) -> None:
+        if self._journal_file is not None:
+            self._journal_file.close()
+            self._journal_file = None
+
+
+def _with_suffix(path: Path, suffix: str) -> Path:
+    return path.with_name(path.name + suffix)
+
+
+def _digest(contents: str) -> str:
+    return hashlib.sha256(contents.encode()).hexdigest()
+
+
+def _header(contents: str, idents: List[str]) -> str:
+    """Returns the header line of a journal for a todo.txt file.
+
+    We only store the todos' idents when they differ from the default
+    (positional) idents.
+    """
+    stored_idents: Optional[List[str]] = idents
+    if idents == [f"L{i}" for i in range(1, len(idents) + 1)]:
+        stored_idents = None
+
+    return (
+        json.dumps({"sha256": _digest(contents), "idents": stored_idents})
+        + "\n"
+    )
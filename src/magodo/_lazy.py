@@ -0,0 +1,224 @@
+"""Contains the LazyTodo class definition."""
+
+from __future__ import annotations
+
+import datetime as dt
+from functools import total_ordering
+from typing import Any, Optional, Tuple
+
+from eris import ErisError, Err, Ok, Result
+
+from ._common import DEFAULT_PRIORITY
+from ._todo import (
+    _TODO_PATTERN,
+    Todo,
+    _add_time_metadata,
+    _needs_time_metadata,
+    _parse_desc,
+    _parse_header,
+    _sorted_tuple,
+)
+from .clock import now as clock_now
+from .types import Metadata, Priority
+
+
+@total_ordering
+class LazyTodo(Todo):
+    """A Todo that only extracts its tags / metadata when they are needed.
+
+    Constructing a LazyTodo from a line only parses the fixed header of that
+    line (i.e. the 'x', the priority, and the done / create dates). A todo's
+    projects, contexts, epics, and metadata are extracted from its
+    description the first time any one of them is accessed and are then
+    cached. This makes bulk loads that only filter or sort on header fields
+    significantly cheaper.
+
+    Any of the tag / metadata keyword arguments that are left as None are
+    extracted lazily from `desc`. Once touched, every attribute of a LazyTodo
+    is equal to the corresponding attribute of the equivalent Todo (note,
+    however, that a default 'ctime' / 'dtime' tag is generated when the
+    metadata is first extracted, not when the LazyTodo is constructed).
+    """
+
+    _contexts: Optional[Tuple[str, ...]]
+    _epics: Optional[Tuple[str, ...]]
+    _metadata: Optional[Metadata]
+    _projects: Optional[Tuple[str, ...]]
+
+    def __init__(  # pylint: disable=super-init-not-called
+        self,
+        desc: str,
+        *,
+        contexts: Tuple[str, ...] = None,
+        create_date: dt.date = None,
+        done_date: dt.date = None,
+        done: bool = False,
+        epics: Tuple[str, ...] = None,
+        metadata: Metadata = None,
+        priority: Priority = DEFAULT_PRIORITY,
+        projects: Tuple[str, ...] = None,
+    ):
+        if (
+            create_date is None
+            or (done and done_date is None)
+            or (metadata is not None and _needs_time_metadata(metadata, done))
+        ):
+            now = clock_now(type(self).clock)
+            if create_date is None:
+                create_date = now.date()
+            if done and done_date is None:
+                done_date = now.date()
+            if metadata is not None:
+                _add_time_metadata(metadata, done, now)
+
+        # We bypass __setattr__() here (see `Todo.__init__()`).
+        self.__dict__.update(
+            create_date=create_date,
+            desc=desc,
+            done_date=done_date,
+            done=done,
+            priority=priority,
+            _contexts=None if contexts is None else _sorted_tuple(contexts),
+            _epics=None if epics is None else _sorted_tuple(epics),
+            _metadata=metadata,
+            _projects=None if projects is None else _sorted_tuple(projects),
+        )
+
+    @classmethod
+    def from_line(  # type: ignore[override]
+        cls, line: str
+    ) -> Result[LazyTodo, ErisError]:
+        """Contructs a LazyTodo object from a string.
+
+        Args:
+            line: The line to use to construct our new LazyTodo object.
+        """
+        source_line = line.rstrip("\r\n")
+        line = line.strip()
+
+        re_todo_match = _TODO_PATTERN.match(line)
+        if re_todo_match is None:
+            return Err(
+                f"The provided string ({line!r}) does not appear to properly"
+                " adhere to the todo.txt format. See"
+                " https://github.com/todotxt/todo.txt for the specification."
+            )
+
+        done, priority, create_date, done_date = _parse_header(re_todo_match)
+        todo = cls(
+            create_date=create_date,
+            desc=re_todo_match.group("desc"),
+            done_date=done_date,
+            done=done,
+            priority=priority,
+        )
+        todo.source_line = source_line
+        return Ok(todo)
+
+    def new(self, **kwargs: Any) -> LazyTodo:
+        """Creates a new LazyTodo using the current todo's attrs as defaults.
+
+        Tags / metadata that have not been extracted yet stay lazy, unless a
+        new description is provided (in which case they are extracted from the
+        current description first, just like `Todo.new()` would do).
+        """
+        if "desc" in kwargs:
+            self._parse()
+
+        contexts = kwargs.get("contexts", self._contexts)
+        create_date = kwargs.get("create_date", self.create_date)
+        desc = kwargs.get("desc", self.desc)
+        done_date = kwargs.get("done_date", self.done_date)
+        done = kwargs.get("done", self.done)
+        epics = kwargs.get("epics", self._epics)
+        metadata = kwargs.get("metadata", self._metadata)
+        if metadata is not None:
+            metadata = dict(metadata)
+        priority: Priority = kwargs.get("priority", self.priority)
+        projects = kwargs.get("projects", self._projects)
+        todo = LazyTodo(
+            contexts=contexts,
+            create_date=create_date,
+            desc=desc,
+            done_date=done_date,
+            done=done,
+            epics=epics,
+            metadata=metadata,
+            priority=priority,
+            projects=projects,
+        )
+        if not kwargs:
+            todo.source_line = self.source_line
+        return todo
+
+    @property
+    def parsed(self) -> bool:
+        """Have this todo's tags and metadata been extracted yet?"""
+        return None not in (
+            self._contexts,
+            self._epics,
+            self._metadata,
+            self._projects,
+        )
+
+    @property
+    def contexts(self) -> Tuple[str, ...]:  # noqa: D102
+        if self._contexts is None:
+            self._parse()
+        assert self._contexts is not None
+        return self._contexts
+
+    @contexts.setter
+    def contexts(self, contexts: Tuple[str, ...]) -> None:
+        self._contexts = contexts
+
+    @property
+    def epics(self) -> Tuple[str, ...]:  # noqa: D102
+        if self._epics is None:
+            self._parse()
+        assert self._epics is not None
+        return self._epics
+
+    @epics.setter
+    def epics(self, epics: Tuple[str, ...]) -> None:
+        self._epics = epics
+
+    @property
+    def metadata(self) -> Metadata:  # noqa: D102
+        if self._metadata is None:
+            self._parse()
+        assert self._metadata is not None
+        return self._metadata
+
+    @metadata.setter
+    def metadata(self, metadata: Metadata) -> None:
+        self._metadata = metadata
+
+    @property
+    def projects(self) -> Tuple[str, ...]:  # noqa: D102
+        if self._projects is None:
+            self._parse()
+        assert self._projects is not None
+        return self._projects
+
+    @projects.setter
+    def projects(self, projects: Tuple[str, ...]) -> None:
+        self._projects = projects
+
+    def _parse(self) -> None:
+        """Extracts any tags / metadata that have not been extracted yet."""
+        if self.parsed:
+            return
+
+        projects, contexts, epics, metadata = _parse_desc(self.desc)
+        if self._contexts is None:
+            self._contexts = _sorted_tuple(contexts)
+        if self._epics is None:
+            self._epics = _sorted_tuple(epics)
+        if self._metadata is None:
+            if _needs_time_metadata(metadata, self.done):
+                now = clock_now(type(self).clock)
+                _add_time_metadata(metadata, self.done, now)
+            self._metadata = metadata
+        if self._projects is None:
+            self._projects = _sorted_tuple(projects)
@@ -3,21 +3,42 @@
 from __future__ import annotations
 
 import abc
+from concurrent.futures import Executor
 import datetime as dt
-from functools import total_ordering
+from functools import partial, total_ordering
 import itertools as it
-from typing import Any, Iterable, List, Tuple, Type, TypeVar
+from typing import (
+    Any,
+    Final,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    TypeVar,
+)
 
 from eris import ErisError, Err, Ok, Result
 
 from magodo.types import T
 
 from ._todo import Todo, TodoMixin
-from .types import EnchantedTodo, LineSpell, Metadata, Priority, TodoSpell
+from .clock import frozen, lazily_frozen, now as clock_now, use_default_clock
+from .types import (
+    BatchTodoSpell,
+    EnchantedTodo,
+    LineSpell,
+    Metadata,
+    Priority,
+    TodoSpell,
+)
 
 
 M = TypeVar("M", bound="MagicTodoMixin")
 
+DEFAULT_CHUNK_SIZE: Final = 1000
+
 
 @total_ordering
 class MagicTodoMixin(TodoMixin, abc.ABC):
@@ -25,6 +46,7 @@ class MagicTodoMixin(TodoMixin, abc.ABC):
 
     pre_todo_spells: List[TodoSpell] = []
     todo_spells: List[TodoSpell] = []
+    batch_todo_spells: List[BatchTodoSpell] = []
     post_todo_spells: List[TodoSpell] = []
 
     to_line_spells: List[LineSpell] = []
@@ -32,13 +54,17 @@ class MagicTodoMixin(TodoMixin, abc.ABC):
 
     def __init__(self: M, todo: Todo):
         self._todo = todo
-        self.etodo = self.cast_todo_spells(todo)
+        with use_default_clock(type(self).clock):
+            self.etodo = self.cast_todo_spells(todo)
+        self.source_line = todo.source_line
 
     @classmethod
     def from_line(cls: Type[M], line: str) -> Result[M, ErisError]:
         """Converts a string into a MagicTodo object."""
+        raw_line = line.rstrip("\r\n")
         line = cls.cast_from_line_spells(line)
-        todo_result = Todo.from_line(line)
+        with use_default_clock(cls.clock):
+            todo_result = Todo.from_line(line)
         if isinstance(todo_result, Err):
             err: Err[Any, ErisError] = Err(
                 "Failed to construct basic Todo object inside of MagicTodo."
@@ -47,7 +73,102 @@ class MagicTodoMixin(TodoMixin, abc.ABC):
 
         todo = todo_result.ok()
 
-        return Ok(cls(todo))
+        magic_todo = cls(todo)
+        # We keep the line we were given (i.e. before any from_line spells
+        # were cast on it), since that is the line that should be written
+        # back if this todo never changes.
+        magic_todo.source_line = raw_line
+        return Ok(magic_todo)
+
+    @classmethod
+    def from_lines(
+        cls: Type[M],
+        lines: Iterable[str],
+        *,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        executor: Executor = None,
+    ) -> List[M]:
+        """Converts many strings into MagicTodo objects.
+
+        Lines are split into chunks of (at most) `chunk_size` lines, and each
+        batch spell is only cast once per chunk. Lines that cannot be parsed
+        are skipped (see `magodo.lint` for a way to report them).
+
+        Args:
+            lines: The lines to convert.
+            chunk_size: The maximum number of lines in each chunk.
+            executor: If provided, chunks are processed concurrently using
+              this executor. Since spells are pure-Python functions, use a
+              ProcessPoolExecutor to make use of multiple cores (this
+              requires this MagicTodo class and the todos it produces to be
+              picklable).
+
+        Returns:
+            One MagicTodo for each valid line (in the same order as `lines`).
+        """
+        # Every todo in the batch shares the same (default) timestamps, but
+        # the clock is only read if some todo actually needs it.
+        chunks = _chunked(lines, chunk_size)
+        if executor is None:
+            with lazily_frozen(cls.clock):
+                return [
+                    todo for chunk in chunks for todo in cls._from_chunk(chunk)
+                ]
+
+        # The executor's workers (which may be other processes) can not
+        # share a lazily frozen clock, so we read the clock up front.
+        from_chunk = partial(cls._from_chunk, now=clock_now(cls.clock))
+        todo_chunks = executor.map(from_chunk, chunks)
+        return [todo for todo_chunk in todo_chunks for todo in todo_chunk]
+
+    @classmethod
+    def _from_chunk(
+        cls: Type[M], lines: List[str], *, now: dt.datetime = None
+    ) -> List[M]:
+        if now is not None:
+            with frozen(now):
+                return cls._from_chunk(lines)
+
+        raw_lines: List[str] = []
+        todos: List[Todo] = []
+        for line in lines:
+            todo_result = Todo.from_line(cls.cast_from_line_spells(line))
+            if isinstance(todo_result, Err):
+                continue
+
+            raw_lines.append(line.rstrip("\r\n"))
+            todos.append(todo_result.ok())
+
+        etodos = cls.cast_batch_todo_spells(todos)
+
+        return [
+            cls._from_parts(todo, etodo, raw_line)
+            for todo, etodo, raw_line in zip(todos, etodos, raw_lines)
+        ]
+
+    @classmethod
+    def _from_parts(
+        cls: Type[M],
+        todo: Todo,
+        etodo: EnchantedTodo[Todo],
+        source_line: Optional[str],
+    ) -> M:
+        """Constructs a MagicTodo whose spells have already been cast.
+
+        Since `from_lines()` uses this method instead of `__init__()` (to
+        avoid casting each todo's spells twice), subclasses that extend
+        `__init__()` should extend this method too.
+
+        Args:
+            todo: The basic todo that this MagicTodo wraps.
+            etodo: The result of casting this class's spells on `todo`.
+            source_line: The line that `todo` was parsed from.
+        """
+        magic_todo = cls.__new__(cls)
+        magic_todo._todo = todo
+        magic_todo.etodo = etodo
+        magic_todo.source_line = source_line
+        return magic_todo
 
     def to_line(self: M) -> str:
         """Converts this MagicTodo back to a string."""
@@ -58,14 +179,30 @@ class MagicTodoMixin(TodoMixin, abc.ABC):
     @classmethod
     def cast_todo_spells(cls: Type[M], todo: T) -> EnchantedTodo[T]:
         """Casts all spells associated with this MagicTodo on `todo`."""
-        new_todo = EnchantedTodo(todo.new())
-        todo_spell_chain: Iterable[TodoSpell] = it.chain(
-            cls.pre_todo_spells, cls.todo_spells, cls.post_todo_spells
-        )
-        for todo_spell in todo_spell_chain:
-            new_todo = todo_spell(new_todo)
+        [etodo] = cls.cast_batch_todo_spells([todo])
+        return etodo
+
+    @classmethod
+    def cast_batch_todo_spells(
+        cls: Type[M], todos: List[T]
+    ) -> List[EnchantedTodo[T]]:
+        """Casts all spells associated with this MagicTodo on `todos`.
+
+        Each todo spell is cast on every todo before the next spell is cast.
+        Batch spells are cast (once for all of `todos`) after the regular
+        todo spells and before the post todo spells.
+        """
+        etodos = [EnchantedTodo(todo.new()) for todo in todos]
+        for todo_spell in it.chain(cls.pre_todo_spells, cls.todo_spells):
+            etodos = [todo_spell(etodo) for etodo in etodos]
+
+        for batch_todo_spell in cls.batch_todo_spells:
+            etodos = batch_todo_spell(etodos)
 
-        return new_todo
+        for todo_spell in cls.post_todo_spells:
+            etodos = [todo_spell(etodo) for etodo in etodos]
+
+        return etodos
 
     @classmethod
     def cast_from_line_spells(cls: Type[M], line: str) -> str:
@@ -82,7 +219,24 @@ class MagicTodoMixin(TodoMixin, abc.ABC):
 
     def new(self: M, **kwargs: Any) -> M:
         """Creates a new Todo using the current Todo's attrs as defaults."""
-        return type(self)(self.etodo.todo.new(**kwargs))
+        with use_default_clock(type(self).clock):
+            todo = self.etodo.todo.new(**kwargs)
+        magic_todo = type(self)(todo)
+        if not kwargs:
+            magic_todo.source_line = self.source_line
+        return magic_todo
+
+    @property
+    def dirty(self: M) -> bool:
+        """Would this todo's line differ from the line it was parsed from?
+
+        A MagicTodo is also dirty if any of its todo spells changed it.
+        """
+        return (
+            self.source_line is None
+            or self.etodo.changed
+            or self.etodo.todo.dirty
+        )
 
     @property
     def contexts(self: M) -> Tuple[str, ...]:  # noqa: D102
@@ -119,3 +273,10 @@ class MagicTodoMixin(TodoMixin, abc.ABC):
     @property
     def projects(self: M) -> Tuple[str, ...]:  # noqa: D102
         return self.etodo.todo.projects
+
+
+def _chunked(lines: Iterable[str], chunk_size: int) -> Iterator[List[str]]:
+    """Splits `lines` into lists that contain at most `chunk_size` lines."""
+    lines_iter = iter(lines)
+    while chunk := list(it.islice(lines_iter, chunk_size)):
+        yield chunk
@@ -0,0 +1,397 @@
+"""Contains the PackedTodos class definition."""
+
+from __future__ import annotations
+
+import datetime as dt
+import mmap
+from multiprocessing import resource_tracker, shared_memory
+import struct
+import sys
+from typing import (
+    Any,
+    Dict,
+    Final,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+    cast,
+    overload,
+)
+import uuid
+
+from eris import ErisError, Result
+
+from ._common import atomic_open
+from ._todo import TODO_FIELDS, Todo
+from .types import Metadata, PathLike, Priority, TodoProto
+
+
+MAGIC: Final = b"MGPK"
+VERSION: Final = 1
+
+# magic, version, number of records, size of the string table
+_HEADER: Final = struct.Struct("<4sHxxII")
+# ident, done, priority, has source line, create date, done date (as
+# ordinals, where 0 means None), and one (offset, length) pair into the
+# string table for each entry of `_STRING_FIELDS`
+_RECORD: Final = struct.Struct("<16s?c?xii12I")
+_STRING_FIELDS: Final = (
+    "desc",
+    "contexts",
+    "epics",
+    "projects",
+    "metadata",
+    "source_line",
+)
+# Type of the buffers that packed todos can be read from.
+Buffer = Union[bytes, bytearray, memoryview, mmap.mmap]
+# Separates the items of the tuples / dictionaries in the string table.
+_SEP: Final = "\x1f"
+
+
+class PackedTodo(Todo):
+    """A read-only view of one of the todos stored in a PackedTodos object.
+
+    A view's fields are decoded from the packed buffer the first time any one
+    of them is accessed. Use `new()` to get an ordinary (mutable) Todo.
+    """
+
+    # pylint: disable=super-init-not-called
+    def __init__(self, packed: PackedTodos, index: int) -> None:
+        self.__dict__.update(_packed=packed, _index=index)
+
+    def __getattr__(self, name: str) -> Any:  # noqa: D105
+        # Only called for attributes that are not in our __dict__ yet.
+        if name in TODO_FIELDS and "_source_line" not in self.__dict__:
+            self._load()
+            return self.__dict__[name]
+        raise AttributeError(name)
+
+    def __setattr__(self, name: str, value: Any) -> None:  # noqa: D105
+        raise AttributeError(f"PackedTodo objects are read-only: {name!r}")
+
+    def __eq__(self, other: object) -> bool:  # noqa: D105
+        # Since Python tries a subclass's __eq__() first, we need to do this
+        # for views to compare equal to the todos they were packed from.
+        if type(other) is Todo:  # pylint: disable=unidiomatic-typecheck
+            return Todo.__eq__(other, self)
+        return super().__eq__(other)
+
+    @classmethod
+    def from_line(cls, line: str) -> Result[Todo, ErisError]:
+        """Constructs an ordinary Todo object from a string.
+
+        (PackedTodo objects can only be created by a PackedTodos object.)
+        """
+        return Todo.from_line(line)
+
+    @property
+    def ident(self) -> str:
+        """The ident of the todo that this todo was packed from."""
+        self._load()
+        return super().ident
+
+    @property
+    def source_line(self) -> Optional[str]:  # noqa: D102
+        self._load()
+        result: Optional[str] = self.__dict__["_source_line"]
+        return result
+
+    @source_line.setter
+    def source_line(self, source_line: Optional[str]) -> None:
+        raise AttributeError("PackedTodo objects are read-only: 'source_line'")
+
+    def _load(self) -> None:
+        """Decodes this todo's fields (unless they were decoded already)."""
+        # Every field is decoded at once, so any one of them will do here.
+        if "_source_line" not in self.__dict__:
+            packed: PackedTodos = self.__dict__["_packed"]
+            self.__dict__.update(packed._decode(self.__dict__["_index"]))
+
+
+class PackedTodos(Sequence[PackedTodo]):
+    """A compact, read-only todo list that can be shared between processes.
+
+    Todos are packed into a single buffer that contains fixed-width records
+    (one per todo) followed by a table of (deduplicated) UTF-8 strings. The
+    buffer can live in shared memory or in a memory-mapped file, so many
+    worker processes can attach to the same todos without parsing or
+    copying them: the todos returned by indexing are lightweight views that
+    only decode the record they point to (and only when one of their fields
+    is first accessed).
+
+    Args:
+        buffer: A buffer that holds packed todos (e.g. the contents of a file
+          written by `write()`).
+
+    Raises:
+        ValueError: If `buffer` does not hold packed todos.
+    """
+
+    def __init__(self, buffer: Buffer) -> None:
+        self._buffer = memoryview(buffer)
+        self._closers: List[Any] = []
+        self._shm: Optional[shared_memory.SharedMemory] = None
+
+        if len(self._buffer) < _HEADER.size:
+            raise ValueError("Buffer is too small to hold packed todos.")
+
+        magic, version, count, strings_size = _HEADER.unpack_from(self._buffer)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(
+                "Buffer does not contain packed todos:"
+                f" magic={bytes(magic)!r} version={version}"
+            )
+
+        self._count: int = count
+        self._strings_start: int = _HEADER.size + count * _RECORD.size
+        if len(self._buffer) < self._strings_start + strings_size:
+            raise ValueError("Buffer is too small to hold its packed todos.")
+
+    @classmethod
+    def from_todos(cls, todos: Iterable[TodoProto]) -> PackedTodos:
+        """Packs `todos` into a new (private) buffer."""
+        return cls(_pack(todos))
+
+    @classmethod
+    def create_shared_memory(
+        cls, todos: Iterable[TodoProto], *, name: str = None
+    ) -> PackedTodos:
+        """Packs `todos` into a new shared memory block.
+
+        Other processes can attach to the block using
+        `attach_shared_memory(packed.name)`. The block is removed once the
+        process that created it calls `unlink()`.
+        """
+        data = _pack(todos)
+        shm = shared_memory.SharedMemory(
+            name=name, create=True, size=len(data)
+        )
+        buffer = cast(memoryview, shm.buf)
+        buffer[: len(data)] = data
+        return cls._from_shared_memory(shm)
+
+    @classmethod
+    def attach_shared_memory(cls, name: str) -> PackedTodos:
+        """Attaches to a shared memory block created by another process.
+
+        The attaching process never takes ownership of the block (i.e. the
+        block is not removed when this process exits).
+        """
+        if sys.version_info >= (3, 13):
+            shm = shared_memory.SharedMemory(name=name, track=False)
+        else:
+            shm = shared_memory.SharedMemory(name=name)
+            # Before Python 3.13, attaching to a block also registers it with
+            # this process's resource tracker, which would remove the block
+            # (out from under its creator) when this process exits.
+            resource_tracker.unregister(
+                shm._name, "shared_memory"  # type: ignore[attr-defined]
+            )
+        return cls._from_shared_memory(shm)
+
+    @classmethod
+    def write(cls, path: PathLike, todos: Iterable[TodoProto]) -> None:
+        """Packs `todos` and (atomically) writes them to `path`."""
+        data = _pack(todos)
+        with atomic_open(path) as packed_file:
+            packed_file.buffer.write(data)
+
+    @classmethod
+    def open(cls, path: PathLike) -> PackedTodos:
+        """Memory-maps a file written by `write()`."""
+        with open(path, "rb") as packed_file:
+            buffer = mmap.mmap(
+                packed_file.fileno(), 0, access=mmap.ACCESS_READ
+            )
+
+        packed = cls(buffer)
+        packed._closers.append(buffer)
+        return packed
+
+    def __enter__(self) -> PackedTodos:  # noqa: D105
+        return self
+
+    def __exit__(self, *args: Any) -> None:  # noqa: D105
+        self.close()
+
+    @overload
+    def __getitem__(self, index: int) -> PackedTodo:  # noqa: D105
+        ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[PackedTodo]:  # noqa: D105
+        ...
+
+    def __getitem__(  # noqa: D105
+        self, index: Union[int, slice]
+    ) -> Union[PackedTodo, List[PackedTodo]]:
+        if isinstance(index, slice):
+            return [
+                PackedTodo(self, idx)
+                for idx in range(*index.indices(len(self)))
+            ]
+
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError(f"PackedTodos index out of range: {index}")
+        return PackedTodo(self, index)
+
+    def __len__(self) -> int:  # noqa: D105
+        return self._count
+
+    @property
+    def name(self) -> Optional[str]:
+        """The name of the shared memory block that holds these todos."""
+        return None if self._shm is None else self._shm.name
+
+    @property
+    def nbytes(self) -> int:
+        """The size (in bytes) of the buffer that holds these todos."""
+        strings_size: int = _HEADER.unpack_from(self._buffer)[3]
+        return self._strings_start + strings_size
+
+    def close(self) -> None:
+        """Releases this object's buffer.
+
+        Views that have not accessed any of their fields yet can not be used
+        after this method is called.
+        """
+        self._buffer.release()
+        for closer in self._closers:
+            closer.close()
+        self._closers.clear()
+
+    def unlink(self) -> None:
+        """Removes the shared memory block that holds these todos.
+
+        Only the process that created the block should call this method.
+        """
+        if self._shm is not None:
+            self._shm.unlink()
+
+    @classmethod
+    def _from_shared_memory(
+        cls, shm: shared_memory.SharedMemory
+    ) -> PackedTodos:
+        packed = cls(cast(memoryview, shm.buf))
+        packed._shm = shm
+        packed._closers.append(shm)
+        return packed
+
+    def _decode(self, index: int) -> Dict[str, Any]:
+        """Decodes the fields of the todo stored in the index-th record."""
+        buffer = self._buffer
+        (
+            ident,
+            done,
+            priority,
+            has_source_line,
+            create_date,
+            done_date,
+            *string_refs,
+        ) = _RECORD.unpack_from(buffer, _HEADER.size + index * _RECORD.size)
+
+        strings: Dict[str, str] = {}
+        for name, offset, length in zip(
+            _STRING_FIELDS, string_refs[::2], string_refs[1::2]
+        ):
+            start = self._strings_start + offset
+            strings[name] = str(buffer[start : start + length], "utf-8")
+
+        return {
+            "_uuid_ident": uuid.UUID(bytes=ident),
+            "contexts": _split(strings["contexts"]),
+            "create_date": dt.date.fromordinal(create_date),
+            "desc": strings["desc"],
+            "done_date": dt.date.fromordinal(done_date) if done_date else None,
+            "done": done,
+            "epics": _split(strings["epics"]),
+            "metadata": _to_metadata(_split(strings["metadata"])),
+            "priority": cast(Priority, priority.decode()),
+            "projects": _split(strings["projects"]),
+            "_source_line": (
+                strings["source_line"] if has_source_line else None
+            ),
+        }
+
+
+def _pack(todos: Iterable[TodoProto]) -> bytes:
+    """Packs `todos` into the buffer format used by PackedTodos."""
+    records: List[bytes] = []
+    strings = _StringTable()
+    for todo in todos:
+        source_line: Optional[str] = (
+            None
+            if getattr(todo, "dirty", True)
+            else getattr(todo, "source_line", None)
+        )
+        string_refs: List[int] = []
+        for string in [
+            todo.desc,
+            _SEP.join(todo.contexts),
+            _SEP.join(todo.epics),
+            _SEP.join(todo.projects),
+            _SEP.join(item for kv in todo.metadata.items() for item in kv),
+            source_line or "",
+        ]:
+            string_refs.extend(strings.add(string))
+
+        records.append(
+            _RECORD.pack(
+                _ident_bytes(todo.ident),
+                todo.done,
+                todo.priority.encode(),
+                source_line is not None,
+                todo.create_date.toordinal(),
+                todo.done_date.toordinal() if todo.done_date else 0,
+                *string_refs,
+            )
+        )
+
+    string_data = strings.to_bytes()
+    header = _HEADER.pack(MAGIC, VERSION, len(records), len(string_data))
+    return b"".join([header, *records, string_data])
+
+
+class _StringTable:
+    """Assigns each unique string an (offset, length) in a byte string."""
+
+    def __init__(self) -> None:
+        self._refs: Dict[str, Tuple[int, int]] = {}
+        self._chunks: List[bytes] = []
+        self._size = 0
+
+    def add(self, string: str) -> Tuple[int, int]:
+        """Adds `string` to this table (unless it was already added)."""
+        ref = self._refs.get(string)
+        if ref is None:
+            data = string.encode("utf-8")
+            ref = (self._size, len(data))
+            self._refs[string] = ref
+            self._chunks.append(data)
+            self._size += len(data)
+        return ref
+
+    def to_bytes(self) -> bytes:
+        """Returns the contents of this table."""
+        return b"".join(self._chunks)
+
+
+def _ident_bytes(ident: Any) -> bytes:
+    if not isinstance(ident, uuid.UUID):
+        ident = uuid.UUID(str(ident))
+    result: bytes = ident.bytes
+    return result
+
+
+def _split(string: str) -> Tuple[str, ...]:
+    return tuple(string.split(_SEP)) if string else ()
+
+
+def _to_metadata(items: Tuple[str, ...]) -> Metadata:
+    return dict(zip(items[::2], items[1::2]))
@@ -0,0 +1,405 @@
+"""Contains the PersistentTodos class definition."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import (
+    Any,
+    Dict,
+    Final,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from .types import TodoProto
+
+
+# Each level of the trie consumes this many bits of a key's hash...
+_BITS: Final = 5
+_MASK: Final = (1 << _BITS) - 1
+# ...and keys whose (64-bit) hashes are equal end up in a collision node.
+_HASH_BITS: Final = 64
+_HASH_MASK: Final = (1 << _HASH_BITS) - 1
+
+_MISSING: Final[Any] = object()
+
+
+@dataclass(frozen=True)
+class TodoDiff:
+    """The differences between two versions of a PersistentTodos collection.
+
+    Attributes:
+        added: Keys that are only present in the newer version.
+        removed: Keys that are only present in the older version.
+        changed: Keys whose todo was replaced by a different todo object.
+    """
+
+    added: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    changed: List[str] = field(default_factory=list)
+
+    def __bool__(self) -> bool:  # noqa: D105
+        return bool(self.added or self.removed or self.changed)
+
+
+class PersistentTodos(Mapping[str, TodoProto]):
+    """An immutable mapping of keys to todos that shares structure.
+
+    Every "modifying" method (e.g. `set()` or `remove()`) returns a new
+    collection and leaves the original untouched. Since the collection is a
+    hash array mapped trie (HAMT), a modification only copies the O(log n)
+    nodes on the path to the changed key and shares every other node with
+    the original. Keeping a snapshot of a collection is therefore free (just
+    keep a reference to it), and many versions of a large collection take up
+    little more memory than one.
+
+    Todos are iterated over in an arbitrary (but fixed) order.
+    """
+
+    def __init__(self) -> None:
+        self._root: _Node = _BitmapNode(0, ())
+        self._len = 0
+
+    @classmethod
+    def from_todos(cls, todos: Iterable[TodoProto]) -> PersistentTodos:
+        """Builds a new collection that maps each todo's ident to it."""
+        leaves: Dict[Any, _Leaf] = {}
+        for todo in todos:
+            ident = todo.ident
+            leaves[ident] = _Leaf(_hash(ident), ident, todo)
+
+        result = cls()
+        if leaves:
+            result._root = _build(0, list(leaves.values()))
+            result._len = len(leaves)
+        return result
+
+    def __getitem__(self, key: str) -> TodoProto:  # noqa: D105
+        value = self._root.find(0, _hash(key), key)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value  # type: ignore[no-any-return]
+
+    def __contains__(self, key: object) -> bool:  # noqa: D105
+        return self._root.find(0, _hash(key), key) is not _MISSING
+
+    def __iter__(self) -> Iterator[str]:  # noqa: D105
+        for leaf in self._root.leaves():
+            yield leaf.key
+
+    def __len__(self) -> int:  # noqa: D105
+        return self._len
+
+    def set(self, key: str, todo: TodoProto) -> PersistentTodos:
+        """Returns a new collection in which `key` maps to `todo`."""
+        root, added = self._root.assoc(0, _hash(key), key, todo)
+        if root is self._root:
+            return self
+        return self._new(root, self._len + added)
+
+    def add(self, todo: TodoProto) -> PersistentTodos:
+        """Returns a new collection in which `todo.ident` maps to `todo`."""
+        return self.set(todo.ident, todo)
+
+    def remove(self, key: str) -> PersistentTodos:
+        """Returns a new collection that does not contain `key`.
+
+        Raises:
+            KeyError: If this collection does not contain `key`.
+        """
+        root = self._root.without(0, _hash(key), key)
+        return self._new(root or _BitmapNode(0, ()), self._len - 1)
+
+    def diff(self, newer: PersistentTodos) -> TodoDiff:
+        """Returns the changes needed to turn this collection into `newer`.
+
+        Subtrees that are shared by both collections are skipped without
+        being visited, so diffing two versions that are descended from one
+        another costs time proportional to the number of changes between
+        them (not the size of the collections).
+        """
+        result = TodoDiff()
+        _diff(self._root, newer._root, result)
+        return result
+
+    def _new(self, root: _Node, length: int) -> PersistentTodos:
+        result = PersistentTodos.__new__(PersistentTodos)
+        result._root = root
+        result._len = length
+        return result
+
+
+class _Leaf:
+    __slots__ = ("hash", "key", "value")
+
+    def __init__(self, hash_: int, key: Any, value: Any) -> None:
+        self.hash = hash_
+        self.key = key
+        self.value = value
+
+
+class _BitmapNode:
+    """A trie node whose `bitmap` records which of its 32 slots are used."""
+
+    __slots__ = ("bitmap", "slots")
+
+    def __init__(
+        self, bitmap: int, slots: Tuple[Union[_Leaf, _Node], ...]
+    ) -> None:
+        self.bitmap = bitmap
+        self.slots = slots
+
+    def find(self, shift: int, hash_: int, key: Any) -> Any:
+        bit = 1 << ((hash_ >> shift) & _MASK)
+        if not self.bitmap & bit:
+            return _MISSING
+
+        slot = self.slots[_popcount(self.bitmap & (bit - 1))]
+        if isinstance(slot, _Leaf):
+            return slot.value if slot.key == key else _MISSING
+        return slot.find(shift + _BITS, hash_, key)
+
+    def assoc(
+        self, shift: int, hash_: int, key: Any, value: Any
+    ) -> Tuple[_Node, bool]:
+        bit = 1 << ((hash_ >> shift) & _MASK)
+        index = _popcount(self.bitmap & (bit - 1))
+        if not self.bitmap & bit:
+            slots = (
+                self.slots[:index]
+                + (_Leaf(hash_, key, value),)
+                + self.slots[index:]
+            )
+            return _BitmapNode(self.bitmap | bit, slots), True
+
+        slot = self.slots[index]
+        added = False
+        new_slot: Union[_Leaf, _Node]
+        if isinstance(slot, _Leaf):
+            if slot.key == key:
+                if slot.value is value:
+                    return self, False
+                new_slot = _Leaf(hash_, key, value)
+            else:
+                new_slot = _make_node(
+                    shift + _BITS, slot, _Leaf(hash_, key, value)
+                )
+                added = True
+        else:
+            new_slot, added = slot.assoc(shift + _BITS, hash_, key, value)
+            if new_slot is slot:
+                return self, added
+
+        return self._replace(index, new_slot), added
+
+    def without(self, shift: int, hash_: int, key: Any) -> Optional[_Node]:
+        bit = 1 << ((hash_ >> shift) & _MASK)
+        if not self.bitmap & bit:
+            raise KeyError(key)
+
+        index = _popcount(self.bitmap & (bit - 1))
+        slot = self.slots[index]
+        new_slot: Union[_Leaf, _Node, None]
+        if isinstance(slot, _Leaf):
+            if slot.key != key:
+                raise KeyError(key)
+            new_slot = None
+        else:
+            new_slot = slot.without(shift + _BITS, hash_, key)
+            # Nodes that are left with a single leaf are replaced by it.
+            if new_slot is not None and len(new_slot.slots) == 1:
+                [only_slot] = new_slot.slots
+                if isinstance(only_slot, _Leaf):
+                    new_slot = only_slot
+
+        if new_slot is not None:
+            return self._replace(index, new_slot)
+        if self.bitmap == bit:
+            return None
+        slots = self.slots[:index] + self.slots[index + 1 :]
+        return _BitmapNode(self.bitmap & ~bit, slots)
+
+    def leaves(self) -> Iterator[_Leaf]:
+        for slot in self.slots:
+            if isinstance(slot, _Leaf):
+                yield slot
+            else:
+                yield from slot.leaves()
+
+    def _replace(self, index: int, slot: Union[_Leaf, _Node]) -> _BitmapNode:
+        slots = self.slots[:index] + (slot,) + self.slots[index + 1 :]
+        return _BitmapNode(self.bitmap, slots)
+
+
+class _CollisionNode:
+    """A trie node that holds leaves whose keys have the same hash."""
+
+    __slots__ = ("hash", "slots")
+
+    def __init__(self, hash_: int, slots: Tuple[_Leaf, ...]) -> None:
+        self.hash = hash_
+        self.slots = slots
+
+    def find(self, shift: int, hash_: int, key: Any) -> Any:
+        del shift
+        if hash_ == self.hash:
+            for leaf in self.slots:
+                if leaf.key == key:
+                    return leaf.value
+        return _MISSING
+
+    def assoc(
+        self, shift: int, hash_: int, key: Any, value: Any
+    ) -> Tuple[_Node, bool]:
+        if hash_ != self.hash:
+            bit = 1 << ((self.hash >> shift) & _MASK)
+            return _BitmapNode(bit, (self,)).assoc(shift, hash_, key, value)
+
+        for i, leaf in enumerate(self.slots):
+            if leaf.key == key:
+                if leaf.value is value:
+                    return self, False
+                slots = (
+                    self.slots[:i]
+                    + (_Leaf(hash_, key, value),)
+                    + self.slots[i + 1 :]
+                )
+                return _CollisionNode(hash_, slots), False
+
+        slots = self.slots + (_Leaf(hash_, key, value),)
+        return _CollisionNode(hash_, slots), True
+
+    def without(self, shift: int, hash_: int, key: Any) -> Optional[_Node]:
+        del shift
+        slots = tuple(leaf for leaf in self.slots if leaf.key != key)
+        if hash_ != self.hash or len(slots) == len(self.slots):
+            raise KeyError(key)
+        if not slots:
+            return None
+        return _CollisionNode(hash_, slots)
+
+    def leaves(self) -> Iterator[_Leaf]:
+        yield from self.slots
+
+
+_Node = Union[_BitmapNode, _CollisionNode]
+
+
+def _make_node(shift: int, leaf1: _Leaf, leaf2: _Leaf) -> _Node:
+    """Returns a new node that contains two leaves with different keys."""
+    if leaf1.hash == leaf2.hash:
+        return _CollisionNode(leaf1.hash, (leaf1, leaf2))
+
+    index1 = (leaf1.hash >> shift) & _MASK
+    index2 = (leaf2.hash >> shift) & _MASK
+    if index1 == index2:
+        child = _make_node(shift + _BITS, leaf1, leaf2)
+        return _BitmapNode(1 << index1, (child,))
+
+    slots = (leaf1, leaf2) if index1 < index2 else (leaf2, leaf1)
+    return _BitmapNode((1 << index1) | (1 << index2), slots)
+
+
+def _build(shift: int, leaves: List[_Leaf]) -> _Node:
+    """Builds a new node from scratch (i.e. without any path copying).
+
+    Pre-Conditions:
+        * `leaves` is not empty and all of its leaves have distinct keys.
+    """
+    first_hash = leaves[0].hash
+    if len(leaves) > 1 and all(leaf.hash == first_hash for leaf in leaves):
+        return _CollisionNode(first_hash, tuple(leaves))
+
+    buckets: Dict[int, List[_Leaf]] = {}
+    for leaf in leaves:
+        buckets.setdefault((leaf.hash >> shift) & _MASK, []).append(leaf)
+
+    bitmap = 0
+    slots: List[Union[_Leaf, _Node]] = []
+    for index in sorted(buckets):
+        bucket = buckets[index]
+        bitmap |= 1 << index
+        if len(bucket) == 1:
+            slots.append(bucket[0])
+        else:
+            slots.append(_build(shift + _BITS, bucket))
+    return _BitmapNode(bitmap, tuple(slots))
+
+
+def _diff(
+    old: Union[_Leaf, _Node], new: Union[_Leaf, _Node], result: TodoDiff
+) -> None:
+    """Records the differences between two subtrees in `result`."""
+    if old is new:
+        return
+
+    if (
+        isinstance(old, _Leaf)
+        and isinstance(new, _Leaf)
+        and old.key == new.key
+    ):
+        if old.value is not new.value:
+            result.changed.append(new.key)
+        return
+
+    if not (isinstance(old, _BitmapNode) and isinstance(new, _BitmapNode)):
+        _diff_items(old, new, result)
+        return
+
+    old_slots = dict(_iter_bits(old))
+    new_slots = dict(_iter_bits(new))
+    for bit in sorted(old_slots.keys() | new_slots.keys()):
+        old_slot = old_slots.get(bit)
+        new_slot = new_slots.get(bit)
+        if old_slot is None:
+            assert new_slot is not None
+            result.added.extend(leaf.key for leaf in _leaves(new_slot))
+        elif new_slot is None:
+            result.removed.extend(leaf.key for leaf in _leaves(old_slot))
+        else:
+            _diff(old_slot, new_slot, result)
+
+
+def _diff_items(
+    old: Union[_Leaf, _Node], new: Union[_Leaf, _Node], result: TodoDiff
+) -> None:
+    """Records the differences between two subtrees (the slow way)."""
+    old_items: Dict[Any, Any] = {leaf.key: leaf.value for leaf in _leaves(old)}
+    for leaf in _leaves(new):
+        old_value = old_items.pop(leaf.key, _MISSING)
+        if old_value is _MISSING:
+            result.added.append(leaf.key)
+        elif old_value is not leaf.value:
+            result.changed.append(leaf.key)
+    result.removed.extend(old_items)
+
+
+def _iter_bits(
+    node: _BitmapNode,
+) -> Iterator[Tuple[int, Union[_Leaf, _Node]]]:
+    """Yields a (bit, slot) pair for each slot used by `node`."""
+    bitmap = node.bitmap
+    for slot in node.slots:
+        bit = bitmap & -bitmap
+        yield bit, slot
+        bitmap ^= bit
+
+
+def _leaves(slot: Union[_Leaf, _Node]) -> Iterator[_Leaf]:
+    if isinstance(slot, _Leaf):
+        yield slot
+    else:
+        yield from slot.leaves()
+
+
+def _hash(key: object) -> int:
+    return hash(key) & _HASH_MASK
+
+
+def _popcount(n: int) -> int:
+    return bin(n).count("1")
@@ -0,0 +1,129 @@
+"""Contains the NextActions class definition."""
+
+from __future__ import annotations
+
+import heapq
+import itertools as it
+from typing import Dict, Generic, Iterable, List, Tuple
+
+from .types import T
+
+
+class _Entry(Generic[T]):
+    """A heap entry, which orders todos using the standard todo ordering."""
+
+    def __init__(self, todo: T, seq: int) -> None:
+        self.todo = todo
+        self.seq = seq
+        self.removed = False
+
+    def __lt__(self, other: _Entry[T]) -> bool:  # noqa: D105
+        if self.todo < other.todo:
+            return True
+        if other.todo < self.todo:
+            return False
+        return self.seq < other.seq
+
+
+class NextActions(Generic[T]):
+    """A priority queue that keeps open todos in their standard sort order.
+
+    Pushing, updating, and completing a todo are all O(log n) operations and
+    `top(k)` returns the k "best" open todos (i.e. the first k todos that
+    `sorted()` would return) in O(k log k) time, regardless of how many
+    todos are queued.
+
+    Stale heap entries (left behind by updates / completions) are discarded
+    lazily and the heap is rebuilt whenever they start to outnumber the live
+    entries.
+    """
+
+    def __init__(self, todos: Iterable[T] = ()) -> None:
+        self._heap: List[_Entry[T]] = []
+        self._entries: Dict[str, _Entry[T]] = {}
+        self._counter = it.count()
+
+        for todo in todos:
+            if todo.done:
+                continue
+
+            entry = _Entry(todo, next(self._counter))
+            self._remove_entry(todo.ident)
+            self._entries[todo.ident] = entry
+            self._heap.append(entry)
+
+        self._rebuild()
+
+    def __contains__(self, ident: object) -> bool:  # noqa: D105
+        return ident in self._entries
+
+    def __len__(self) -> int:  # noqa: D105
+        return len(self._entries)
+
+    def push(self, todo: T) -> None:
+        """Adds `todo` to this queue (or replaces an older version of it).
+
+        Pushing a done todo simply removes any older version of it from this
+        queue.
+        """
+        self._remove_entry(todo.ident)
+        if todo.done:
+            return
+
+        entry = _Entry(todo, next(self._counter))
+        self._entries[todo.ident] = entry
+        heapq.heappush(self._heap, entry)
+
+    def update(self, ident: str, todo: T) -> None:
+        """Replaces the todo identified by `ident` with `todo`.
+
+        Todos must never be modified in-place while they are queued (doing so
+        would corrupt the heap). Use `todo.new(...)` to create the modified
+        todo and then pass it to this method instead.
+        """
+        self._remove_entry(ident)
+        self.push(todo)
+
+    def complete(self, ident: str) -> None:
+        """Removes the todo identified by `ident` from this queue.
+
+        Raises:
+            KeyError: If no todo with the given ident has been queued.
+        """
+        if not self._remove_entry(ident):
+            raise KeyError(ident)
+
+    def top(self, k: int) -> List[T]:
+        """Returns the (at most) k todos that sort before all other todos."""
+        heap = self._heap
+        result: List[T] = []
+        if not heap or k <= 0:
+            return result
+
+        # Walk the heap as a tree: the next smallest entry is always a child
+        # of an entry that we have already visited.
+        frontier: List[Tuple[_Entry[T], int]] = [(heap[0], 0)]
+        while frontier and len(result) < k:
+            entry, idx = heapq.heappop(frontier)
+            if not entry.removed:
+                result.append(entry.todo)
+
+            for child_idx in (2 * idx + 1, 2 * idx + 2):
+                if child_idx < len(heap):
+                    heapq.heappush(frontier, (heap[child_idx], child_idx))
+
+        return result
+
+    def _remove_entry(self, ident: str) -> bool:
+        entry = self._entries.pop(ident, None)
+        if entry is None:
+            return False
+
+        entry.removed = True
+        if len(self._heap) > 2 * len(self._entries) + 32:
+            self._rebuild()
+        return True
+
+    def _rebuild(self) -> None:
+        self._heap = [entry for entry in self._heap if not entry.removed]
+        heapq.heapify(self._heap)
@@ -0,0 +1,324 @@
+"""Contains the SearchIndex class definition."""
+
+from __future__ import annotations
+
+from collections import defaultdict
+import heapq
+import itertools as it
+import string
+from typing import (
+    DefaultDict,
+    Dict,
+    Final,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
+
+from .tags import is_any_tag
+from .types import TodoProto
+
+
+# Scores given to a word that matches a query term...
+EXACT_SCORE: Final = 1.0  # ...exactly.
+PREFIX_SCORE: Final = 0.8  # ...as a prefix.
+SUBSTRING_SCORE: Final = 0.6  # ...as a substring.
+FUZZY_SCORE: Final = 0.5  # ...fuzzily (scaled by trigram similarity).
+
+# The minimum trigram similarity of a fuzzy match.
+MIN_SIMILARITY: Final = 0.5
+
+_STRIP_CHARS: Final = string.punctuation + string.whitespace
+
+
+class SearchIndex:
+    """An inverted index over the words in todo descriptions.
+
+    Words that are tags (i.e. projects, contexts, epics, and metadata, as
+    recognized by `magodo.tags`) are not indexed. Each distinct word is also
+    broken into trigrams, which are used to find substring matches (e.g.
+    'port' matches 'report') and fuzzy matches (e.g. 'groceris' matches
+    'groceries') without scanning the whole vocabulary.
+
+    Query terms that are only one character long only match whole words
+    (since they would otherwise match a large fraction of all todos). Todos
+    can be added / removed incrementally.
+    """
+
+    def __init__(self) -> None:
+        self._todos: Dict[str, TodoProto] = {}
+        # Todos are tracked internally using sequence numbers (which record
+        # the order todos were added in and are much cheaper to hash than
+        # idents).
+        self._seqs: Dict[str, int] = {}
+        self._idents: Dict[int, str] = {}
+        self._todo_words: Dict[int, Set[str]] = {}
+        self._next_seq = 0
+        # word -> seqs of the todos that contain that word
+        self._words: DefaultDict[str, Set[int]] = defaultdict(set)
+        # trigram / 2-char prefix -> words that contain that trigram / prefix
+        self._trigrams: DefaultDict[str, Set[str]] = defaultdict(set)
+        self._prefixes: DefaultDict[str, Set[str]] = defaultdict(set)
+        self._num_trigrams: Dict[str, int] = {}
+
+    @classmethod
+    def from_todos(cls, todos: Iterable[TodoProto]) -> SearchIndex:
+        """Builds a new SearchIndex from an iterable of todos."""
+        index = cls()
+        for todo in todos:
+            index.add(todo)
+        return index
+
+    def __contains__(self, ident: object) -> bool:  # noqa: D105
+        return ident in self._todos
+
+    def __getitem__(self, ident: str) -> TodoProto:  # noqa: D105
+        return self._todos[ident]
+
+    def __len__(self) -> int:  # noqa: D105
+        return len(self._todos)
+
+    def add(self, todo: TodoProto) -> None:
+        """Adds `todo` to this index (or replaces an older version of it)."""
+        ident = todo.ident
+        if ident in self._todos:
+            self.remove(ident)
+
+        words = set(_tokenize(todo.desc))
+        seq = self._next_seq
+        self._next_seq += 1
+        self._todos[ident] = todo
+        self._seqs[ident] = seq
+        self._idents[seq] = ident
+        self._todo_words[seq] = words
+        for word in words:
+            seqs = self._words[word]
+            if not seqs:
+                self._add_word(word)
+            seqs.add(seq)
+
+    def update(self, ident: str, todo: TodoProto) -> None:
+        """Replaces the todo identified by `ident` with `todo`."""
+        self.remove(ident)
+        self.add(todo)
+
+    def remove(self, ident: str) -> None:
+        """Removes the todo identified by `ident` from this index.
+
+        Raises:
+            KeyError: If no todo with the given ident has been indexed.
+        """
+        del self._todos[ident]
+        seq = self._seqs.pop(ident)
+        del self._idents[seq]
+        for word in self._todo_words.pop(seq):
+            seqs = self._words[word]
+            seqs.discard(seq)
+            if not seqs:
+                del self._words[word]
+                self._remove_word(word)
+
+    def search(self, query: str, *, limit: int = None) -> List[str]:
+        """Returns the idents of the todos that best match `query`.
+
+        Every term in `query` must match at least one word of a todo's
+        description for that todo to be returned. Todos are ranked by the sum
+        of their best score for each query term (ties are broken using the
+        order in which todos were added).
+        """
+        return [ident for ident, _ in self.scored_search(query, limit=limit)]
+
+    def scored_search(
+        self, query: str, *, limit: int = None
+    ) -> List[Tuple[str, float]]:
+        """Like `search()`, but returns (ident, score) pairs.
+
+        Matching todos are grouped by their total score using set
+        operations (instead of being scored one at a time), so when `limit`
+        is given only the best groups need to be ranked. A todo's score for
+        each term is the score of the best word it matches with.
+        """
+        terms = list(dict.fromkeys(_tokenize(query, skip_tags=False)))
+        if not terms or (limit is not None and limit <= 0):
+            return []
+
+        all_term_levels: List[List[Tuple[float, Set[int]]]] = []
+        for term in terms:
+            term_levels = self._score_levels(term)
+            if not term_levels:
+                return []
+            all_term_levels.append(term_levels)
+
+        # We start with the rarest term to keep the intersections cheap.
+        all_term_levels.sort(
+            key=lambda term_levels: sum(len(seqs) for _, seqs in term_levels)
+        )
+        groups = _group_by_total(all_term_levels)
+
+        idents = self._idents
+        result: List[Tuple[str, float]] = []
+        for total in sorted(groups, reverse=True):
+            seqs = groups[total]
+            if limit is None:
+                ranked = sorted(seqs)
+            else:
+                needed = limit - len(result)
+                ranked = _smallest(seqs, needed, self._next_seq)
+            result.extend((idents[seq], total) for seq in ranked)
+            if limit is not None and len(result) >= limit:
+                break
+        return result
+
+    def _score_levels(self, term: str) -> List[Tuple[float, Set[int]]]:
+        """Groups the todos that match `term` by their score for `term`.
+
+        Returns:
+            A list of (score, seqs) pairs, ordered from best to worst score.
+            Each todo only belongs to the group of its best score.
+        """
+        words_by_score: DefaultDict[float, List[str]] = defaultdict(list)
+        for word, score in self._matching_words(term):
+            words_by_score[score].append(word)
+
+        scores = sorted(words_by_score, reverse=True)
+        result: List[Tuple[float, Set[int]]] = []
+        better_seqs: Set[int] = set()
+        for i, score in enumerate(scores):
+            postings = [self._words[word] for word in words_by_score[score]]
+            # NOTE: We never modify these sets, so a single posting set can
+            #   be used as is.
+            seqs = (
+                postings[0] if len(postings) == 1 else set().union(*postings)
+            )
+            if better_seqs:
+                seqs = seqs - better_seqs
+            if seqs:
+                result.append((score, seqs))
+            if i + 1 < len(scores):
+                better_seqs = better_seqs | seqs
+        return result
+
+    def _matching_words(self, term: str) -> List[Tuple[str, float]]:
+        """Returns every indexed word that matches `term` (and its score)."""
+        if len(term) == 1:
+            return [(term, EXACT_SCORE)] if term in self._words else []
+
+        if len(term) == 2:
+            return [
+                (word, EXACT_SCORE if word == term else PREFIX_SCORE)
+                for word in self._prefixes.get(term, ())
+            ]
+
+        term_trigrams = _trigrams(term)
+        shared: DefaultDict[str, int] = defaultdict(int)
+        for trigram in term_trigrams:
+            for word in self._trigrams.get(trigram, ()):
+                shared[word] += 1
+
+        matches = []
+        for word, num_shared in shared.items():
+            if word == term:
+                matches.append((word, EXACT_SCORE))
+            elif word.startswith(term):
+                matches.append((word, PREFIX_SCORE))
+            elif term in word:
+                matches.append((word, SUBSTRING_SCORE))
+            else:
+                num_trigrams = len(term_trigrams) + self._num_trigrams[word]
+                similarity = num_shared / (num_trigrams - num_shared)
+                if similarity >= MIN_SIMILARITY:
+                    matches.append((word, FUZZY_SCORE * similarity))
+        return matches
+
+    def _add_word(self, word: str) -> None:
+        trigrams = _trigrams(word)
+        self._num_trigrams[word] = len(trigrams)
+        for trigram in trigrams:
+            self._trigrams[trigram].add(word)
+        if len(word) >= 2:
+            self._prefixes[word[:2]].add(word)
+
+    def _remove_word(self, word: str) -> None:
+        del self._num_trigrams[word]
+        for trigram in _trigrams(word):
+            _discard(self._trigrams, trigram, word)
+        if len(word) >= 2:
+            _discard(self._prefixes, word[:2], word)
+
+
+def _tokenize(text: str, *, skip_tags: bool = True) -> List[str]:
+    """Splits `text` into normalized (i.e. lowercased) words.
+
+    Args:
+        text: The text to split into words.
+        skip_tags: If this option is set, tags (e.g. '+project' or
+          'key:value') are not included in the result.
+    """
+    result = []
+    for word in text.split():
+        if skip_tags and is_any_tag(word):
+            continue
+
+        word = word.strip(_STRIP_CHARS).lower()
+        if word:
+            result.append(word)
+    return result
+
+
+def _group_by_total(
+    all_term_levels: List[List[Tuple[float, Set[int]]]]
+) -> Dict[float, Set[int]]:
+    """Groups the todos that match every term by their total score.
+
+    Args:
+        all_term_levels: The result of `SearchIndex._score_levels()` for each
+          query term.
+    """
+    groups: Dict[float, Set[int]] = {}
+    # Each stack entry is a (number of terms, total score, seqs) triple,
+    # where None stands for "every todo".
+    stack: List[Tuple[int, float, Optional[Set[int]]]] = [(0, 0.0, None)]
+    while stack:
+        depth, total, seqs = stack.pop()
+        if depth == len(all_term_levels):
+            assert seqs is not None
+            group = groups.get(total)
+            groups[total] = seqs if group is None else group | seqs
+            continue
+
+        for score, level_seqs in all_term_levels[depth]:
+            next_seqs = level_seqs if seqs is None else seqs & level_seqs
+            if next_seqs:
+                stack.append((depth + 1, total + score, next_seqs))
+    return groups
+
+
+def _smallest(seqs: Set[int], n: int, end: int) -> List[int]:
+    """Returns the `n` smallest elements of `seqs` (in ascending order).
+
+    Args:
+        seqs: A set of sequence numbers, all of which are less than `end`.
+        n: The number of elements to return.
+        end: An upper bound for the elements of `seqs`.
+    """
+    if n >= len(seqs):
+        return sorted(seqs)
+
+    # When `seqs` is dense, counting up from zero finds its smallest elements
+    # after about n * end / len(seqs) (cheap) membership tests.
+    if n * end <= len(seqs) ** 2:
+        return list(it.islice(filter(seqs.__contains__, range(end)), n))
+    return heapq.nsmallest(n, seqs)
+
+
+def _discard(index: DefaultDict[str, Set[str]], key: str, word: str) -> None:
+    words = index[key]
+    words.discard(word)
+    if not words:
+        del index[key]
+
+
+def _trigrams(word: str) -> Set[str]:
+    return {word[i : i + 3] for i in range(len(word) - 2)}
@@ -0,0 +1,149 @@
+"""Contains the TodoStats class definition."""
+
+from __future__ import annotations
+
+from collections import Counter
+from dataclasses import dataclass
+import datetime as dt
+from typing import Dict, Iterable, Optional
+
+from .types import TodoProto
+
+
+@dataclass(frozen=True)
+class StatsSnapshot:
+    """A point-in-time copy of the aggregates maintained by a TodoStats.
+
+    Weeks are named using their ISO year and week number (e.g. '2023-W05').
+
+    Attributes:
+        total: The number of todos.
+        done: The number of todos that are marked done.
+        projects: Maps each project to the number of todos tagged with it.
+        contexts: Maps each context to the number of todos tagged with it.
+        epics: Maps each epic to the number of todos tagged with it.
+        priorities: Maps each priority to the number of todos that have it.
+        created_per_week: Maps each week to the number of todos created
+          during that week.
+        done_per_week: Maps each week to the number of todos completed
+          during that week.
+    """
+
+    total: int
+    done: int
+    projects: Dict[str, int]
+    contexts: Dict[str, int]
+    epics: Dict[str, int]
+    priorities: Dict[str, int]
+    created_per_week: Dict[str, int]
+    done_per_week: Dict[str, int]
+
+    def completion_rate(self, week: str) -> Optional[float]:
+        """Returns the ratio of todos done to todos created during `week`.
+
+        Returns None if no todos were created during `week`.
+        """
+        created = self.created_per_week.get(week, 0)
+        if not created:
+            return None
+        return self.done_per_week.get(week, 0) / created
+
+
+class TodoStats:
+    """Aggregate statistics that are kept up-to-date as todos change.
+
+    Instead of scanning every todo whenever statistics are requested, a
+    TodoStats object is told about each todo that is added, updated, or
+    removed and adjusts its counters accordingly, so each change costs time
+    proportional to the number of tags on the todos involved (and not the
+    number of todos being tracked).
+    """
+
+    def __init__(self) -> None:
+        self._todos: Dict[str, TodoProto] = {}
+        self._done = 0
+        self._projects: Counter[str] = Counter()
+        self._contexts: Counter[str] = Counter()
+        self._epics: Counter[str] = Counter()
+        self._priorities: Counter[str] = Counter()
+        self._created_per_week: Counter[str] = Counter()
+        self._done_per_week: Counter[str] = Counter()
+
+    @classmethod
+    def from_todos(cls, todos: Iterable[TodoProto]) -> TodoStats:
+        """Builds a new TodoStats object from an iterable of todos."""
+        stats = cls()
+        for todo in todos:
+            stats.add(todo)
+        return stats
+
+    def __contains__(self, ident: object) -> bool:  # noqa: D105
+        return ident in self._todos
+
+    def __len__(self) -> int:  # noqa: D105
+        return len(self._todos)
+
+    def add(self, todo: TodoProto) -> None:
+        """Counts `todo` (replacing any older version of it)."""
+        ident = todo.ident
+        if ident in self._todos:
+            self.remove(ident)
+
+        self._todos[ident] = todo
+        self._count(todo, 1)
+
+    def update(self, ident: str, todo: TodoProto) -> None:
+        """Replaces the todo identified by `ident` with `todo`."""
+        self.remove(ident)
+        self.add(todo)
+
+    def remove(self, ident: str) -> None:
+        """Stops counting the todo identified by `ident`.
+
+        Raises:
+            KeyError: If no todo with the given ident is being counted.
+        """
+        self._count(self._todos.pop(ident), -1)
+
+    def snapshot(self) -> StatsSnapshot:
+        """Returns a copy of the current statistics."""
+        return StatsSnapshot(
+            total=len(self._todos),
+            done=self._done,
+            projects=dict(self._projects),
+            contexts=dict(self._contexts),
+            epics=dict(self._epics),
+            priorities=dict(self._priorities),
+            created_per_week=dict(self._created_per_week),
+            done_per_week=dict(self._done_per_week),
+        )
+
+    def _count(self, todo: TodoProto, delta: int) -> None:
+        """Adds `delta` to every counter that `todo` contributes to."""
+        for counter, keys in [
+            (self._projects, todo.projects),
+            (self._contexts, todo.contexts),
+            (self._epics, todo.epics),
+            (self._priorities, (todo.priority,)),
+            (self._created_per_week, (_week(todo.create_date),)),
+        ]:
+            for key in keys:
+                _add(counter, key, delta)
+
+        if todo.done:
+            self._done += delta
+            if todo.done_date is not None:
+                _add(self._done_per_week, _week(todo.done_date), delta)
+
+
+def _add(counter: Counter[str], key: str, delta: int) -> None:
+    """Adds `delta` to `counter[key]` (dropping keys that reach zero)."""
+    count = counter[key] + delta
+    if count:
+        counter[key] = count
+    else:
+        del counter[key]
+
+
+def _week(date: dt.date) -> str:
+    return date.strftime("%G-W%V")
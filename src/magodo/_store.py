@@ -0,0 +1,156 @@
+"""Contains the TodoStore class definition."""
+
+from __future__ import annotations
+
+from contextlib import contextmanager
+import threading
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional
+
+from .types import TodoProto
+
+
+class TodoSnapshot(Mapping[str, TodoProto]):
+    """An immutable view of a TodoStore's todos (keyed by todo ident).
+
+    Todos are iterated over in the order they were added to the store (a
+    todo that replaced another todo counts as newly added).
+
+    Attributes:
+        version: The number of batches committed to the store before this
+          snapshot was taken.
+    """
+
+    def __init__(self, todos: Dict[str, TodoProto], version: int) -> None:
+        self._todos = todos
+        self.version = version
+
+    def __getitem__(self, ident: str) -> TodoProto:  # noqa: D105
+        return self._todos[ident]
+
+    def __iter__(self) -> Iterator[str]:  # noqa: D105
+        return iter(self._todos)
+
+    def __len__(self) -> int:  # noqa: D105
+        return len(self._todos)
+
+    def todos(self) -> List[TodoProto]:
+        """Returns all todos in this snapshot."""
+        return list(self._todos.values())
+
+    def to_dict(self) -> Dict[str, TodoProto]:
+        """Returns a (shallow) copy of this snapshot as a dictionary."""
+        return dict(self._todos)
+
+
+class TodoBatch:
+    """A set of changes that is applied to a TodoStore all at once.
+
+    The store's todos are only copied once a batch makes its first change,
+    so each batch costs a single copy no matter how many changes it makes.
+    """
+
+    def __init__(self, snapshot: TodoSnapshot) -> None:
+        self.snapshot = snapshot
+        self._todos: Optional[Dict[str, TodoProto]] = None
+
+    @property
+    def changed(self) -> bool:
+        """Has this batch made any changes yet?"""
+        return self._todos is not None
+
+    def add(self, todo: TodoProto) -> None:
+        """Adds `todo` to the store (or replaces an older version of it)."""
+        self._get_todos()[todo.ident] = todo
+
+    def update(self, ident: str, todo: TodoProto) -> None:
+        """Replaces the todo identified by `ident` with `todo`.
+
+        Raises:
+            KeyError: If the store has no todo with the given ident.
+        """
+        todos = self._get_todos()
+        del todos[ident]
+        todos[todo.ident] = todo
+
+    def remove(self, ident: str) -> None:
+        """Removes the todo identified by `ident` from the store.
+
+        Raises:
+            KeyError: If the store has no todo with the given ident.
+        """
+        del self._get_todos()[ident]
+
+    def new_snapshot(self) -> Optional[TodoSnapshot]:
+        """Returns the snapshot that results from this batch's changes.
+
+        Returns None if this batch has not made any changes.
+        """
+        if self._todos is None:
+            return None
+        return TodoSnapshot(self._todos, version=self.snapshot.version + 1)
+
+    def _get_todos(self) -> Dict[str, TodoProto]:
+        if self._todos is None:
+            self._todos = self.snapshot.to_dict()
+        return self._todos
+
+
+class TodoStore:
+    """A collection of todos that can be shared safely between threads.
+
+    Readers call `snapshot()` to get an immutable view of the store, which
+    never requires taking a lock (a snapshot is published by replacing a
+    single reference), so read throughput scales with the number of threads.
+    Writers apply their changes using `batch()`, which is serialized by a
+    lock and publishes a new snapshot once the batch is done (i.e. readers
+    either see all of a batch's changes or none of them).
+
+    NOTE: The todos themselves are shared by every snapshot that contains
+      them, so they must never be changed in-place. Use `todo.new()` to
+      create a changed copy of a todo instead.
+
+    Args:
+        todos: The store's initial todos.
+    """
+
+    def __init__(self, todos: Iterable[TodoProto] = ()) -> None:
+        self._lock = threading.Lock()
+        self._snapshot = TodoSnapshot(
+            {todo.ident: todo for todo in todos}, version=0
+        )
+
+    def __len__(self) -> int:  # noqa: D105
+        return len(self._snapshot)
+
+    def snapshot(self) -> TodoSnapshot:
+        """Returns a consistent, immutable view of this store's todos."""
+        return self._snapshot
+
+    @contextmanager
+    def batch(self) -> Iterator[TodoBatch]:
+        """Applies a batch of changes atomically.
+
+        If the body of the `with` statement raises an exception, none of the
+        batch's changes are applied.
+        """
+        with self._lock:
+            batch = TodoBatch(self._snapshot)
+            yield batch
+            new_snapshot = batch.new_snapshot()
+            if new_snapshot is not None:
+                self._snapshot = new_snapshot
+
+    def add(self, todo: TodoProto) -> None:
+        """Adds `todo` to this store (using a batch of one change)."""
+        with self.batch() as batch:
+            batch.add(todo)
+
+    def update(self, ident: str, todo: TodoProto) -> None:
+        """Replaces the todo identified by `ident` with `todo`."""
+        with self.batch() as batch:
+            batch.update(ident, todo)
+
+    def remove(self, ident: str) -> None:
+        """Removes the todo identified by `ident` from this store."""
+        with self.batch() as batch:
+            batch.remove(ident)
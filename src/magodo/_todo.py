@@ -8,14 +8,35 @@ import abc
 import datetime as dt
 from functools import total_ordering
 import re
-from typing import Any, Dict, Final, Generic, List, Optional, Tuple, cast
+from typing import (
+    Any,
+    ClassVar,
+    Dict,
+    Final,
+    FrozenSet,
+    Generic,
+    Iterable,
+    List,
+    Match,
+    Optional,
+    Tuple,
+    cast,
+)
 import uuid
 
 from eris import ErisError, Err, Ok, Result
 from metaman import cname
 
 from ._common import DEFAULT_PRIORITY, PUNCTUATION
+from .clock import Clock, hhmm, now as clock_now
 from .dates import from_date, to_date
+from .schema import (
+    DEFAULT_SCHEMA,
+    MetadataSchema,
+    decode_int,
+    decode_metadata,
+    decode_time,
+)
 from .tags import (
     CONTEXT_PREFIX,
     EPIC_PREFIX,
@@ -23,7 +44,7 @@ from .tags import (
     is_metadata_tag,
     is_prefix_tag,
 )
-from .types import Metadata, Priority, T
+from .types import Metadata, Priority, T, TodoProto
 
 
 RE_DATE: Final = r"[1-9][0-9][0-9][0-9]-[0-1][0-9]-[0-3][0-9]"
@@ -38,21 +59,114 @@ RE_TODO: Final = r"""
 """.format(
     RE_DATE
 )
+_TODO_PATTERN: Final = re.compile(RE_TODO, re.VERBOSE)
+
+# The names of the attributes that every todo's line is built from.
+TODO_FIELDS: Final = frozenset(
+    [
+        "contexts",
+        "create_date",
+        "desc",
+        "done_date",
+        "done",
+        "epics",
+        "metadata",
+        "priority",
+        "projects",
+    ]
+)
+
+
+# Decoders whose raw values sort the same way as their typed values, so long
+# as both raw values have the same length (e.g. '0930' and '1015', but not
+# '9' and '10').
+_FIXED_WIDTH_DECODERS: Final = frozenset([decode_int, decode_time])
 
 
 class TodoMixin(Generic[T], abc.ABC):
     """Implements standard Todo-like behaviors.."""
 
+    # The line this todo was parsed from (if this todo has not been changed
+    # since it was parsed).
+    source_line: Optional[str] = None
+    # Determines how this todo's metadata values are decoded.
+    metadata_schema: ClassVar[MetadataSchema] = DEFAULT_SCHEMA
+    # The clock used to generate default dates / times for this class's todos
+    # (see `magodo.clock`). Assign a function to this attribute to override
+    # the system clock for every todo of a given class.
+    clock: ClassVar[Optional[Clock]] = None
+    # The metadata keys whose raw values can be compared directly when they
+    # have the same width (computed from `metadata_schema` when each todo
+    # class is defined).
+    _fixed_width_keys: ClassVar[FrozenSet[str]] = frozenset()
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        cls._fixed_width_keys = frozenset(
+            key
+            for key, decode in cls.metadata_schema.items()
+            if decode in _FIXED_WIDTH_DECODERS
+        )
+
     @property
     def ident(self) -> str:
         """Unique identifier."""
         key = "_uuid_ident"
-        if not hasattr(self, key):
-            setattr(self, key, uuid.uuid4())
+        result: str
+        try:
+            result = self.__dict__[key]
+        except KeyError:
+            # Since dict.setdefault() is atomic, two threads that race to
+            # generate this todo's ident are guaranteed to agree on it.
+            result = self.__dict__.setdefault(key, uuid.uuid4())
+        return result
+
+    @property
+    def typed_metadata(self: T) -> Dict[str, Any]:
+        """This todo's metadata values, decoded using `metadata_schema`.
 
-        result: str = getattr(self, key)
+        Only keys that are part of `metadata_schema` (and whose values can be
+        decoded) are included. The decoded values are cached until any of the
+        raw values they were decoded from change.
+        """
+        metadata = self.metadata
+        schema: MetadataSchema = getattr(
+            self, "metadata_schema", DEFAULT_SCHEMA
+        )
+        raw_values = tuple((key, metadata.get(key)) for key in schema)
+        cache = self.__dict__.get("_typed_metadata_cache")
+        if cache is not None and cache[0] == raw_values:
+            cached_result: Dict[str, Any] = cache[1]
+            return cached_result
+
+        result = decode_metadata(metadata, schema)
+        self.__dict__["_typed_metadata_cache"] = (raw_values, result)
         return result
 
+    @property
+    def dirty(self) -> bool:
+        """Would this todo's line differ from the line it was parsed from?
+
+        Todos that were not parsed from a line are always dirty.
+
+        NOTE: Changes made to a todo's metadata dictionary in-place are NOT
+          detected. Use `new()` (or assign a new dictionary) instead.
+        """
+        return self.source_line is None
+
+    def to_source_line(self) -> str:
+        """Converts this todo to a line (reusing its source line if possible).
+
+        The line this todo was parsed from is returned verbatim if this todo
+        has not changed since it was parsed. Otherwise, this method is
+        equivalent to `to_line()`.
+        """
+        source_line = self.source_line
+        if self.dirty or source_line is None:
+            line: str = cast(TodoProto, self).to_line()
+            return line
+        return source_line
+
     def __repr__(self: T) -> str:  # noqa: D105
         kwargs: Dict[str, Any] = {}
 
@@ -129,27 +243,41 @@ class TodoMixin(Generic[T], abc.ABC):
             if self.done_date != other.done_date:
                 return self.done_date < other.done_date
             elif (
-                (self_dtime := self.metadata.get("dtime", None))
-                and (other_dtime := other.metadata.get("dtime", None))
+                (self_dtime := self.metadata.get("dtime"))
+                and (other_dtime := other.metadata.get("dtime"))
                 and self_dtime != other_dtime
+                and (
+                    dtime_lt := _metadata_lt(
+                        self, other, "dtime", self_dtime, other_dtime
+                    )
+                )
+                is not None
             ):
-                return self_dtime < other_dtime
+                return dtime_lt
 
         if self.create_date and other.create_date:
             if self.create_date == other.create_date:
                 if (
-                    (self_ctime := self.metadata.get("ctime", None))
-                    and (other_ctime := other.metadata.get("ctime", None))
+                    (self_ctime := self.metadata.get("ctime"))
+                    and (other_ctime := other.metadata.get("ctime"))
                     and self_ctime != other_ctime
+                    and (
+                        ctime_lt := _metadata_lt(
+                            self, other, "ctime", self_ctime, other_ctime
+                        )
+                    )
+                    is not None
                 ):
-                    return self_ctime < other_ctime
+                    return ctime_lt
             else:
                 return self.create_date < other.create_date
 
-        if (self_id := self.metadata.get("id", None)) and (
-            other_id := other.metadata.get("id", None)
+        if (
+            (self_id := self.metadata.get("id"))
+            and (other_id := other.metadata.get("id"))
+            and self_id != other_id
         ):
-            return self_id < other_id
+            return bool(_metadata_lt(self, other, "id", self_id, other_id))
 
         return self.desc < other.desc
 
@@ -158,6 +286,16 @@ class TodoMixin(Generic[T], abc.ABC):
 class Todo(TodoMixin):
     """Represents a single task in a todo list."""
 
+    contexts: Tuple[str, ...]
+    create_date: dt.date
+    desc: str
+    done_date: Optional[dt.date]
+    done: bool
+    epics: Tuple[str, ...]
+    metadata: Metadata
+    priority: Priority
+    projects: Tuple[str, ...]
+
     def __init__(
         self,
         desc: str,
@@ -171,34 +309,42 @@ class Todo(TodoMixin):
         priority: Priority = DEFAULT_PRIORITY,
         projects: Tuple[str, ...] = (),
     ):
-        if create_date is None:
-            create_date = dt.date.today()
-
         if metadata is None:
             metadata = {}
 
-        if done and done_date is None:
-            done_date = dt.date.today()
-
-        time_keys = ["ctime"]
-        if done:
-            time_keys.append("dtime")
-
-        for key in time_keys:
-            if key not in metadata:
-                now = dt.datetime.now()
-                hhmm = f"{now.hour:0>2}{now.minute:0>2}"
-                metadata[key] = hhmm
-
-        self.contexts = tuple(sorted(contexts))
-        self.create_date = create_date
-        self.desc = desc
-        self.done_date = done_date
-        self.done = done
-        self.epics = tuple(sorted(epics))
-        self.metadata = metadata
-        self.priority = priority
-        self.projects = tuple(sorted(projects))
+        # We only read the clock if we need to (and then only once).
+        if (
+            create_date is None
+            or (done and done_date is None)
+            or _needs_time_metadata(metadata, done)
+        ):
+            now = clock_now(type(self).clock)
+            if create_date is None:
+                create_date = now.date()
+            if done and done_date is None:
+                done_date = now.date()
+            _add_time_metadata(metadata, done, now)
+
+        # We bypass __setattr__() here, since a new todo has no source line
+        # that could be out-of-date.
+        self.__dict__.update(
+            contexts=_sorted_tuple(contexts),
+            create_date=create_date,
+            desc=desc,
+            done_date=done_date,
+            done=done,
+            epics=_sorted_tuple(epics),
+            metadata=metadata,
+            priority=priority,
+            projects=_sorted_tuple(projects),
+        )
+
+    def __setattr__(self, name: str, value: Any) -> None:  # noqa: D105
+        # Changing any field after this todo was constructed means that our
+        # source line is now out-of-date.
+        if name in TODO_FIELDS:
+            self.__dict__["source_line"] = None
+        super().__setattr__(name, value)
 
     @classmethod
     def from_line(cls, line: str) -> Result[Todo, ErisError]:
@@ -207,9 +353,10 @@ class Todo(TodoMixin):
         Args:
             line: The line to use to construct our new Todo object.
         """
+        source_line = line.rstrip("\r\n")
         line = line.strip()
 
-        re_todo_match = re.match(RE_TODO, line, re.VERBOSE)
+        re_todo_match = _TODO_PATTERN.match(line)
         if re_todo_match is None:
             return Err(
                 f"The provided string ({line!r}) does not appear to properly"
@@ -217,55 +364,9 @@ class Todo(TodoMixin):
                 " https://github.com/todotxt/todo.txt for the specification."
             )
 
-        done: bool = False
-        if re_todo_match.group("x"):
-            done = True
-
-        priority: Priority = DEFAULT_PRIORITY
-        if grp := re_todo_match.group("priority"):
-            priority = cast(Priority, grp)
-
-        create_date: Optional[dt.date] = None
-        if grp := re_todo_match.group("create_date"):
-            create_date = to_date(grp)
-
-        done_date: Optional[dt.date] = None
-        if grp := re_todo_match.group("done_date"):
-            done_date = to_date(grp)
-
+        done, priority, create_date, done_date = _parse_header(re_todo_match)
         desc = re_todo_match.group("desc")
-        all_words = desc.split(" ")
-
-        project_list: List[str] = []
-        context_list: List[str] = []
-        epics_list: List[str] = []
-        for some_list, prefix in [
-            (project_list, PROJECT_PREFIX),
-            (context_list, CONTEXT_PREFIX),
-            (epics_list, EPIC_PREFIX),
-        ]:
-            for word in all_words:
-                if is_prefix_tag(prefix, word):
-                    value = word[len(prefix) :]
-                    value = _clean_value(value)
-                    if value not in some_list:
-                        some_list.append(value)
-
-        projects = tuple(project_list)
-        contexts = tuple(context_list)
-        epics = tuple(epics_list)
-
-        metadata: Metadata = {}
-        for word in all_words:
-            if is_metadata_tag(word):
-                kv = word.split(":", maxsplit=1)
-                key, value = kv
-                value = _clean_value(value)
-
-                if key in metadata:
-                    continue
-
-                metadata[key] = value
+        projects, contexts, epics, metadata = _parse_desc(desc)
 
         todo = cls(
             contexts=contexts,
@@ -278,6 +379,7 @@ class Todo(TodoMixin):
             priority=priority,
             projects=projects,
         )
+        todo.source_line = source_line
         return Ok(todo)
 
     def to_line(self) -> str:
@@ -307,10 +409,12 @@ class Todo(TodoMixin):
         done_date = kwargs.get("done_date", self.done_date)
         done = kwargs.get("done", self.done)
         epics = kwargs.get("epics", self.epics)
-        metadata = kwargs.get("metadata", self.metadata)
+        # We copy the metadata dictionary, since it would otherwise be shared
+        # with (and could be changed by) the new todo.
+        metadata = dict(kwargs.get("metadata", self.metadata))
         priority: Priority = kwargs.get("priority", self.priority)
         projects = kwargs.get("projects", self.projects)
-        return Todo(
+        todo = Todo(
             contexts=contexts,
             create_date=create_date,
             desc=desc,
@@ -321,6 +425,181 @@ class Todo(TodoMixin):
             priority=priority,
             projects=projects,
         )
+        if not kwargs:
+            todo.source_line = self.source_line
+        return todo
+
+
+def _metadata_lt(
+    todo: TodoProto,
+    other: TodoProto,
+    key: str,
+    value: str,
+    other_value: str,
+) -> Optional[bool]:
+    """Compares two different `key` metadata values of todos being sorted.
+
+    Typed values are compared when both values can be decoded (and raw
+    values are compared otherwise).
+
+    Args:
+        todo: The todo whose `key` value is `value`.
+        other: The todo whose `key` value is `other_value`.
+        key: The metadata key whose values are being compared.
+        value: A (non-empty) raw metadata value.
+        other_value: A (non-empty) raw metadata value that differs from
+          `value`.
+
+    Returns:
+        None if the two values are equal once decoded. Otherwise, returns
+        True iff `todo`'s value comes first.
+    """
+    # Fast path: same-width times and integers sort like their typed values.
+    if len(value) == len(other_value) and key in getattr(
+        todo, "_fixed_width_keys", ()
+    ):
+        return value < other_value
+
+    typed_value = _sort_value(todo, key, value)
+    other_typed_value = _sort_value(other, key, other_value)
+    if typed_value is None or other_typed_value is None:
+        return value < other_value
+    if typed_value == other_typed_value:
+        return None
+    result: bool = typed_value < other_typed_value
+    return result
+
+
+def _sort_value(todo: TodoProto, key: str, value: str) -> Any:
+    """Returns `todo`'s decoded `key` metadata value (for sorting).
+
+    Decoded values are cached on the todo (alongside the raw value they were
+    decoded from), so sorting decodes each todo's value once.
+
+    Returns:
+        None if `value` cannot be decoded.
+    """
+    cache: Dict[str, Tuple[str, Any]] = todo.__dict__.setdefault(
+        "_sort_value_cache", {}
+    )
+    cached = cache.get(key)
+    if cached is not None and cached[0] == value:
+        return cached[1]
+
+    schema: MetadataSchema = getattr(todo, "metadata_schema", DEFAULT_SCHEMA)
+    decode = schema.get(key)
+    typed_value = None
+    if decode is not None:
+        try:
+            typed_value = decode(value)
+        except ValueError:
+            pass
+    cache[key] = (value, typed_value)
+    return typed_value
+
+
+def _parse_header(
+    re_todo_match: Match[str],
+) -> Tuple[bool, Priority, Optional[dt.date], Optional[dt.date]]:
+    """Parses the fixed fields that come before a todo's description.
+
+    Returns:
+        A (done, priority, create_date, done_date) tuple.
+    """
+    done: bool = False
+    if re_todo_match.group("x"):
+        done = True
+
+    priority: Priority = DEFAULT_PRIORITY
+    if grp := re_todo_match.group("priority"):
+        priority = cast(Priority, grp)
+
+    create_date: Optional[dt.date] = None
+    if grp := re_todo_match.group("create_date"):
+        create_date = to_date(grp)
+
+    done_date: Optional[dt.date] = None
+    if grp := re_todo_match.group("done_date"):
+        done_date = to_date(grp)
+
+    return done, priority, create_date, done_date
+
+
+def _parse_desc(
+    desc: str,
+) -> Tuple[Tuple[str, ...], Tuple[str, ...], Tuple[str, ...], Metadata]:
+    """Extracts the tags contained in a todo's description.
+
+    Returns:
+        A (projects, contexts, epics, metadata) tuple.
+    """
+    all_words = desc.split(" ")
+
+    project_list: List[str] = []
+    context_list: List[str] = []
+    epics_list: List[str] = []
+    for some_list, prefix in [
+        (project_list, PROJECT_PREFIX),
+        (context_list, CONTEXT_PREFIX),
+        (epics_list, EPIC_PREFIX),
+    ]:
+        for word in all_words:
+            if is_prefix_tag(prefix, word):
+                value = word[len(prefix) :]
+                value = _clean_value(value)
+                if value not in some_list:
+                    some_list.append(value)
+
+    metadata: Metadata = {}
+    for word in all_words:
+        if is_metadata_tag(word):
+            kv = word.split(":", maxsplit=1)
+            key, value = kv
+            value = _clean_value(value)
+
+            if key in metadata:
+                continue
+
+            metadata[key] = value
+
+    return (
+        tuple(project_list),
+        tuple(context_list),
+        tuple(epics_list),
+        metadata,
+    )
+
+
+def _add_time_metadata(
+    metadata: Metadata, done: bool, now: dt.datetime
+) -> None:
+    """Ensures that `metadata` contains a 'ctime' (and 'dtime') tag.
+
+    Missing tags are set to the time of day given by `now`.
+    """
+    time_keys = ["ctime"]
+    if done:
+        time_keys.append("dtime")
+
+    for key in time_keys:
+        if key not in metadata:
+            metadata[key] = hhmm(now)
+
+
+def _needs_time_metadata(metadata: Metadata, done: bool) -> bool:
+    """Would `_add_time_metadata()` add any tags to `metadata`?"""
+    return "ctime" not in metadata or (done and "dtime" not in metadata)
+
+
+def _sorted_tuple(values: Iterable[str]) -> Tuple[str, ...]:
+    """Returns `values` as a sorted tuple.
+
+    Most todos have at most one tag of each kind, so we skip the sort (and
+    copy) for tuples that are trivially sorted already.
+    """
+    if type(values) is tuple and len(values) < 2:
+        return values
+    return tuple(sorted(values))
 
 
 def _clean_value(word: str) -> str:
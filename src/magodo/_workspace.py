@@ -0,0 +1,230 @@
+"""Contains the Workspace class definition."""
+
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from fnmatch import fnmatchcase
+from functools import partial
+import os
+from pathlib import Path
+from typing import Callable, Dict, Final, List, Optional, Type
+
+from eris import Err
+
+from ._todo import Todo
+from .clock import Clock, active_clock, once, use_clock
+from .types import PathLike, TodoProto
+
+
+DEFAULT_PATTERN: Final = "todo.txt"
+
+
+@dataclass(frozen=True)
+class SourcedTodo:
+    """A todo annotated with the location it was loaded from.
+
+    SourcedTodo objects sort in the same order as the todos they wrap.
+
+    Attributes:
+        todo: The todo that was loaded.
+        path: The todo.txt file that this todo was loaded from.
+        lineno: The (1-based) number of the line this todo was loaded from.
+    """
+
+    todo: TodoProto
+    path: Path
+    lineno: int
+
+    def __lt__(self, other: SourcedTodo) -> bool:  # noqa: D105
+        return self.todo < other.todo
+
+
+@dataclass
+class _CachedFile:
+    mtime_ns: int
+    size: int
+    todos: List[SourcedTodo] = field(default_factory=list)
+
+
+@dataclass
+class _CachedDir:
+    mtime_ns: int
+    # The todo.txt files / subdirectories that this directory contains.
+    files: List[Path] = field(default_factory=list)
+    subdirs: List[Path] = field(default_factory=list)
+
+
+class Workspace:
+    """A collection of todo.txt files that live under a common directory.
+
+    Files are discovered recursively and loaded concurrently using a thread
+    pool. The parsed contents of each file are cached (keyed by the file's
+    mtime and size) and so is the listing of each directory (keyed by the
+    directory's mtime), so reloading a workspace whose files have not
+    changed only costs one stat() call per file and per directory.
+
+    Args:
+        root: The directory that contains this workspace's todo.txt files.
+        pattern: Glob pattern that each todo.txt file's basename must match.
+        todo_cls: The Todo class used to parse each line.
+        max_workers: The maximum number of threads used to load files.
+    """
+
+    def __init__(
+        self,
+        root: PathLike,
+        *,
+        pattern: str = DEFAULT_PATTERN,
+        todo_cls: Type[TodoProto] = Todo,
+        max_workers: int = None,
+    ) -> None:
+        self.root = Path(root)
+        self.pattern = pattern
+        self.todo_cls = todo_cls
+        self.max_workers = max_workers
+
+        self._cache: Dict[Path, _CachedFile] = {}
+        self._dir_cache: Dict[Path, _CachedDir] = {}
+
+    def discover(self) -> List[Path]:
+        """Returns the paths of all todo.txt files in this workspace.
+
+        Only directories whose mtime has changed (i.e. that had entries
+        added, removed, or renamed) since the last call are re-scanned.
+        Symbolic links to directories are not followed.
+        """
+        paths: List[Path] = []
+        dir_cache: Dict[Path, _CachedDir] = {}
+        pending = [self.root]
+        while pending:
+            directory = pending.pop()
+            cached_dir = self._scan(directory)
+            if cached_dir is None:
+                continue
+
+            dir_cache[directory] = cached_dir
+            paths.extend(cached_dir.files)
+            pending.extend(cached_dir.subdirs)
+
+        self._dir_cache = dir_cache
+        return sorted(paths)
+
+    def load(self) -> List[SourcedTodo]:
+        """(Re)loads this workspace's files and returns all of their todos.
+
+        Only files that are new or whose mtime / size have changed since the
+        last call to this method are parsed.
+        """
+        paths = set(self.discover())
+        stale_paths = [path for path in paths if self._is_stale(path)]
+        if stale_paths:
+            # Every todo loaded shares the same (default) timestamps, but the
+            # clock is only read if some todo actually needs it. We pass the
+            # clock to each worker explicitly since threads do not inherit
+            # the active clock (see `magodo.clock`).
+            load_file = partial(
+                self._load_file,
+                clock=once(
+                    active_clock(getattr(self.todo_cls, "clock", None))
+                ),
+            )
+            with ThreadPoolExecutor(self.max_workers) as executor:
+                for path, cached_file in zip(
+                    stale_paths, executor.map(load_file, stale_paths)
+                ):
+                    if cached_file is None:
+                        # This file was removed after it was discovered.
+                        paths.discard(path)
+                    else:
+                        self._cache[path] = cached_file
+
+        for path in set(self._cache) - paths:
+            del self._cache[path]
+
+        return self.todos()
+
+    def todos(self) -> List[SourcedTodo]:
+        """Returns all todos loaded so far (grouped by file, in file order)."""
+        return [
+            sourced_todo
+            for path in sorted(self._cache)
+            for sourced_todo in self._cache[path].todos
+        ]
+
+    def query(
+        self,
+        predicate: Callable[[TodoProto], bool],
+        *,
+        sort: bool = False,
+    ) -> List[SourcedTodo]:
+        """Returns every loaded todo that satisfies `predicate`.
+
+        Args:
+            predicate: Function that decides which todos are returned.
+            sort: If this option is set, the todos returned are sorted using
+              the standard todo ordering.
+        """
+        result = [st for st in self.todos() if predicate(st.todo)]
+        if sort:
+            result.sort()
+        return result
+
+    def _is_stale(self, path: Path) -> bool:
+        cached_file = self._cache.get(path)
+        if cached_file is None:
+            return True
+
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            # Loading this file again will tell us that it has been removed.
+            return True
+        return (stat.st_mtime_ns, stat.st_size) != (
+            cached_file.mtime_ns,
+            cached_file.size,
+        )
+
+    def _scan(self, directory: Path) -> Optional[_CachedDir]:
+        """Returns the (possibly cached) listing of `directory`.
+
+        Returns:
+            None if `directory` no longer exists.
+        """
+        try:
+            mtime_ns = directory.stat().st_mtime_ns
+            cached_dir = self._dir_cache.get(directory)
+            if cached_dir is not None and cached_dir.mtime_ns == mtime_ns:
+                return cached_dir
+
+            cached_dir = _CachedDir(mtime_ns)
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        cached_dir.subdirs.append(Path(entry.path))
+                    elif fnmatchcase(entry.name, self.pattern):
+                        cached_dir.files.append(Path(entry.path))
+        except (FileNotFoundError, NotADirectoryError):
+            return None
+        return cached_dir
+
+    def _load_file(self, path: Path, *, clock: Clock) -> Optional[_CachedFile]:
+        try:
+            todo_file = path.open()
+        except FileNotFoundError:
+            return None
+
+        with todo_file, use_clock(clock):
+            # We stat the open file so that a concurrent write can never leave
+            # us with a cache key that is newer than the contents we read.
+            stat = os.fstat(todo_file.fileno())
+            cached_file = _CachedFile(stat.st_mtime_ns, stat.st_size)
+            for lineno, line in enumerate(todo_file, start=1):
+                todo_result = self.todo_cls.from_line(line)
+                if isinstance(todo_result, Err):
+                    continue
+
+                sourced_todo = SourcedTodo(todo_result.ok(), path, lineno)
+                cached_file.todos.append(sourced_todo)
+
+        return cached_file
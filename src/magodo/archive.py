@@ -0,0 +1,254 @@
+"""Utilities for archiving done todos into date-partitioned done files.
+
+Done todos are moved out of the active todo.txt file and appended to one
+"done file" per month of completion (e.g. 'done.2023-05.txt'). A manifest
+file, which lives next to the done files, records the earliest / latest done
+date and the number of todos stored in each partition so that range queries
+only need to open the partitions that can possibly match.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+import datetime as dt
+import json
+import os
+from pathlib import Path
+from typing import Dict, Final, Iterator, List, Optional, TextIO, Type
+
+from eris import Err
+
+from ._common import atomic_open
+from ._todo import _TODO_PATTERN, Todo
+from .clock import lazily_frozen
+from .dates import from_date, to_date
+from .types import PathLike, TodoProto
+
+
+MANIFEST_NAME: Final = "manifest.json"
+PARTITION_FMT: Final = "%Y-%m"
+
+# Type of the manifest returned by `archive()` and `read_manifest()`.
+Manifest = Dict[str, "Partition"]
+
+
+@dataclass
+class Partition:
+    """Describes a single done file (i.e. one month of done todos).
+
+    Attributes:
+        name: The partition's name (e.g. '2023-05').
+        min_date: The earliest done date of any todo in this partition.
+        max_date: The latest done date of any todo in this partition.
+        count: The number of todos stored in this partition.
+    """
+
+    name: str
+    min_date: dt.date
+    max_date: dt.date
+    count: int = 0
+
+    @property
+    def filename(self) -> str:
+        """The basename of the done file that backs this partition."""
+        return partition_filename(self.name)
+
+    def overlaps(
+        self, start: Optional[dt.date], end: Optional[dt.date]
+    ) -> bool:
+        """Could this partition contain todos done between `start` and `end`?
+        """
+        if start is not None and self.max_date < start:
+            return False
+        if end is not None and self.min_date > end:
+            return False
+        return True
+
+    def add(self, done_date: dt.date) -> None:
+        """Records a new todo, which was done on `done_date`."""
+        self.min_date = min(self.min_date, done_date)
+        self.max_date = max(self.max_date, done_date)
+        self.count += 1
+
+
+def partition_name(done_date: dt.date) -> str:
+    """Returns the name of the partition that `done_date` belongs to."""
+    return done_date.strftime(PARTITION_FMT)
+
+
+def partition_filename(name: str) -> str:
+    """Returns the basename of the done file for the partition `name`."""
+    return f"done.{name}.txt"
+
+
+def read_manifest(done_dir: PathLike) -> Manifest:
+    """Reads the partition manifest stored in `done_dir`.
+
+    Returns:
+        A dictionary mapping partition names to `Partition` objects. This
+        dictionary is empty if no manifest exists yet.
+    """
+    manifest_path = Path(done_dir) / MANIFEST_NAME
+    if not manifest_path.exists():
+        return {}
+
+    raw_manifest = json.loads(manifest_path.read_text())
+    return {
+        name: Partition(
+            name=name,
+            min_date=to_date(info["min_date"]),
+            max_date=to_date(info["max_date"]),
+            count=info["count"],
+        )
+        for name, info in raw_manifest.items()
+    }
+
+
+def write_manifest(done_dir: PathLike, manifest: Manifest) -> None:
+    """Atomically (re)writes the partition manifest stored in `done_dir`."""
+    raw_manifest = {
+        name: {
+            "min_date": from_date(part.min_date),
+            "max_date": from_date(part.max_date),
+            "count": part.count,
+        }
+        for name, part in sorted(manifest.items())
+    }
+    with atomic_open(Path(done_dir) / MANIFEST_NAME) as manifest_file:
+        json.dump(raw_manifest, manifest_file, indent=2)
+        manifest_file.write("\n")
+
+
+def archive(
+    todo_path: PathLike,
+    done_dir: PathLike,
+    *,
+    todo_cls: Type[TodoProto] = Todo,
+) -> Manifest:
+    """Moves all done todos in `todo_path` into partitioned done files.
+
+    The todo file is streamed one line at a time: undone todos (and any
+    lines that cannot be parsed) are written to a temporary file that
+    atomically replaces `todo_path` once we are finished, while done todos are
+    appended verbatim to the done file for the month they were completed in.
+    Memory usage is thus independent of the number of todos archived. Done
+    todos that lack a done date are archived with today's date (according
+    to `magodo.clock`) written into their line.
+
+    The done files are fsync'ed before `todo_path` is replaced, so a crash
+    can, at worst, result in a done todo being archived twice--never lost.
+
+    Args:
+        todo_path: The active todo.txt file.
+        done_dir: The directory that the done files and the partition
+          manifest are stored in.
+        todo_cls: The Todo class used to parse each line of `todo_path`.
+
+    Returns:
+        The updated partition manifest.
+    """
+    done_dir = Path(done_dir)
+    done_dir.mkdir(parents=True, exist_ok=True)
+
+    manifest = read_manifest(done_dir)
+    done_files: Dict[str, TextIO] = {}
+    try:
+        # Every todo shares the same (default) timestamps, but the clock is
+        # only read if some todo actually needs it.
+        with Path(todo_path).open() as todo_file, atomic_open(
+            todo_path
+        ) as new_todo_file, lazily_frozen(getattr(todo_cls, "clock", None)):
+            for line in todo_file:
+                line = line.rstrip("\n")
+                todo_result = todo_cls.from_line(line)
+                if isinstance(todo_result, Err) or not line.strip():
+                    new_todo_file.write(line + "\n")
+                    continue
+
+                todo = todo_result.ok()
+                if not todo.done or todo.done_date is None:
+                    new_todo_file.write(line + "\n")
+                    continue
+
+                if not _has_done_date(line):
+                    # This todo's done date was read from the clock, so we
+                    # write it into the archived line. Otherwise, the todo
+                    # would get a new done date (and fall outside of its
+                    # partition) whenever it is read back.
+                    line = todo.to_line()
+
+                name = partition_name(todo.done_date)
+                if name not in done_files:
+                    done_files[name] = (
+                        done_dir / partition_filename(name)
+                    ).open("a")
+
+                done_files[name].write(line + "\n")
+                if name in manifest:
+                    manifest[name].add(todo.done_date)
+                else:
+                    manifest[name] = Partition(
+                        name, todo.done_date, todo.done_date, 1
+                    )
+
+            for done_file in done_files.values():
+                done_file.flush()
+                os.fsync(done_file.fileno())
+
+            write_manifest(done_dir, manifest)
+    finally:
+        for done_file in done_files.values():
+            done_file.close()
+
+    return manifest
+
+
+def _has_done_date(line: str) -> bool:
+    """Does `line` (a valid todo line) contain an explicit done date?"""
+    re_todo_match = _TODO_PATTERN.match(line.strip())
+    return re_todo_match is not None and bool(re_todo_match.group("done_date"))
+
+
+def iter_done(
+    done_dir: PathLike,
+    start: dt.date = None,
+    end: dt.date = None,
+    *,
+    todo_cls: Type[TodoProto] = Todo,
+) -> Iterator[TodoProto]:
+    """Yields all archived todos that were done between `start` and `end`.
+
+    Only the partitions whose date range (according to the manifest)
+    overlaps [start, end] are opened. Both bounds are inclusive and either may
+    be omitted.
+    """
+    done_dir = Path(done_dir)
+    partitions = select_partitions(read_manifest(done_dir), start, end)
+    for part in partitions:
+        with (done_dir / part.filename).open() as done_file:
+            for line in done_file:
+                todo_result = todo_cls.from_line(line)
+                if isinstance(todo_result, Err):
+                    continue
+
+                todo = todo_result.ok()
+                done_date = todo.done_date
+                if done_date is None:  # pragma: no cover
+                    continue
+                if start is not None and done_date < start:
+                    continue
+                if end is not None and done_date > end:
+                    continue
+
+                yield todo
+
+
+def select_partitions(
+    manifest: Manifest, start: dt.date = None, end: dt.date = None
+) -> List[Partition]:
+    """Returns the partitions (sorted by name) that overlap [start, end]."""
+    return [
+        part
+        for _name, part in sorted(manifest.items())
+        if part.overlaps(start, end)
+    ]
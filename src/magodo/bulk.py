@@ -0,0 +1,202 @@
+"""Utilities for applying the same change to many todos in one batch.
+
+Each function in this module returns a new list of todos in which every
+selected todo has been replaced by a changed copy (todos that were not
+selected are returned as-is), so callers can tell which todos changed using
+an identity check. Use `rewrite()` to apply such a change to a todo.txt file
+using a single atomic write.
+
+Example:
+    >>> todos = [Todo("Buy milk @errands", contexts=("errands",))]
+    >>> todos.append(Todo("Call mom"))
+    >>> todos = complete(todos, lambda todo: "errands" in todo.contexts)
+    >>> [todo.done for todo in todos]
+    [True, False]
+"""
+
+from __future__ import annotations
+
+import datetime as dt
+from typing import Callable, Dict, Final, List, Sequence, Tuple, Type, Union
+
+from eris import Err
+
+from . import clock
+from ._common import atomic_open, to_source_line
+from ._todo import Todo, _clean_value
+from .tags import CONTEXT_PREFIX, EPIC_PREFIX, PROJECT_PREFIX, is_prefix_tag
+from .types import PathLike, Priority, T, TodoProto
+
+
+# Maps each tag prefix to the name of the Todo attribute that holds its tags.
+TAG_ATTRS: Final[Dict[str, str]] = {
+    CONTEXT_PREFIX: "contexts",
+    EPIC_PREFIX: "epics",
+    PROJECT_PREFIX: "projects",
+}
+
+# Type of the functions used to select which todos are changed.
+Predicate = Callable[[T], bool]
+
+
+def mutate(
+    todos: Sequence[T], predicate: Predicate, transform: Callable[[T], T]
+) -> List[T]:
+    """Replaces every todo that satisfies `predicate` with `transform(todo)`.
+    """
+    return [transform(todo) if predicate(todo) else todo for todo in todos]
+
+
+def complete(
+    todos: Sequence[T], predicate: Predicate, *, now: dt.datetime = None
+) -> List[T]:
+    """Marks every open todo that satisfies `predicate` done.
+
+    Every todo completed by a single call shares the same done date and
+    'dtime' tag, so the clock is only read once per batch.
+
+    Args:
+        todos: The todos to (possibly) complete.
+        predicate: Selects which todos are completed.
+        now: The time these todos were completed at (defaults to the current
+          time, according to `magodo.clock`).
+    """
+    if now is None:
+        now = clock.now()
+
+    done_date = now.date()
+    dtime = clock.hhmm(now)
+
+    def complete_todo(todo: T) -> T:
+        done_todo: T = todo.new(
+            done=True,
+            done_date=done_date,
+            metadata=dict(todo.metadata, dtime=dtime),
+        )
+        return done_todo
+
+    return mutate(
+        todos, lambda todo: not todo.done and predicate(todo), complete_todo
+    )
+
+
+def set_priority(
+    todos: Sequence[T], predicate: Predicate, priority: Priority
+) -> List[T]:
+    """Sets the priority of every todo that satisfies `predicate`."""
+    return mutate(
+        todos,
+        lambda todo: todo.priority != priority and predicate(todo),
+        lambda todo: todo.new(priority=priority),
+    )
+
+
+def rename_tag(todos: Sequence[T], old_tag: str, new_tag: str) -> List[T]:
+    """Renames a project, context, or epic tag wherever it is used.
+
+    Both the todo's description and its tag tuple (e.g. `todo.projects`) are
+    updated.
+
+    Args:
+        todos: The todos whose tags should be renamed.
+        old_tag: The tag to rename, including its prefix (e.g. '+old').
+        new_tag: The tag's new name, including its prefix (e.g. '+new').
+
+    Raises:
+        ValueError: If either tag is invalid or the tags' prefixes differ.
+    """
+    prefix = old_tag[:1]
+    if prefix not in TAG_ATTRS or not is_prefix_tag(prefix, old_tag):
+        raise ValueError(f"Invalid tag: {old_tag!r}")
+    if not is_prefix_tag(prefix, new_tag):
+        raise ValueError(
+            f"Invalid tag for {old_tag!r} to be renamed to: {new_tag!r}"
+        )
+
+    attr = TAG_ATTRS[prefix]
+    old_value = old_tag[1:]
+    new_value = new_tag[1:]
+
+    def rename(todo: T) -> T:
+        words = []
+        for word in todo.desc.split(" "):
+            if is_prefix_tag(prefix, word):
+                value = word[1:]
+                cleaned_value = _clean_value(value)
+                if cleaned_value == old_value:
+                    suffix = value[len(cleaned_value) :]
+                    word = prefix + new_value + suffix
+            words.append(word)
+
+        tags: Tuple[str, ...] = getattr(todo, attr)
+        new_tags = tuple(
+            dict.fromkeys(
+                new_value if tag == old_value else tag for tag in tags
+            )
+        )
+        renamed_todo: T = todo.new(desc=" ".join(words), **{attr: new_tags})
+        return renamed_todo
+
+    return mutate(todos, lambda todo: old_value in getattr(todo, attr), rename)
+
+
+def rewrite(
+    path: PathLike,
+    change: Callable[[List[TodoProto]], List[TodoProto]],
+    *,
+    todo_cls: Type[TodoProto] = Todo,
+) -> int:
+    """Applies `change` to the todos in a todo.txt file.
+
+    The file is only rewritten (atomically, and only once) if `change`
+    replaced at least one todo. Lines that cannot be parsed and the lines of
+    todos that were not changed are preserved verbatim.
+
+    Args:
+        path: The todo.txt file to change.
+        change: Function that is passed the file's todos (in file order) and
+          returns their new versions (e.g. `lambda todos: set_priority(todos,
+          is_urgent, "A")`).
+        todo_cls: The Todo class used to parse each line.
+
+    Returns:
+        The number of todos that were changed.
+    """
+    with open(path) as todo_file:
+        lines = todo_file.read().splitlines()
+
+    # Each entry is either a line that could not be parsed or the index of
+    # a todo in `todos`.
+    entries: List[Union[str, int]] = []
+    todos: List[TodoProto] = []
+    for line in lines:
+        todo_result = todo_cls.from_line(line)
+        if isinstance(todo_result, Err):
+            entries.append(line)
+            continue
+
+        entries.append(len(todos))
+        todos.append(todo_result.ok())
+
+    new_todos = change(todos)
+    if len(new_todos) != len(todos):
+        raise ValueError(
+            "Bulk changes must return exactly one todo for each todo they are"
+            f" given: expected={len(todos)} actual={len(new_todos)}"
+        )
+
+    changed_count = sum(
+        new_todo is not old_todo
+        for new_todo, old_todo in zip(new_todos, todos)
+    )
+    if not changed_count:
+        return 0
+
+    contents = "".join(
+        (entry if isinstance(entry, str) else to_source_line(new_todos[entry]))
+        + "\n"
+        for entry in entries
+    )
+    with atomic_open(path) as todo_file:
+        todo_file.write(contents)
+    return changed_count
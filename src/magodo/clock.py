@@ -0,0 +1,143 @@
+"""Injectable clocks, which determine what time todos think it is.
+
+Todos read the current time whenever they need a default create date, done
+date, or 'ctime' / 'dtime' tag. Instead of calling `dt.datetime.now()`
+directly, they call `now()`, which checks the following (in order):
+
+  1. The clock set by the innermost `use_clock()` / `frozen()` block.
+  2. The `clock` class attribute of the todo class (if it is not None).
+     MagicTodo classes apply their `clock` attribute to the basic todos
+     they create using `use_default_clock()`.
+  3. The system clock.
+
+Freezing the clock makes every todo created inside of a batch share the
+same timestamp (which also saves a clock read per todo):
+
+    >>> import datetime as dt
+    >>> from magodo import Todo
+    >>> with frozen(dt.datetime(2022, 1, 31, 9, 30)):
+    ...     todo = Todo("buy milk")
+    >>> todo.to_line()
+    '2022-01-31 buy milk'
+    >>> todo.metadata
+    {'ctime': '0930'}
+"""
+
+from __future__ import annotations
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+import datetime as dt
+import threading
+from typing import Callable, Iterator, List, Optional
+
+
+# Type of a clock (i.e. a function that returns the current time).
+Clock = Callable[[], dt.datetime]
+
+_CLOCK: ContextVar[Optional[Clock]] = ContextVar("magodo_clock", default=None)
+
+
+def system_clock() -> dt.datetime:
+    """Returns the current (local) time."""
+    return dt.datetime.now()
+
+
+def now(default: Clock = None) -> dt.datetime:
+    """Returns the current time according to the active clock.
+
+    Args:
+        default: The clock to use if no clock has been set using
+          `use_clock()` / `frozen()` (defaults to the system clock).
+    """
+    return active_clock(default)()
+
+
+def active_clock(default: Clock = None) -> Clock:
+    """Returns the clock that `now(default)` would read (without reading it).
+    """
+    return _CLOCK.get() or default or system_clock
+
+
+@contextmanager
+def use_clock(clock: Clock) -> Iterator[None]:
+    """Makes `clock` the active clock until the `with` block ends.
+
+    The clock is stored in a context variable, so it only applies to the
+    current thread (or asyncio task).
+    """
+    token = _CLOCK.set(clock)
+    try:
+        yield
+    finally:
+        _CLOCK.reset(token)
+
+
+@contextmanager
+def use_default_clock(clock: Optional[Clock]) -> Iterator[None]:
+    """Makes `clock` the active clock, unless a clock is already active.
+
+    This is how a todo class's `clock` attribute is applied to the todos
+    that it creates indirectly (e.g. the basic todos wrapped by MagicTodo
+    objects). Does nothing if `clock` is None.
+    """
+    if clock is None or _CLOCK.get() is not None:
+        yield
+    else:
+        with use_clock(clock):
+            yield
+
+
+@contextmanager
+def frozen(at: dt.datetime = None) -> Iterator[dt.datetime]:
+    """Stops the clock until the `with` block ends.
+
+    Args:
+        at: The time to freeze the clock at (defaults to the current time).
+
+    Yields:
+        The time that the clock was frozen at.
+    """
+    frozen_now = now() if at is None else at
+    with use_clock(lambda: frozen_now):
+        yield frozen_now
+
+
+@contextmanager
+def lazily_frozen(default: Clock = None) -> Iterator[None]:
+    """Like `frozen()`, but the clock is only read once it is first needed.
+
+    The first time the clock is read inside of the `with` block, the active
+    clock (see `now()`) is read and every later read returns that same time.
+    If no todo needs the current time, the clock is never read at all.
+
+    Args:
+        default: The clock to use if no clock is active.
+    """
+    with use_clock(once(active_clock(default))):
+        yield
+
+
+def once(clock: Clock) -> Clock:
+    """Returns a clock that reads `clock` once and then always returns that."""
+    lock = threading.Lock()
+    result: List[dt.datetime] = []
+
+    def read_once() -> dt.datetime:
+        if not result:
+            with lock:
+                if not result:
+                    result.append(clock())
+        return result[0]
+
+    return read_once
+
+
+def hhmm(moment: dt.datetime) -> str:
+    """Formats the time of day used by 'ctime' / 'dtime' tags (e.g. '0930').
+
+    Examples:
+        >>> hhmm(dt.datetime(2022, 1, 31, 9, 5))
+        '0905'
+    """
+    return f"{moment.hour:0>2}{moment.minute:0>2}"
@@ -0,0 +1,506 @@
+"""A local daemon that keeps a todo.txt file's todos parsed in memory.
+
+The daemon loads a todo.txt file once (through a `TodoJournal`), builds a
+`SearchIndex` over its todos, and then answers requests from thin clients
+over a Unix domain socket. Since the todos (including any MagicTodo spells,
+which are cast when each todo is parsed) stay warm in memory, each request
+only costs one stat() call plus the work needed to answer it, no matter how
+many todos the file contains.
+
+Requests and responses are newline-delimited JSON objects. A request names
+its operation using the "op" key (e.g. '{"op": "complete", "ident": "L3"}')
+and a response contains either a "result" key or an "error" key. Each todo
+is sent over the wire as an [IDENT, LINE] pair, where IDENT is the todo's
+(stable) journal ident.
+
+Use `connect()` to talk to a running daemon. When no daemon is running,
+`connect()` falls back to serving each request in-process, so callers never
+need to care whether a daemon is running or not.
+
+NOTE: The todo.txt file is reloaded whenever its mtime / size change, so it
+  can still be edited by other programs while the daemon is running. When
+  this happens, the journal is replayed against the new file (see
+  `TodoJournal`), and any journaled operations that conflict with the other
+  program's edits are moved to the journal's rejected file. To keep such
+  conflicts rare, the daemon compacts its journal whenever it shuts down (or
+  grows too large).
+"""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+import socket
+import socketserver
+import threading
+from typing import (
+    Any,
+    BinaryIO,
+    Dict,
+    Final,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    Type,
+)
+
+from eris import Err
+
+from ._common import to_source_line
+from ._journal import DEFAULT_COMPACT_THRESHOLD, TodoJournal
+from ._search import SearchIndex
+from ._todo import Todo
+from .types import PathLike, TodoProto
+
+
+SOCKET_SUFFIX: Final = ".sock"
+
+# The exceptions that are sent back to clients (and re-raised by them).
+_WIRE_ERRORS: Final[Dict[str, Type[Exception]]] = {
+    "KeyError": KeyError,
+    "ValueError": ValueError,
+}
+
+# Type of a todo that has been sent over the wire (i.e. an [IDENT, LINE] pair).
+WireTodo = Tuple[str, str]
+
+# Maps each operation to the types of the fields that its requests can use.
+_REQUEST_FIELDS: Final[Dict[str, Dict[str, Tuple[type, ...]]]] = {
+    "query": {
+        "text": (str,),
+        "limit": (int, type(None)),
+        "include_done": (bool,),
+    },
+    "add": {"line": (str,)},
+    "complete": {"ident": (str,)},
+}
+# The fields that must be given for each operation.
+_REQUIRED_FIELDS: Final[Dict[str, Tuple[str, ...]]] = {
+    "query": (),
+    "add": ("line",),
+    "complete": ("ident",),
+}
+
+
+def default_socket_path(todo_path: PathLike) -> Path:
+    """Returns the default socket path of the daemon that serves `todo_path`.
+
+    The socket is a hidden file that lives next to the todo.txt file (e.g.
+    'todo.txt' is served on '.todo.txt.sock').
+    """
+    path = Path(todo_path)
+    return path.with_name(f".{path.name}{SOCKET_SUFFIX}")
+
+
+class _Backend:
+    """Answers requests using todos that are kept in memory."""
+
+    def __init__(
+        self,
+        todo_path: PathLike,
+        *,
+        todo_cls: Type[TodoProto],
+        compact_threshold: int,
+    ) -> None:
+        self.todo_path = Path(todo_path)
+        self.todo_cls = todo_cls
+        self.compact_threshold = compact_threshold
+
+        self._lock = threading.Lock()
+        self._journal: Optional[TodoJournal] = None
+        self._index = SearchIndex()
+        # todo ident -> journal ident
+        self._journal_idents: Dict[str, str] = {}
+        self._stat_key: Optional[Tuple[int, int]] = None
+
+        self._load()
+
+    def handle(self, request: Any) -> Dict[str, Any]:
+        """Answers a single request (which may have come from any thread).
+
+        Errors (including malformed requests) are reported using the
+        response's "error" key instead of being raised.
+        """
+        with self._lock:
+            try:
+                _check_request(request)
+                if self._stat_key != self._get_stat_key():
+                    self._load()
+                return {"result": self._dispatch(request)}
+            except (KeyError, ValueError) as e:
+                message = str(e.args[0]) if e.args else ""
+                return {"error": type(e).__name__, "message": message}
+            except Exception as e:  # pylint: disable=broad-except
+                return {"error": type(e).__name__, "message": str(e)}
+
+    def close(self, *, compact: bool = False) -> None:
+        """Closes this backend's journal (compacting it first if asked to)."""
+        with self._lock:
+            journal = self._get_journal()
+            if compact and journal.journal_size > 0:
+                self._compact()
+            journal.close()
+
+    def _dispatch(self, request: Dict[str, Any]) -> Any:
+        op = request.get("op")
+        if op == "query":
+            return self._query(
+                request.get("text", ""),
+                limit=request.get("limit"),
+                include_done=request.get("include_done", False),
+            )
+        if op == "add":
+            return self._add(request["line"])
+        if op == "complete":
+            return self._complete(request["ident"])
+        raise ValueError(f"Unknown operation: {op!r}")
+
+    def _query(
+        self, text: str, *, limit: Optional[int], include_done: bool
+    ) -> List[WireTodo]:
+        if not text:
+            return self._collect(
+                self._get_journal().items(),
+                limit=limit,
+                include_done=include_done,
+            )
+
+        # We only ask the index for (a few more than) the number of todos we
+        # need, and only ask again if too many of them turn out to be done.
+        search_limit = limit if limit is None else 2 * limit
+        while True:
+            todo_idents = self._index.search(text, limit=search_limit)
+            result = self._collect(
+                (
+                    (self._journal_idents[todo_ident], self._index[todo_ident])
+                    for todo_ident in todo_idents
+                ),
+                limit=limit,
+                include_done=include_done,
+            )
+            if search_limit is None or len(todo_idents) < search_limit:
+                return result
+            if limit is not None and len(result) >= limit:
+                return result
+            search_limit *= 4
+
+    def _collect(
+        self,
+        todos: Iterable[Tuple[str, TodoProto]],
+        *,
+        limit: Optional[int],
+        include_done: bool,
+    ) -> List[WireTodo]:
+        result: List[WireTodo] = []
+        for ident, todo in todos:
+            if limit is not None and len(result) >= limit:
+                break
+            if include_done or not todo.done:
+                result.append((ident, to_source_line(todo)))
+        return result
+
+    def _add(self, line: str) -> WireTodo:
+        todo_result = self.todo_cls.from_line(line)
+        if isinstance(todo_result, Err):
+            raise ValueError(f"Invalid todo line: {line!r}")
+
+        todo: TodoProto = todo_result.ok()
+        ident = self._get_journal().add(todo)
+        self._index_todo(ident, todo)
+        self._maybe_compact()
+        return (ident, todo.to_line())
+
+    def _complete(self, ident: str) -> WireTodo:
+        journal = self._get_journal()
+        old_todo = journal[ident]
+        todo = journal.complete(ident)
+
+        self._index.remove(old_todo.ident)
+        del self._journal_idents[old_todo.ident]
+        self._index_todo(ident, todo)
+        self._maybe_compact()
+        return (ident, todo.to_line())
+
+    def _load(self) -> None:
+        if self._journal is not None:
+            self._journal.close()
+
+        # We compact the journal ourselves (see `_maybe_compact()`), since we
+        # need to know when the todo.txt file is rewritten.
+        self._journal = TodoJournal(
+            self.todo_path, todo_cls=self.todo_cls, compact_threshold=None
+        )
+        self._index = SearchIndex()
+        self._journal_idents = {}
+        for ident, todo in self._journal.items():
+            self._index_todo(ident, todo)
+        self._stat_key = self._get_stat_key()
+
+    def _index_todo(self, ident: str, todo: TodoProto) -> None:
+        self._index.add(todo)
+        self._journal_idents[todo.ident] = ident
+
+    def _maybe_compact(self) -> None:
+        if self._get_journal().journal_size >= self.compact_threshold:
+            self._compact()
+
+    def _compact(self) -> None:
+        self._get_journal().compact()
+        self._stat_key = self._get_stat_key()
+
+    def _get_journal(self) -> TodoJournal:
+        assert self._journal is not None
+        return self._journal
+
+    def _get_stat_key(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = self.todo_path.stat()
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    server: TodoServer
+
+    def handle(self) -> None:
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+            except ValueError:
+                response = {"error": "ValueError", "message": "Invalid JSON."}
+            else:
+                response = self.server.backend.handle(request)
+            self.wfile.write(json.dumps(response).encode() + b"\n")
+
+
+class TodoServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """A Unix domain socket server that answers requests for one todo.txt.
+
+    Args:
+        todo_path: The todo.txt file served by this server.
+        socket_path: The socket this server listens on (defaults to
+          `default_socket_path(todo_path)`).
+        todo_cls: The Todo class used to parse each line.
+        compact_threshold: The journal is compacted once it has recorded
+          this many operations.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        todo_path: PathLike,
+        *,
+        socket_path: PathLike = None,
+        todo_cls: Type[TodoProto] = Todo,
+        compact_threshold: int = DEFAULT_COMPACT_THRESHOLD,
+    ) -> None:
+        self.socket_path = (
+            default_socket_path(todo_path)
+            if socket_path is None
+            else Path(socket_path)
+        )
+        if self.socket_path.exists():
+            # This socket was left behind by a daemon that did not shut down
+            # cleanly (if another daemon were running, connecting would work).
+            probe = _connect(self.socket_path)
+            if probe is not None:
+                probe.close()
+                raise ValueError(f"Daemon already running: {self.socket_path}")
+            self.socket_path.unlink()
+
+        self.backend = _Backend(
+            todo_path, todo_cls=todo_cls, compact_threshold=compact_threshold
+        )
+        try:
+            super().__init__(str(self.socket_path), _RequestHandler)
+        except BaseException:
+            self.backend.close()
+            raise
+
+    def server_close(self) -> None:
+        """Stops listening, compacts the journal, and removes the socket."""
+        super().server_close()
+        self.backend.close(compact=True)
+        if self.socket_path.exists():
+            self.socket_path.unlink()
+
+
+def serve(
+    todo_path: PathLike,
+    *,
+    socket_path: PathLike = None,
+    todo_cls: Type[TodoProto] = Todo,
+) -> None:
+    """Runs a daemon that serves `todo_path` until it is interrupted."""
+    with TodoServer(
+        todo_path, socket_path=socket_path, todo_cls=todo_cls
+    ) as server:
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+class Client:
+    """Sends requests to a daemon (or answers them in-process).
+
+    Use `connect()` to construct Client objects.
+    """
+
+    def __init__(
+        self,
+        *,
+        sock: Optional[socket.socket] = None,
+        backend: Optional[_Backend] = None,
+    ) -> None:
+        self._sock = sock
+        self._backend = backend
+        self._rfile: Optional[BinaryIO] = None
+        if sock is not None:
+            self._rfile = sock.makefile("rb")
+
+    def __enter__(self) -> Client:  # noqa: D105
+        return self
+
+    def __exit__(self, *args: Any) -> None:  # noqa: D105
+        self.close()
+
+    @property
+    def is_remote(self) -> bool:
+        """Are requests being answered by a daemon?"""
+        return self._sock is not None
+
+    def query(
+        self, text: str = "", *, limit: int = None, include_done: bool = False
+    ) -> List[WireTodo]:
+        """Returns the todos that match `text` (or all todos).
+
+        Args:
+            text: A `SearchIndex` query. If this is empty, all todos are
+              returned in file order.
+            limit: The maximum number of todos returned.
+            include_done: If this option is set, done todos are returned too.
+        """
+        result = self._call(
+            "query", text=text, limit=limit, include_done=include_done
+        )
+        return [(ident, line) for ident, line in result]
+
+    def add(self, line: str) -> WireTodo:
+        """Parses `line` and adds it as a new todo.
+
+        Raises:
+            ValueError: If `line` is not a valid todo line.
+        """
+        ident, new_line = self._call("add", line=line)
+        return (ident, new_line)
+
+    def complete(self, ident: str) -> WireTodo:
+        """Marks the todo identified by `ident` done.
+
+        Raises:
+            KeyError: If there is no todo identified by `ident`.
+        """
+        ident, line = self._call("complete", ident=ident)
+        return (ident, line)
+
+    def close(self) -> None:
+        """Closes this client's connection (or in-process backend).
+
+        Just like a daemon does when it shuts down, an in-process backend
+        compacts its journal when it is closed.
+        """
+        if self._sock is not None:
+            assert self._rfile is not None
+            self._rfile.close()
+            self._sock.close()
+        if self._backend is not None:
+            self._backend.close(compact=True)
+
+    def _call(self, op: str, **kwargs: Any) -> Any:
+        request = dict(kwargs, op=op)
+        if self._backend is not None:
+            response = self._backend.handle(request)
+        else:
+            assert self._sock is not None and self._rfile is not None
+            self._sock.sendall(json.dumps(request).encode() + b"\n")
+            response = json.loads(self._rfile.readline())
+
+        if "error" in response:
+            error_type = _WIRE_ERRORS.get(response["error"], RuntimeError)
+            raise error_type(response["message"])
+        return response["result"]
+
+
+def connect(
+    todo_path: PathLike,
+    *,
+    socket_path: PathLike = None,
+    todo_cls: Type[TodoProto] = Todo,
+) -> Client:
+    """Connects to the daemon that serves `todo_path`.
+
+    If no daemon is running, the returned client answers requests in-process
+    (i.e. by loading `todo_path` itself).
+
+    Args:
+        todo_path: The todo.txt file whose todos we want to work with.
+        socket_path: The daemon's socket (defaults to
+          `default_socket_path(todo_path)`).
+        todo_cls: The Todo class used to parse each line (only used when no
+          daemon is running).
+    """
+    if socket_path is None:
+        socket_path = default_socket_path(todo_path)
+
+    sock = _connect(Path(socket_path))
+    if sock is not None:
+        return Client(sock=sock)
+
+    backend = _Backend(
+        todo_path,
+        todo_cls=todo_cls,
+        compact_threshold=DEFAULT_COMPACT_THRESHOLD,
+    )
+    return Client(backend=backend)
+
+
+def _check_request(request: Any) -> None:
+    """Raises a ValueError if `request` is not a well-formed request."""
+    if not isinstance(request, dict):
+        raise ValueError(f"Request is not a JSON object: {request!r}")
+
+    op = request.get("op")
+    if not isinstance(op, str) or op not in _REQUEST_FIELDS:
+        raise ValueError(f"Unknown operation: {op!r}")
+
+    field_types = _REQUEST_FIELDS[op]
+    for name, value in request.items():
+        if name == "op":
+            continue
+        if name not in field_types:
+            raise ValueError(f"Unknown field for {op!r} requests: {name!r}")
+        # Since bool is a subclass of int, we need to check it separately.
+        if not isinstance(value, field_types[name]) or (
+            isinstance(value, bool) and bool not in field_types[name]
+        ):
+            raise ValueError(
+                f"Invalid {name!r} field for {op!r} requests: {value!r}"
+            )
+
+    for name in _REQUIRED_FIELDS[op]:
+        if name not in request:
+            raise ValueError(f"Missing {name!r} field for {op!r} requests.")
+
+
+def _connect(socket_path: Path) -> Optional[socket.socket]:
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(str(socket_path))
+    except (FileNotFoundError, ConnectionRefusedError):
+        sock.close()
+        return None
+    return sock
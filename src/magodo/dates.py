@@ -11,6 +11,12 @@ DATE_FMT: Final = "%Y-%m-%d"
 
 def to_date(yyyymmdd: str) -> dt.date:
     """Helper function for constructing a date object."""
+    # Parsing fixed-width dates (e.g. '2022-01-31') using fromisoformat() is
+    # much faster than using strptime(), which we only fall back to for the
+    # dates that DATE_FMT allows but fromisoformat() might not (e.g.
+    # '2022-1-31').
+    if len(yyyymmdd) == 10 and yyyymmdd[4] == yyyymmdd[7] == "-":
+        return dt.date.fromisoformat(yyyymmdd)
     return dt.datetime.strptime(yyyymmdd, DATE_FMT).date()
 
 
@@ -0,0 +1,204 @@
+"""Bulk validation of todo.txt files.
+
+Unlike `Todo.from_line()`, which returns one `Result` (with a formatted error
+message) per line, the functions in this module scan an entire file and only
+allocate something for the lines that are actually malformed.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+import datetime as dt
+from pathlib import Path
+import re
+from typing import (
+    Dict,
+    Final,
+    Iterable,
+    Iterator,
+    List,
+    Literal,
+    Optional,
+    Tuple,
+)
+
+from ._todo import RE_DATE, Todo, _parse_desc
+from .clock import lazily_frozen
+from .types import PathLike
+
+
+# The kinds of problems that `lint()` can report.
+ErrorKind = Literal["bad_description", "invalid_date"]
+
+# Matches the (optional) fields that come before a todo's description.
+_HEADER_PATTERN: Final = re.compile(
+    r"(?:x[ ]+)?(?:\([A-Z]\)[ ]+)?(?:(?:{0})[ ]+)?(?:(?:{0})[ ]+)?".format(
+        RE_DATE
+    )
+)
+# Matches the same lines that RE_TODO matches, but stops at the first
+# character of the description instead of consuming the whole line.
+_VALID_PREFIX_PATTERN: Final = re.compile(
+    r"""
+\s*
+(?:x[ ]+)?
+(?:\([A-Z]\)[ ]+)?
+(?:
+    (?:(?P<done_date>{0})[ ]+)?
+    (?:(?P<create_date>{0})[ ]+)
+)?
+[A-Za-z0-9+@]
+""".format(
+        RE_DATE
+    ),
+    re.VERBOSE,
+)
+_MESSAGES: Final = {
+    "bad_description": (
+        "The todo's description must start with a letter, digit, '+' or '@'."
+    ),
+    "invalid_date": "This date does not exist.",
+}
+
+
+@dataclass(frozen=True)
+class Diagnostic:
+    """A single problem found while linting a todo.txt file.
+
+    Attributes:
+        lineno: The (1-based) number of the line this problem was found on.
+        column: The (1-based) column this problem was found at.
+        kind: The kind of problem that was found.
+        line: The offending line.
+    """
+
+    lineno: int
+    column: int
+    kind: ErrorKind
+    line: str
+
+    @property
+    def message(self) -> str:
+        """A human-readable description of this problem."""
+        return f"{self.lineno}:{self.column}: {_MESSAGES[self.kind]}"
+
+
+def lint(lines: Iterable[str]) -> List[Diagnostic]:
+    """Validates every line in `lines`.
+
+    Blank lines are ignored. Lines are numbered starting from 1.
+
+    Returns:
+        A list of all problems found (sorted by line number).
+    """
+    return [diag for _, diag in _check_lines(lines) if diag is not None]
+
+
+def lint_file(path: PathLike) -> List[Diagnostic]:
+    """Validates every line in the todo.txt file located at `path`."""
+    with Path(path).open() as todo_file:
+        return lint(todo_file)
+
+
+def load(
+    lines: Iterable[str], *, lenient: bool = False
+) -> Tuple[List[Todo], List[Diagnostic]]:
+    """Constructs a Todo object for each (valid) line in `lines`.
+
+    Args:
+        lines: The lines to parse. Blank lines are ignored.
+        lenient: If this option is set, malformed lines are recovered by
+          treating the whole line as a plain description (i.e. as a todo
+          without a priority, dates, etc., but with any tags / metadata that
+          the line contains). Recovered todos are written back verbatim
+          (see `Todo.to_source_line()`) unless they are changed. Otherwise,
+          malformed lines are skipped.
+
+    Returns:
+        A (todos, diagnostics) tuple.
+    """
+    todos = []
+    diagnostics = []
+    # Every todo shares the same (default) timestamps, but the clock is only
+    # read if some todo actually needs it.
+    with lazily_frozen(Todo.clock):
+        for line, diag in _check_lines(lines):
+            if diag is None:
+                if line.strip():
+                    todos.append(Todo.from_line(line).unwrap())
+                continue
+
+            diagnostics.append(diag)
+            if lenient:
+                todos.append(_recover(line))
+
+    return todos, diagnostics
+
+
+def _recover(line: str) -> Todo:
+    """Constructs a Todo whose description is the whole (malformed) line."""
+    desc = line.strip()
+    projects, contexts, epics, metadata = _parse_desc(desc)
+    todo = Todo(
+        contexts=contexts,
+        desc=desc,
+        epics=epics,
+        metadata=metadata,
+        projects=projects,
+    )
+    todo.source_line = line.rstrip("\r\n")
+    return todo
+
+
+def _check_lines(
+    lines: Iterable[str],
+) -> Iterator[Tuple[str, Optional[Diagnostic]]]:
+    """Yields each line paired with a Diagnostic (or None, if it is OK)."""
+    # Maps each date string we have seen to a boolean that tells us whether
+    # or not it is a real date.
+    date_cache: Dict[str, bool] = {}
+    for lineno, line in enumerate(lines, start=1):
+        re_prefix_match = _VALID_PREFIX_PATTERN.match(line)
+        if re_prefix_match is None:
+            if not line.strip():
+                yield line, None
+                continue
+
+            stripped = line.lstrip()
+            header_match = _HEADER_PATTERN.match(stripped)
+            # The header pattern is entirely optional, so it always matches.
+            assert header_match is not None
+            column = len(line) - len(stripped) + header_match.end() + 1
+            yield line, Diagnostic(
+                lineno, column, "bad_description", line.rstrip("\n")
+            )
+            continue
+
+        diag = None
+        for group in ("done_date", "create_date"):
+            date_string = re_prefix_match.group(group)
+            if date_string is None:
+                continue
+
+            is_valid = date_cache.get(date_string)
+            if is_valid is None:
+                is_valid = date_cache[date_string] = _is_valid_date(
+                    date_string
+                )
+
+            if not is_valid:
+                column = re_prefix_match.start(group) + 1
+                diag = Diagnostic(
+                    lineno, column, "invalid_date", line.rstrip("\n")
+                )
+                break
+
+        yield line, diag
+
+
+def _is_valid_date(yyyymmdd: str) -> bool:
+    try:
+        dt.date(int(yyyymmdd[:4]), int(yyyymmdd[5:7]), int(yyyymmdd[8:]))
+    except ValueError:
+        return False
+    return True
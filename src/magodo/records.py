@@ -0,0 +1,228 @@
+"""Streaming conversion of todos to / from JSON Lines and CSV records.
+
+Every `TodoProto` field (including the metadata dictionary) is exported, so
+loading an exported todo produces a Todo that is equal to the original. All
+functions in this module work on iterators and write their output in
+batches, so memory usage does not depend on the number of todos converted.
+
+Records are loaded as plain Todo objects. To load a MagicTodo, wrap each
+loaded Todo (e.g. `MyMagicTodo(todo)`).
+"""
+
+from __future__ import annotations
+
+import csv
+import datetime as dt
+import json
+from json.encoder import encode_basestring
+from typing import (
+    Any,
+    Dict,
+    Final,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    TextIO,
+    Tuple,
+)
+
+from eris import Err
+
+from ._todo import Todo
+from .clock import Clock, active_clock, once, use_clock
+from .types import Metadata, TodoProto
+
+
+# The name of every field stored in a record (in the order they are stored).
+FIELDS: Final = (
+    "done",
+    "priority",
+    "create_date",
+    "done_date",
+    "desc",
+    "projects",
+    "contexts",
+    "epics",
+    "metadata",
+)
+DEFAULT_BATCH_SIZE: Final = 1000
+
+
+def parse_lines(lines: Iterable[str]) -> Iterator[Todo]:
+    """Lazily constructs a Todo for each valid (non-blank) line in `lines`."""
+    batch_clock = _batch_clock()
+    for line in lines:
+        with use_clock(batch_clock):
+            todo_result = Todo.from_line(line)
+        if isinstance(todo_result, Err):
+            continue
+        yield todo_result.ok()
+
+
+def dump_jsonl(
+    todos: Iterable[TodoProto],
+    fp: TextIO,
+    *,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> int:
+    """Writes one JSON object per todo to `fp`.
+
+    Each JSON object is rendered directly from the todo's fields (i.e. no
+    intermediate dictionary is built for each todo).
+
+    Returns:
+        The number of todos written.
+    """
+    return _dump_in_batches(map(_to_json, todos), fp, batch_size)
+
+
+def load_jsonl(fp: Iterable[str]) -> Iterator[Todo]:
+    """Lazily constructs a Todo for each JSON object in `fp`."""
+    batch_clock = _batch_clock()
+    for line in fp:
+        if line.strip():
+            with use_clock(batch_clock):
+                todo = _from_record(json.loads(line))
+            yield todo
+
+
+def dump_csv(
+    todos: Iterable[TodoProto],
+    fp: TextIO,
+    *,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> int:
+    """Writes a CSV header row and then one CSV row per todo to `fp`.
+
+    A todo's tags are joined by spaces and its metadata is stored as
+    space-separated KEY:VALUE pairs, which is lossless since neither can
+    contain a space.
+
+    Returns:
+        The number of todos written.
+    """
+    writer = csv.writer(fp)
+    writer.writerow(FIELDS)
+
+    count = 0
+    batch: List[Tuple[str, ...]] = []
+    for todo in todos:
+        batch.append(_to_csv_row(todo))
+        if len(batch) >= batch_size:
+            writer.writerows(batch)
+            count += len(batch)
+            batch.clear()
+
+    writer.writerows(batch)
+    return count + len(batch)
+
+
+def load_csv(fp: Iterable[str]) -> Iterator[Todo]:
+    """Lazily constructs a Todo for each CSV row in `fp`.
+
+    The first row of `fp` must be the header row written by `dump_csv()`.
+    """
+    batch_clock = _batch_clock()
+    for row in csv.DictReader(fp):
+        metadata: Metadata = {}
+        for kv in row["metadata"].split():
+            key, value = kv.split(":", maxsplit=1)
+            metadata[key] = value
+
+        with use_clock(batch_clock):
+            todo = Todo(
+                contexts=tuple(row["contexts"].split()),
+                create_date=_to_optional_date(row["create_date"]),
+                desc=row["desc"],
+                done_date=_to_optional_date(row["done_date"]),
+                done=bool(row["done"]),
+                epics=tuple(row["epics"].split()),
+                metadata=metadata,
+                priority=row["priority"],  # type: ignore[arg-type]
+                projects=tuple(row["projects"].split()),
+            )
+        yield todo
+
+
+def _batch_clock() -> Clock:
+    """Returns the clock shared by every todo that one loader constructs.
+
+    Like `clock.lazily_frozen()`, the clock is only read once (and only if
+    some todo needs it). The loaders above are generators, so they activate
+    this clock around each todo they construct instead of using a `with`
+    block that would stay open (and leak into the caller) across yields.
+    """
+    return once(active_clock(Todo.clock))
+
+
+def _dump_in_batches(lines: Iterable[str], fp: TextIO, batch_size: int) -> int:
+    count = 0
+    batch: List[str] = []
+    for line in lines:
+        batch.append(line)
+        if len(batch) >= batch_size:
+            fp.write("".join(batch))
+            count += len(batch)
+            batch.clear()
+
+    fp.write("".join(batch))
+    return count + len(batch)
+
+
+def _to_json(todo: TodoProto) -> str:
+    metadata = ",".join(
+        encode_basestring(key) + ":" + encode_basestring(value)
+        for key, value in todo.metadata.items()
+    )
+    return (
+        f'{{"done":{"true" if todo.done else "false"}'
+        f',"priority":"{todo.priority}"'
+        f',"create_date":{_date_to_json(todo.create_date)}'
+        f',"done_date":{_date_to_json(todo.done_date)}'
+        f',"desc":{encode_basestring(todo.desc)}'
+        f',"projects":{_tags_to_json(todo.projects)}'
+        f',"contexts":{_tags_to_json(todo.contexts)}'
+        f',"epics":{_tags_to_json(todo.epics)}'
+        f',"metadata":{{{metadata}}}}}\n'
+    )
+
+
+def _date_to_json(date: Optional[dt.date]) -> str:
+    return "null" if date is None else f'"{date.isoformat()}"'
+
+
+def _tags_to_json(tags: Tuple[str, ...]) -> str:
+    return "[" + ",".join(map(encode_basestring, tags)) + "]"
+
+
+def _from_record(record: Dict[str, Any]) -> Todo:
+    return Todo(
+        contexts=tuple(record["contexts"]),
+        create_date=_to_optional_date(record["create_date"]),
+        desc=record["desc"],
+        done_date=_to_optional_date(record["done_date"]),
+        done=record["done"],
+        epics=tuple(record["epics"]),
+        metadata=record["metadata"],
+        priority=record["priority"],
+        projects=tuple(record["projects"]),
+    )
+
+
+def _to_csv_row(todo: TodoProto) -> Tuple[str, ...]:
+    return (
+        "x" if todo.done else "",
+        todo.priority,
+        "" if todo.create_date is None else todo.create_date.isoformat(),
+        "" if todo.done_date is None else todo.done_date.isoformat(),
+        todo.desc,
+        " ".join(todo.projects),
+        " ".join(todo.contexts),
+        " ".join(todo.epics),
+        " ".join(f"{key}:{value}" for key, value in todo.metadata.items()),
+    )
+
+
+def _to_optional_date(yyyymmdd: Optional[str]) -> Optional[dt.date]:
+    return dt.date.fromisoformat(yyyymmdd) if yyyymmdd else None
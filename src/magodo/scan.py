@@ -0,0 +1,201 @@
+"""Scan the raw bytes of todo.txt files without building todo objects.
+
+The functions in this module select lines using a few simple predicates
+(done state, priority, and tags) that are evaluated directly against the
+bytes of a (memory-mapped) file. A single compiled regex is used to find
+candidate lines, so the lines that cannot possibly match are skipped at C
+speed, and only the candidates are checked against the same rules that
+`Todo.from_line()` uses (i.e. `RE_TODO` and the tag rules from
+`magodo.tags`).
+
+Example:
+    >>> from pathlib import Path
+    >>> from tempfile import TemporaryDirectory
+    >>> with TemporaryDirectory() as tmp:
+    ...     path = Path(tmp) / "todo.txt"
+    ...     _ = path.write_text("(A) Pay rent +home\\nx Buy milk +home\\n")
+    ...     list(scan(path, done=False, tags=["+home"]))
+    [(0, b'(A) Pay rent +home')]
+"""
+
+from __future__ import annotations
+
+import mmap
+import re
+from typing import (
+    Final,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Pattern,
+    Tuple,
+    Union,
+)
+
+from ._common import DEFAULT_PRIORITY, PUNCTUATION
+from ._todo import RE_TODO, _clean_value
+from .tags import CONTEXT_PREFIX, EPIC_PREFIX, PROJECT_PREFIX, is_prefix_tag
+from .types import PathLike, Priority
+
+
+# Type of the (offset, line) pairs yielded by `scan()`.
+ScanMatch = Tuple[int, bytes]
+# Type of the buffers that `scan_bytes()` accepts.
+Buffer = Union[bytes, mmap.mmap]
+
+_TAG_PREFIXES: Final = (CONTEXT_PREFIX, EPIC_PREFIX, PROJECT_PREFIX)
+# The same whitespace characters that `str.strip()` removes (minus newlines).
+_LEADING_SPACE: Final = rb"[ \t\r\f\v]*"
+_TODO_BYTES_PATTERN: Final = re.compile(RE_TODO.encode(), re.VERBOSE)
+# Matches wherever a tag could end (see `_clean_value()`).
+_TAG_END: Final = rb"(?![^\s'" + re.escape(PUNCTUATION.encode()) + rb"])"
+# Matches the start of every line.
+_LINE_START_PATTERN: Final = re.compile(rb"^", re.MULTILINE)
+
+
+def scan(
+    path: PathLike,
+    *,
+    done: Optional[bool] = None,
+    priority: Optional[Priority] = None,
+    tags: Iterable[str] = (),
+) -> Iterator[ScanMatch]:
+    """Yields the todo lines in a todo.txt file that satisfy every predicate.
+
+    Lines that are not valid todos (e.g. blank lines) are never yielded.
+
+    Args:
+        path: The todo.txt file to scan.
+        done: If set, only yield todos whose done state matches `done`.
+        priority: If set, only yield todos with this priority.
+        tags: Only yield todos that contain every one of these tags. Each tag
+          includes its prefix (e.g. '+project', '@context', or '#epic').
+
+    Yields:
+        (offset, line) pairs, where `offset` is the byte offset of the start
+        of `line` in the file and `line` does not include its line ending.
+
+    Raises:
+        ValueError: If one of `tags` is not a valid tag.
+    """
+    with open(path, "rb") as todo_file:
+        try:
+            buffer = mmap.mmap(todo_file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files cannot be memory-mapped.
+            return
+
+    with buffer:
+        yield from scan_bytes(buffer, done=done, priority=priority, tags=tags)
+
+
+def scan_bytes(
+    data: Buffer,
+    *,
+    done: Optional[bool] = None,
+    priority: Optional[Priority] = None,
+    tags: Iterable[str] = (),
+) -> Iterator[ScanMatch]:
+    """Like `scan()`, but scans a bytes-like object (e.g. an mmap) instead."""
+    tag_list = list(tags)
+    for tag in tag_list:
+        if tag[:1] not in _TAG_PREFIXES or not is_prefix_tag(tag[0], tag):
+            raise ValueError(f"Invalid tag: {tag!r}")
+
+    candidate_pattern = _candidate_pattern(done, priority, tag_list)
+    size = len(data)
+    pos = 0
+    while pos <= size:
+        match = candidate_pattern.search(data, pos)
+        if match is None:
+            break
+
+        start = data.rfind(b"\n", 0, match.start()) + 1
+        end = data.find(b"\n", match.end())
+        if end == -1:
+            end = size
+
+        line = data[start:end]
+        if _is_match(line, done, priority, tag_list):
+            yield start, line.rstrip(b"\r")
+
+        # Each line is checked at most once.
+        pos = end + 1
+
+
+def count(
+    path: PathLike,
+    *,
+    done: Optional[bool] = None,
+    priority: Optional[Priority] = None,
+    tags: Iterable[str] = (),
+) -> int:
+    """Returns the number of lines that `scan()` would yield."""
+    return sum(1 for _ in scan(path, done=done, priority=priority, tags=tags))
+
+
+def _candidate_pattern(
+    done: Optional[bool], priority: Optional[Priority], tags: List[str]
+) -> Pattern[bytes]:
+    """Returns a regex that matches (at least) every line we might yield.
+
+    We use the most selective predicate that we can turn into a regex: the
+    longest tag, then the priority, and then the done state.
+    """
+    tag = max(tags, key=len, default=None)
+    if tag is not None:
+        # NOTE: Checking that the tag starts a word would need a lookbehind,
+        #   which disables the regex engine's fast literal search.
+        return re.compile(re.escape(tag.encode()) + _TAG_END)
+
+    if priority is not None and priority != DEFAULT_PRIORITY:
+        done_prefix = rb"x[ ]+" if done else rb"(?:x[ ]+)?"
+        return re.compile(
+            rb"^"
+            + _LEADING_SPACE
+            + done_prefix
+            + rb"\("
+            + re.escape(priority.encode())
+            + rb"\) ",
+            re.MULTILINE,
+        )
+
+    if done:
+        return re.compile(rb"^" + _LEADING_SPACE + rb"x ", re.MULTILINE)
+
+    return _LINE_START_PATTERN
+
+
+def _is_match(
+    line: bytes,
+    done: Optional[bool],
+    priority: Optional[Priority],
+    tags: List[str],
+) -> bool:
+    """Checks `line` against every predicate using the Todo parsing rules."""
+    todo_match = _TODO_BYTES_PATTERN.match(line.strip())
+    if todo_match is None:
+        return False
+
+    if done is not None and bool(todo_match.group("x")) != done:
+        return False
+
+    if priority is not None:
+        priority_bytes = todo_match.group("priority")
+        line_priority = (
+            priority_bytes.decode() if priority_bytes else DEFAULT_PRIORITY
+        )
+        if line_priority != priority:
+            return False
+
+    if not tags:
+        return True
+
+    words = todo_match.group("desc").decode(errors="replace").split(" ")
+    line_tags = {
+        word[0] + _clean_value(word[1:])
+        for word in words
+        if any(is_prefix_tag(prefix, word) for prefix in _TAG_PREFIXES)
+    }
+    return all(tag in line_tags for tag in tags)
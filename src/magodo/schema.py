@@ -0,0 +1,147 @@
+"""Decoders that turn metadata values (i.e. strings) into typed values.
+
+A metadata schema maps metadata keys to the decoder used to decode their
+values. Every todo class has a `metadata_schema` class attribute, which
+determines how its `typed_metadata` are decoded (and is used to compare
+todos). For example, a MagicTodo class that tracks due dates and effort
+estimates might use the following schema:
+
+    metadata_schema = {
+        **DEFAULT_SCHEMA,
+        "due": decode_date,
+        "est": decode_duration,
+        "effort": enum_decoder(["low", "medium", "high"]),
+    }
+
+Decoders raise a ValueError when they are given an invalid value. Invalid
+values are left out of a todo's typed metadata (the raw string values in
+`todo.metadata` are never changed).
+"""
+
+from __future__ import annotations
+
+import datetime as dt
+import re
+from typing import Any, Callable, Dict, Final, Iterable, Mapping
+
+from .types import Metadata
+
+
+# Type of a function that decodes a single metadata value.
+Decoder = Callable[[str], Any]
+# Type of a metadata schema (maps metadata keys to decoders).
+MetadataSchema = Mapping[str, Decoder]
+
+_DURATION_PATTERN: Final = re.compile(
+    r"(?:(?P<w>[0-9]+)w)?"
+    r"(?:(?P<d>[0-9]+)d)?"
+    r"(?:(?P<h>[0-9]+)h)?"
+    r"(?:(?P<m>[0-9]+)m)?"
+)
+_TIME_PATTERN: Final = re.compile(r"([0-2][0-9]):?([0-5][0-9])")
+
+
+def decode_date(value: str) -> dt.date:
+    """Decodes a YYYY-MM-DD date (e.g. 'due:2022-12-31').
+
+    Examples:
+        >>> decode_date("2022-12-31")
+        datetime.date(2022, 12, 31)
+    """
+    if len(value) != 10:
+        raise ValueError(f"Invalid date: {value!r}")
+    return dt.date.fromisoformat(value)
+
+
+def decode_time(value: str) -> dt.time:
+    """Decodes an HHMM (or HH:MM) time (e.g. 'ctime:0930').
+
+    Examples:
+        >>> decode_time("0930")
+        datetime.time(9, 30)
+    """
+    match = _TIME_PATTERN.fullmatch(value)
+    if match is None:
+        raise ValueError(f"Invalid time: {value!r}")
+    return dt.time(int(match.group(1)), int(match.group(2)))
+
+
+def decode_int(value: str) -> int:
+    """Decodes a (base 10) integer (e.g. 'id:42').
+
+    Examples:
+        >>> decode_int("42")
+        42
+    """
+    if not value.isdigit():
+        raise ValueError(f"Invalid integer: {value!r}")
+    return int(value)
+
+
+def decode_duration(value: str) -> dt.timedelta:
+    """Decodes a duration made up of weeks, days, hours, and minutes.
+
+    Examples:
+        >>> decode_duration("1h30m")
+        datetime.timedelta(seconds=5400)
+
+        >>> decode_duration("2w")
+        datetime.timedelta(days=14)
+    """
+    match = _DURATION_PATTERN.fullmatch(value)
+    if not value or match is None:
+        raise ValueError(f"Invalid duration: {value!r}")
+
+    weeks, days, hours, minutes = (
+        int(group or 0) for group in match.group("w", "d", "h", "m")
+    )
+    return dt.timedelta(weeks=weeks, days=days, hours=hours, minutes=minutes)
+
+
+def enum_decoder(choices: Iterable[str]) -> Decoder:
+    """Returns a decoder that only accepts one of `choices`.
+
+    Examples:
+        >>> decode_effort = enum_decoder(["low", "high"])
+        >>> decode_effort("low")
+        'low'
+    """
+    valid_choices = frozenset(choices)
+
+    def decode_enum(value: str) -> str:
+        if value not in valid_choices:
+            raise ValueError(
+                f"Invalid choice: {value!r} (choose from:"
+                f" {sorted(valid_choices)})"
+            )
+        return value
+
+    return decode_enum
+
+
+# The schema used by todo classes that do not define their own.
+DEFAULT_SCHEMA: Final[MetadataSchema] = {
+    "ctime": decode_time,
+    "dtime": decode_time,
+    "id": decode_int,
+}
+
+
+def decode_metadata(
+    metadata: Metadata, schema: MetadataSchema
+) -> Dict[str, Any]:
+    """Decodes every value in `metadata` whose key is part of `schema`.
+
+    Values that fail to decode are left out of the result.
+    """
+    result: Dict[str, Any] = {}
+    for key, decode in schema.items():
+        value = metadata.get(key)
+        if value is None:
+            continue
+
+        try:
+            result[key] = decode(value)
+        except ValueError:
+            continue
+    return result
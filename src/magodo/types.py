@@ -4,16 +4,19 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 import datetime as dt
+import os
 from typing import (
     Any,
     Callable,
     Dict,
     Generic,
+    List,
     Literal,
     Protocol,
     Tuple,
     Type,
     TypeVar,
+    Union,
     runtime_checkable,
 )
 
@@ -53,6 +56,9 @@ Priority = Literal[
     "Z",
 ]
 
+# Type used for filesystem path arguments.
+PathLike = Union[str, "os.PathLike[str]"]
+
 # Type of a spell function which transforms a line (i.e. a str).
 LineSpell = Callable[[str], str]
 
@@ -145,3 +151,5 @@ class EnchantedTodo(Generic[T]):
 
 # Type of spell functions used by MagicTodo objects.
 TodoSpell = Callable[[T], EnchantedTodo[T]]
+# Type of spell functions that are cast on many todos at once.
+BatchTodoSpell = Callable[[List[T]], List[EnchantedTodo[T]]]
@@ -47,3 +47,19 @@ def assert_todos_equal(actual: TodoProto, expected: TodoProto) -> None:
     assert (
         actual.metadata == expected.metadata
     ), f"{actual.metadata!r} != {expected.metadata!r}"
+
+
+class TickingClock:
+    """A clock that moves forward one day and one minute every time it is read.
+
+    Attributes:
+        calls: The number of times this clock has been read.
+    """
+
+    def __init__(self, start: dt.datetime) -> None:
+        self.calls = 0
+        self._start = start
+
+    def __call__(self) -> dt.datetime:
+        self.calls += 1
+        return self._start + self.calls * dt.timedelta(days=1, minutes=1)
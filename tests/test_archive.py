@@ -0,0 +1,104 @@
+"""Tests for the magodo.archive module."""
+
+from __future__ import annotations
+
+import datetime as dt
+from pathlib import Path
+
+from magodo import archive, clock
+from magodo.dates import to_date
+
+from .shared import TickingClock
+
+
+TODO_LINES = [
+    "(A) 2023-04-01 an open todo +proj",
+    "x 2023-04-03 2023-04-01 done in april",
+    "x 2023-05-10 2023-04-01 done in may",
+    "not a todo: ???",
+    "x 2023-05-01 2023-04-02 also done in may",
+    "2023-04-05 another open todo",
+]
+
+
+def test_archive(tmp_path: Path) -> None:
+    """Test that done todos are moved into monthly partitions."""
+    todo_txt = tmp_path / "todo.txt"
+    todo_txt.write_text("\n".join(TODO_LINES) + "\n")
+    done_dir = tmp_path / "done"
+
+    manifest = archive.archive(todo_txt, done_dir)
+
+    assert todo_txt.read_text().splitlines() == [
+        TODO_LINES[0],
+        TODO_LINES[3],
+        TODO_LINES[5],
+    ]
+    assert sorted(manifest) == ["2023-04", "2023-05"]
+    assert manifest["2023-05"].count == 2
+    assert manifest["2023-05"].min_date == to_date("2023-05-01")
+    assert manifest["2023-05"].max_date == to_date("2023-05-10")
+    assert (done_dir / "done.2023-04.txt").read_text() == TODO_LINES[1] + "\n"
+    assert archive.read_manifest(done_dir) == manifest
+
+    # A second run should append to existing partitions.
+    todo_txt.write_text("x 2023-05-20 2023-05-01 done later in may\n")
+    manifest = archive.archive(todo_txt, done_dir)
+
+    assert todo_txt.read_text() == ""
+    assert manifest["2023-05"].count == 3
+    assert manifest["2023-05"].max_date == to_date("2023-05-20")
+
+
+def test_iter_done(tmp_path: Path) -> None:
+    """Test that range queries only return todos from matching dates."""
+    todo_txt = tmp_path / "todo.txt"
+    todo_txt.write_text("\n".join(TODO_LINES) + "\n")
+    done_dir = tmp_path / "done"
+    manifest = archive.archive(todo_txt, done_dir)
+
+    start, end = to_date("2023-05-01"), to_date("2023-05-05")
+    assert [
+        p.name for p in archive.select_partitions(manifest, start, end)
+    ] == ["2023-05"]
+    assert [todo.desc for todo in archive.iter_done(done_dir, start, end)] == [
+        "also done in may"
+    ]
+    assert len(list(archive.iter_done(done_dir))) == 3
+
+
+def test_archive_reads_clock_once(tmp_path: Path) -> None:
+    """Test that archive() only reads the clock once."""
+    todo_txt = tmp_path / "todo.txt"
+    todo_txt.write_text("foo\nbar\nbaz\n")
+
+    ticking_clock = TickingClock(dt.datetime(2022, 1, 31, 9, 30))
+    with clock.use_clock(ticking_clock):
+        archive.archive(todo_txt, tmp_path / "done")
+
+    assert ticking_clock.calls == 1
+    assert todo_txt.read_text() == "foo\nbar\nbaz\n"
+
+
+def test_archive_undated(tmp_path: Path) -> None:
+    """Test that done todos without a done date keep the date they got."""
+    todo_txt = tmp_path / "todo.txt"
+    todo_txt.write_text("x undated\nx (A) 2023-04-01 created only\n")
+    done_dir = tmp_path / "done"
+    archived_on = dt.datetime(2023, 5, 31, 9, 30)
+    with clock.frozen(archived_on):
+        manifest = archive.archive(todo_txt, done_dir)
+
+    assert sorted(manifest) == ["2023-05"]
+    assert (done_dir / "done.2023-05.txt").read_text().splitlines() == [
+        "x 2023-05-31 2023-05-31 undated",
+        "x (A) 2023-05-31 2023-04-01 created only",
+    ]
+
+    # Reading the archive back later still finds these todos.
+    with clock.frozen(archived_on + dt.timedelta(days=1)):
+        done_todos = list(
+            archive.iter_done(done_dir, archived_on.date(), archived_on.date())
+        )
+    assert [todo.desc for todo in done_todos] == ["undated", "created only"]
+    assert {todo.done_date for todo in done_todos} == {archived_on.date()}
@@ -0,0 +1,86 @@
+"""Tests for the magodo.bulk module."""
+
+from __future__ import annotations
+
+import datetime as dt
+from pathlib import Path
+
+import pytest
+
+from magodo import Todo
+from magodo.bulk import complete, rename_tag, rewrite, set_priority
+
+
+def _todo(line: str) -> Todo:
+    return Todo.from_line(line).unwrap()
+
+
+def test_complete() -> None:
+    """Test that todos completed in one batch share the same timestamp."""
+    todos = [
+        _todo("2022-01-01 Buy milk @errands"),
+        _todo("2022-01-01 Call mom"),
+        _todo("2022-01-01 Buy eggs @errands"),
+    ]
+    now = dt.datetime(2022, 2, 3, 4, 5)
+    new_todos = complete(
+        todos, lambda todo: "errands" in todo.contexts, now=now
+    )
+
+    assert new_todos[1] is todos[1]
+    for todo in [new_todos[0], new_todos[2]]:
+        assert todo.done
+        assert todo.done_date == now.date()
+        assert todo.metadata["dtime"] == "0405"
+
+    # The original todos are left untouched.
+    assert not todos[0].done
+    assert "dtime" not in todos[0].metadata
+
+
+def test_set_priority() -> None:
+    """Test that priorities are only changed when they need to be."""
+    todos = [_todo("(A) foo +release"), _todo("bar +release"), _todo("baz")]
+    new_todos = set_priority(
+        todos, lambda todo: "release" in todo.projects, "A"
+    )
+    assert [todo.priority for todo in new_todos] == ["A", "A", "O"]
+    assert new_todos[0] is todos[0]
+    assert new_todos[2] is todos[2]
+
+
+def test_rename_tag() -> None:
+    """Test that renaming a tag updates the description and tag tuple."""
+    todos = [
+        _todo("Ship +old, then +other +old"),
+        _todo("Do +older things"),
+    ]
+    new_todos = rename_tag(todos, "+old", "+new")
+    assert new_todos[0].desc == "Ship +new, then +other +new"
+    assert new_todos[0].projects == ("new", "other")
+    assert new_todos[1] is todos[1]
+
+    with pytest.raises(ValueError):
+        rename_tag(todos, "old", "+new")
+    with pytest.raises(ValueError):
+        rename_tag(todos, "+old", "@new")
+
+
+def test_rewrite(tmp_path: Path) -> None:
+    """Test that bulk changes are persisted using a single write."""
+    todo_txt = tmp_path / "todo.txt"
+    todo_txt.write_text(
+        "2022-01-01 foo +old\n\n(B)  bar\n2022-01-01 baz +old\n"
+    )
+
+    count = rewrite(todo_txt, lambda todos: rename_tag(todos, "+old", "+new"))
+    assert count == 2
+    # Todos that did not change are written back verbatim.
+    assert (
+        todo_txt.read_text()
+        == "2022-01-01 foo +new\n\n(B)  bar\n2022-01-01 baz +new\n"
+    )
+
+    mtime_ns = todo_txt.stat().st_mtime_ns
+    assert rewrite(todo_txt, lambda todos: todos) == 0
+    assert todo_txt.stat().st_mtime_ns == mtime_ns
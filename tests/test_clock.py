@@ -0,0 +1,127 @@
+"""Tests for the magodo.clock module."""
+
+from __future__ import annotations
+
+import datetime as dt
+from typing import List
+
+from magodo import LazyTodo, MagicTodoMixin, Todo, bulk, clock
+
+
+NOW = dt.datetime(2022, 1, 31, 9, 30)
+LATER = dt.datetime(2022, 2, 1, 17, 5)
+
+
+class ClockTodo(Todo):
+    """A Todo class that uses its own clock."""
+
+    clock = staticmethod(lambda: LATER)
+
+
+class MagicClockTodo(MagicTodoMixin):
+    """A MagicTodo class that uses its own clock."""
+
+    clock = staticmethod(lambda: LATER)
+
+
+def test_frozen() -> None:
+    """Test that todos created in a frozen() block share the same time."""
+    with clock.frozen(NOW) as frozen_now:
+        assert frozen_now == NOW
+        todos = [Todo(f"todo #{i}", done=True) for i in range(3)]
+        lazy_todo = LazyTodo.from_line("x lazy todo").unwrap()
+
+    for todo in [*todos, lazy_todo]:
+        assert todo.create_date == NOW.date()
+        assert todo.done_date == NOW.date()
+
+    # LazyTodo objects read the clock once their metadata is extracted.
+    with clock.frozen(LATER):
+        assert lazy_todo.metadata == {"ctime": "1705", "dtime": "1705"}
+    assert [todo.metadata for todo in todos] == [
+        {"ctime": "0930", "dtime": "0930"}
+    ] * 3
+
+
+def test_class_clock() -> None:
+    """Test that todo classes can set their own clocks."""
+    todo = ClockTodo("foo")
+    assert todo.create_date == LATER.date()
+    assert todo.metadata == {"ctime": "1705"}
+
+    # Clocks that are set using a `with` statement take precedence.
+    with clock.use_clock(lambda: NOW):
+        assert ClockTodo("foo").metadata == {"ctime": "0930"}
+
+
+def test_magic_class_clock() -> None:
+    """Test that MagicTodo classes apply their clocks to the todos they make.
+    """
+    todo = MagicClockTodo.from_line("foo").unwrap()
+    assert todo.create_date == LATER.date()
+    assert todo.metadata == {"ctime": "1705"}
+
+    done_todo = todo.new(done=True)
+    assert done_todo.done_date == LATER.date()
+    assert done_todo.metadata["dtime"] == "1705"
+
+    [batch_todo] = MagicClockTodo.from_lines(["bar"])
+    assert batch_todo.metadata == {"ctime": "1705"}
+
+    # Clocks that are set using a `with` statement still take precedence.
+    with clock.frozen(NOW):
+        assert MagicClockTodo.from_line("foo").unwrap().metadata == {
+            "ctime": "0930"
+        }
+        assert todo.new(done=True).metadata["dtime"] == "0930"
+
+
+def test_lazily_frozen() -> None:
+    """Test that from_lines() only reads the clock if a todo needs it."""
+    calls: List[dt.datetime] = []
+
+    def counting_clock() -> dt.datetime:
+        calls.append(NOW)
+        return NOW
+
+    with clock.use_clock(counting_clock):
+        MagicClockTodo.from_lines(["2022-01-01 foo ctime:1200"] * 3)
+        assert not calls
+
+        todos = MagicClockTodo.from_lines(["foo", "bar"], chunk_size=1)
+        assert len(calls) == 1
+
+    assert [todo.metadata for todo in todos] == [{"ctime": "0930"}] * 2
+
+
+def test_unused_clock() -> None:
+    """Test that the clock is not read when it is not needed."""
+    calls: List[dt.datetime] = []
+
+    def counting_clock() -> dt.datetime:
+        calls.append(NOW)
+        return NOW
+
+    with clock.use_clock(counting_clock):
+        todo = Todo.from_line("2022-01-01 foo ctime:1200").unwrap()
+        todo.new(desc="bar")
+        assert not calls
+
+        todo.new(done=True)
+        assert len(calls) == 1
+
+
+def test_bulk_complete() -> None:
+    """Test that bulk.complete() uses the active clock."""
+    with clock.frozen(NOW):
+        todos = bulk.complete([Todo("foo"), Todo("bar")], lambda _: True)
+
+    assert [todo.done_date for todo in todos] == [NOW.date()] * 2
+    assert [todo.metadata["dtime"] for todo in todos] == ["0930"] * 2
+
+
+def test_sorted_tags() -> None:
+    """Test that tags are still sorted when a todo is constructed."""
+    todo = Todo("foo", projects=("b", "a"), contexts=["c"])  # type: ignore
+    assert todo.projects == ("a", "b")
+    assert todo.contexts == ("c",)
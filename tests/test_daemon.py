@@ -0,0 +1,153 @@
+"""Tests for the magodo.daemon module."""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+import socket
+import threading
+from typing import Iterator
+
+import pytest
+
+from magodo import daemon
+
+
+@pytest.fixture(name="todo_txt")
+def todo_txt_fixture(tmp_path: Path) -> Path:
+    """A todo.txt file with a few todos in it."""
+    todo_txt = tmp_path / "todo.txt"
+    todo_txt.write_text(
+        "(A) 2022-01-01 Write the quarterly report\n"
+        "2022-01-01 Call support about the printer\n"
+        "x 2022-01-02 2022-01-01 Pay rent\n"
+    )
+    return todo_txt
+
+
+@pytest.fixture(name="server")
+def server_fixture(todo_txt: Path) -> Iterator[daemon.TodoServer]:
+    """A daemon that serves `todo_txt` (in a background thread)."""
+    server = daemon.TodoServer(todo_txt)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+    yield server
+    server.shutdown()
+    thread.join()
+    server.server_close()
+
+
+def test_remote(todo_txt: Path, server: daemon.TodoServer) -> None:
+    """Test that requests are answered by a running daemon."""
+    with daemon.connect(todo_txt) as client:
+        assert client.is_remote
+        assert [line for _, line in client.query()] == [
+            "(A) 2022-01-01 Write the quarterly report",
+            "2022-01-01 Call support about the printer",
+        ]
+        assert len(client.query(include_done=True)) == 3
+        assert client.query("printer") == [
+            ("L2", "2022-01-01 Call support about the printer")
+        ]
+
+        ident, line = client.add("Buy a new printer")
+        assert line.endswith("Buy a new printer")
+        assert [i for i, _ in client.query("printer")] == ["L2", ident]
+
+        _, line = client.complete("L2")
+        assert line.startswith("x ")
+        assert [i for i, _ in client.query("printer")] == [ident]
+
+        with pytest.raises(KeyError):
+            client.complete("L42")
+        with pytest.raises(ValueError):
+            client.add("  ")
+
+
+def test_external_edit(todo_txt: Path, server: daemon.TodoServer) -> None:
+    """Test that edits survive when the file is changed by another program."""
+    with daemon.connect(todo_txt) as client:
+        ident, _ = client.add("Buy a new printer")
+        client.complete("L2")
+
+    # The daemon notices when the file is changed by some other program...
+    todo_txt.write_text("2022-01-03 Learn to juggle\n")
+    with daemon.connect(todo_txt) as client:
+        # ...and keeps the edits that still apply...
+        assert client.query() == [
+            ("L1", "2022-01-03 Learn to juggle"),
+            (ident, "Buy a new printer"),
+        ]
+
+    # ...while the edits that conflict with the other program's changes are
+    # moved to the journal's rejected file.
+    rejected_path = todo_txt.with_name("todo.txt.journal.rejected")
+    rejected = [json.loads(line) for line in rejected_path.open()]
+    assert [(entry["op"], entry["ident"]) for entry in rejected] == [
+        ("complete", "L2")
+    ]
+
+
+def test_bad_requests(todo_txt: Path, server: daemon.TodoServer) -> None:
+    """Test that malformed requests are answered with errors."""
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.connect(str(server.socket_path))
+    with sock, sock.makefile("rb") as rfile:
+        for request in [
+            b"not json",
+            b"[1]",
+            b'{"op": 1}',
+            b'{"op": "add"}',
+            b'{"op": "add", "line": 5}',
+            b'{"op": "complete", "ident": ["L1"]}',
+            b'{"op": "query", "limit": true}',
+            b'{"op": "query", "bogus": 1}',
+        ]:
+            sock.sendall(request + b"\n")
+            response = json.loads(rfile.readline())
+            assert response["error"] == "ValueError", request
+
+        # The daemon is still able to answer well-formed requests.
+        sock.sendall(b'{"op": "query", "limit": 1}\n')
+        response = json.loads(rfile.readline())
+        assert response["result"] == [
+            ["L1", "(A) 2022-01-01 Write the quarterly report"]
+        ]
+
+
+def test_already_running(todo_txt: Path, server: daemon.TodoServer) -> None:
+    """Test that a second daemon refuses to serve the same todo.txt file."""
+    with pytest.raises(ValueError):
+        daemon.TodoServer(todo_txt)
+
+    with daemon.connect(todo_txt) as client:
+        assert client.is_remote
+        assert len(client.query()) == 2
+
+
+def test_compact_on_shutdown(todo_txt: Path) -> None:
+    """Test that the daemon's journal is compacted when it shuts down."""
+    with daemon.TodoServer(todo_txt) as server:
+        thread = threading.Thread(target=server.serve_forever)
+        thread.start()
+        with daemon.connect(todo_txt) as client:
+            client.add("Buy a new printer")
+        server.shutdown()
+        thread.join()
+
+    assert not daemon.default_socket_path(todo_txt).exists()
+    assert todo_txt.read_text().rstrip().endswith("Buy a new printer")
+
+
+def test_in_process_fallback(todo_txt: Path) -> None:
+    """Test that requests are answered in-process when no daemon is running."""
+    with daemon.connect(todo_txt) as client:
+        assert not client.is_remote
+        ident, _ = client.add("Buy a new printer")
+        assert [i for i, _ in client.query("printer")] == ["L2", ident]
+
+    # Edits made in-process are journaled (and compacted when the client is
+    # closed) just like the daemon's edits are.
+    assert todo_txt.read_text().rstrip().endswith("Buy a new printer")
+    with daemon.connect(todo_txt) as client:
+        assert len(client.query()) == 3
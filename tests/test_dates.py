@@ -0,0 +1,33 @@
+"""Tests for the magodo.dates module."""
+
+from __future__ import annotations
+
+import datetime as dt
+
+from pytest import mark, raises
+
+from magodo.dates import from_date, to_date
+
+
+params = mark.parametrize
+
+
+@params(
+    "yyyymmdd,expected",
+    [
+        ("2022-01-31", dt.date(2022, 1, 31)),
+        ("2022-1-31", dt.date(2022, 1, 31)),
+        ("2022-12-5", dt.date(2022, 12, 5)),
+    ],
+)
+def test_to_date(yyyymmdd: str, expected: dt.date) -> None:
+    """Test that dates are parsed with or without zero-padding."""
+    assert to_date(yyyymmdd) == expected
+    assert to_date(from_date(expected)) == expected
+
+
+@params("yyyymmdd", ["2022-02-30", "2022-W05-1", "20220131", "2022-01-3x"])
+def test_invalid_date(yyyymmdd: str) -> None:
+    """Test that strings which are not dates raise a ValueError."""
+    with raises(ValueError):
+        to_date(yyyymmdd)
@@ -0,0 +1,126 @@
+"""Tests for the TodoGraph class."""
+
+from __future__ import annotations
+
+from typing import Dict, List
+
+import pytest
+
+from magodo import Todo, TodoGraph
+
+
+LINES = [
+    "2022-01-01 plan trip id:1",
+    "2022-01-01 book flight id:2 p:1",
+    "2022-01-01 book hotel id:3 p:1 dep:2",
+    "2022-01-01 pack bags id:4 dep:2,3",
+    "2022-01-01 water plants",
+]
+
+
+def _make_todos() -> Dict[str, Todo]:
+    todos = [Todo.from_line(line).unwrap() for line in LINES]
+    return {todo.desc.split()[1]: todo for todo in todos}
+
+
+def _descs(todos: List[Todo]) -> List[str]:
+    return [todo.desc.split()[1] for todo in todos]
+
+
+def test_blocked() -> None:
+    """Test that completing todos incrementally unblocks their dependents."""
+    todos = _make_todos()
+    graph = TodoGraph(todos.values())
+
+    assert len(graph) == len(LINES)
+    assert sorted(_descs(graph.blocked())) == ["bags", "hotel", "trip"]
+    assert sorted(_descs(graph.unblocked())) == ["flight", "plants"]
+    assert sorted(_descs(graph.blockers(todos["trip"].ident))) == [
+        "flight",
+        "hotel",
+    ]
+
+    flight = todos["flight"]
+    assert _descs(graph.update(flight.ident, flight.new(done=True))) == [
+        "hotel"
+    ]
+    assert graph.is_blocked(todos["bags"].ident)
+
+    hotel = todos["hotel"]
+    done_hotel = hotel.new(done=True)
+    unblocked = graph.update(hotel.ident, done_hotel)
+    assert sorted(_descs(unblocked)) == ["bags", "trip"]
+    assert graph.blocked() == []
+
+    # Re-opening a todo blocks its dependents again.
+    graph.update(done_hotel.ident, hotel)
+    assert sorted(_descs(graph.blocked())) == ["bags", "trip"]
+
+    assert sorted(_descs(graph.remove(hotel.ident))) == ["bags", "trip"]
+    assert hotel.ident not in graph
+
+
+def test_subtree() -> None:
+    """Test that subtasks are found by following 'p' metadata."""
+    todos = _make_todos()
+    graph = TodoGraph(todos.values())
+    assert _descs(graph.subtree(todos["trip"].ident)) == [
+        "trip",
+        "flight",
+        "hotel",
+    ]
+    assert _descs(graph.subtree(todos["plants"].ident)) == ["plants"]
+
+
+def test_topological_order() -> None:
+    """Test that todos are ordered after the todos that block them."""
+    graph = TodoGraph(_make_todos().values())
+    assert _descs(graph.topological_order()) == [
+        "flight",
+        "hotel",
+        "trip",
+        "bags",
+        "plants",
+    ]
+    assert graph.find_cycle() is None
+
+
+def test_cycle() -> None:
+    """Test that dependency cycles are detected."""
+    todos = _make_todos()
+    graph = TodoGraph(todos.values())
+    flight = todos["flight"]
+    graph.update(
+        flight.ident, flight.new(metadata=dict(flight.metadata, dep="4"))
+    )
+
+    cycle = graph.find_cycle()
+    assert cycle is not None
+    # Each todo in the cycle blocks the todo that follows it.
+    for blocker, todo in zip(cycle, cycle[1:] + cycle[:1]):
+        assert blocker in graph.blockers(todo.ident)
+    assert {"bags", "flight"} <= set(_descs(cycle))
+    with pytest.raises(ValueError, match="cycle"):
+        graph.topological_order()
+
+
+def test_duplicate_id() -> None:
+    """Test that two todos cannot share the same id."""
+    graph = TodoGraph(_make_todos().values())
+    with pytest.raises(ValueError):
+        graph.add(Todo.from_line("2022-01-01 other todo id:1").unwrap())
+
+
+def test_failed_update() -> None:
+    """Test that an update that fails leaves the graph unchanged."""
+    todos = _make_todos()
+    graph = TodoGraph(todos.values())
+    hotel = todos["hotel"]
+    assert graph.is_blocked(hotel.ident)
+
+    bad_hotel = hotel.new(metadata={**hotel.metadata, "id": "1"})
+    with pytest.raises(ValueError):
+        graph.update(hotel.ident, bad_hotel)
+
+    assert graph.is_blocked(hotel.ident)
+    assert sorted(_descs(graph.blocked())) == ["bags", "hotel", "trip"]
@@ -0,0 +1,50 @@
+"""Tests for the DateIndex class."""
+
+from __future__ import annotations
+
+from magodo import DateIndex, Todo
+from magodo.dates import to_date
+
+
+def test_date_index() -> None:
+    """Test range lookups and incremental updates."""
+    todos = [
+        Todo(
+            "c",
+            create_date=to_date("2023-01-03"),
+            metadata={"due": "2023-02-01"},
+        ),
+        Todo("a", create_date=to_date("2023-01-01")),
+        Todo(
+            "b",
+            create_date=to_date("2023-01-02"),
+            metadata={"due": "2023-01-15"},
+        ),
+        Todo(
+            "d",
+            create_date=to_date("2023-01-02"),
+            done=True,
+            done_date=to_date("2023-01-05"),
+            metadata={"due": "not-a-date"},
+        ),
+    ]
+    a, b, c, d = (todo.ident for todo in sorted(todos, key=lambda t: t.desc))
+    index = DateIndex.from_todos(todos, date_keys=["due"])
+
+    assert len(index) == 4
+    assert index.range("create_date") == [a, b, d, c]
+    assert index.range(
+        "create_date", to_date("2023-01-02"), to_date("2023-01-02")
+    ) == [b, d]
+    assert index.after("create_date", to_date("2023-01-01")) == [b, d, c]
+    assert index.range("done_date") == [d]
+    assert index.before("due", to_date("2023-02-01")) == [b]
+
+    index.remove(b)
+    assert b not in index
+    assert index.range("due") == [c]
+
+    moved = todos[0]
+    moved.create_date = to_date("2022-12-31")
+    index.update(moved)
+    assert index.range("create_date") == [c, a, d]
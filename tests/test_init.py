@@ -0,0 +1,70 @@
+"""Tests for the magodo package's top-level namespace."""
+
+from __future__ import annotations
+
+import subprocess
+import sys
+from typing import Set
+
+from pytest import mark, raises
+
+import magodo
+
+
+params = mark.parametrize
+
+HEAVY_MODULES = [
+    "dataclasses",
+    "eris",
+    "logging",
+    "metaman",
+    "typing",
+    "typist",
+    "uuid",
+]
+
+
+def _imported_modules(statement: str) -> Set[str]:
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    return {
+        line.rsplit("|", 1)[-1].strip()
+        for line in proc.stderr.splitlines()
+        if line.startswith("import time:")
+    }
+
+
+def test_import_is_lazy() -> None:
+    """Test that `import magodo` does not import any heavy modules."""
+    baseline = _imported_modules("pass")
+    imported = _imported_modules("import magodo") - baseline
+
+    assert "magodo" in imported
+    assert not {m for m in imported if m.startswith("magodo.")}
+    assert not imported & set(HEAVY_MODULES)
+
+
+def test_todo_import_skips_file_writing_modules() -> None:
+    """Test that only writing a file imports shutil and tempfile."""
+    baseline = _imported_modules("pass")
+    imported = _imported_modules("from magodo import Todo") - baseline
+
+    assert "magodo._common" in imported
+    assert not imported & {"shutil", "tempfile"}
+
+
+@params("name", magodo.__all__)
+def test_public_names(name: str) -> None:
+    """Test that every public name can still be accessed."""
+    assert getattr(magodo, name) is not None
+    assert name in dir(magodo)
+
+
+def test_unknown_name() -> None:
+    """Test that accessing an unknown name raises an AttributeError."""
+    with raises(AttributeError):
+        getattr(magodo, "does_not_exist")
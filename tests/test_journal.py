@@ -0,0 +1,186 @@
+"""Tests for the TodoJournal class."""
+
+from __future__ import annotations
+
+import datetime as dt
+import json
+import os
+from pathlib import Path
+from typing import Any, List
+
+import pytest
+
+from magodo import Todo, TodoJournal, clock
+
+from .shared import TickingClock
+
+
+def _descs(journal: TodoJournal) -> List[str]:
+    return [todo.desc for todo in journal.todos()]
+
+
+def test_journal_replay(tmp_path: Path) -> None:
+    """Test that edits are journaled and replayed on load."""
+    todo_txt = tmp_path / "todo.txt"
+    todo_txt.write_text("(A) foo\n(B) bar\n")
+
+    with TodoJournal(todo_txt) as journal:
+        assert list(journal) == ["L1", "L2"]
+        baz = journal.add(Todo("baz"))
+        journal.edit("L1", Todo("foo edited", priority="A"))
+        journal.complete("L2")
+        assert journal.journal_size == 3
+
+    # The todo.txt file itself has not been touched...
+    assert todo_txt.read_text() == "(A) foo\n(B) bar\n"
+
+    # ...but the journal is replayed when the file is loaded again.
+    with TodoJournal(todo_txt) as journal:
+        assert _descs(journal) == ["foo edited", "bar", "baz"]
+        assert journal["L2"].done
+        journal.delete(baz)
+        assert baz not in journal
+
+
+def test_journal_compact(tmp_path: Path) -> None:
+    """Test that compaction folds the journal and keeps idents stable."""
+    todo_txt = tmp_path / "todo.txt"
+    todo_txt.write_text("(A) foo\n-bad line\n(B) bar\n")
+
+    with TodoJournal(todo_txt) as journal:
+        journal.delete("L1")
+        baz = journal.add(Todo("baz", priority="C"))
+        journal.compact()
+        assert journal.journal_size == 0
+        journal.edit(baz, Todo("baz edited", priority="C"))
+
+    lines = todo_txt.read_text().splitlines()
+    assert len(lines) == 3
+    assert lines[0].startswith("(B) ") and lines[0].endswith(" bar")
+    assert lines[2] == "-bad line"
+
+    with TodoJournal(todo_txt) as journal:
+        assert list(journal) == ["L2", baz]
+        assert _descs(journal) == ["bar", "baz edited"]
+
+
+def test_stale_journal(tmp_path: Path) -> None:
+    """Test that a journal is replayed if the todo.txt file changed."""
+    todo_txt = tmp_path / "todo.txt"
+    todo_txt.write_text("(A) foo\n(B) bar\n(C) baz\n")
+    with TodoJournal(todo_txt) as journal:
+        added = journal.add(Todo("added"))
+        journal.edit("L1", Todo("foo edited", priority="A"))
+        journal.complete("L2")
+        journal.edit(added, Todo("added and edited"))
+        journal.delete("L3")
+
+    # Another program edits "bar" (and inserts a todo before it).
+    todo_txt.write_text("(A) foo\n(D) new\n(B) bar edited by hand\n(C) baz\n")
+    with TodoJournal(todo_txt) as journal:
+        assert list(journal) == ["L1", "L2", "L3", added]
+        assert _descs(journal) == [
+            "foo edited",
+            "new",
+            "bar edited by hand",
+            "added and edited",
+        ]
+        assert journal.journal_size == 4
+
+    # The operation that no longer applies is kept in a side file...
+    rejected = [
+        json.loads(line)
+        for line in journal.rejected_path.read_text().splitlines()
+    ]
+    assert [(entry["op"], entry["ident"]) for entry in rejected] == [
+        ("complete", "L2")
+    ]
+
+    # ...and the replayed operations are journaled against the new file.
+    with TodoJournal(todo_txt) as journal:
+        assert _descs(journal) == [
+            "foo edited",
+            "new",
+            "bar edited by hand",
+            "added and edited",
+        ]
+
+
+def test_compact_crash(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that a compaction that was interrupted is finished on load."""
+    todo_txt = tmp_path / "todo.txt"
+    todo_txt.write_text("(A) foo\n")
+
+    journal = TodoJournal(todo_txt)
+    journal.add(Todo("bar"))
+    real_replace = os.replace
+
+    def crashing_replace(src: Any, dst: Any) -> None:
+        if Path(dst) == journal.journal_path:
+            raise OSError("crash")
+        real_replace(src, dst)
+
+    monkeypatch.setattr(os, "replace", crashing_replace)
+    with pytest.raises(OSError):
+        journal.compact()
+    monkeypatch.undo()
+    journal.close()
+
+    # The todo.txt file was replaced, but the old journal was not...
+    assert todo_txt.read_text().splitlines()[1].endswith(" bar")
+    with TodoJournal(todo_txt) as journal:
+        # ...so the add operation must not be applied twice.
+        assert _descs(journal) == ["foo", "bar"]
+        assert journal.journal_size == 0
+    assert not journal.pending_path.exists()
+
+
+def test_journal_lock(tmp_path: Path) -> None:
+    """Test that only one TodoJournal can use a journal at a time."""
+    todo_txt = tmp_path / "todo.txt"
+    todo_txt.write_text("(A) foo\n")
+
+    with TodoJournal(todo_txt):
+        with pytest.raises(ValueError):
+            TodoJournal(todo_txt)
+
+    with TodoJournal(todo_txt) as journal:
+        assert _descs(journal) == ["foo"]
+
+
+def test_load_reads_clock_once(tmp_path: Path) -> None:
+    """Test that loading a journal only reads the clock once."""
+    todo_txt = tmp_path / "todo.txt"
+    todo_txt.write_text("foo\nbar\nx baz\n")
+
+    ticking_clock = TickingClock(dt.datetime(2022, 1, 31, 9, 30))
+    with clock.use_clock(ticking_clock), TodoJournal(todo_txt) as journal:
+        todos = journal.todos()
+
+    assert ticking_clock.calls == 1
+    assert len({todo.create_date for todo in todos}) == 1
+    assert len({todo.metadata["ctime"] for todo in todos}) == 1
+
+
+def test_compact_threshold(tmp_path: Path) -> None:
+    """Test that the journal is compacted once it reaches its threshold."""
+    todo_txt = tmp_path / "todo.txt"
+    todo_txt.write_text("foo\n")
+
+    with TodoJournal(todo_txt, compact_threshold=2) as journal:
+        journal.add(Todo("bar"))
+        assert journal.journal_size == 1
+        assert todo_txt.read_text() == "foo\n"
+
+        journal.complete("L1")
+        assert journal.journal_size == 0
+        lines = todo_txt.read_text().splitlines()
+        assert [line.split()[-1] for line in lines] == ["foo", "bar"]
+        assert lines[0].startswith("x ")
+
+    with TodoJournal(todo_txt, compact_threshold=None) as journal:
+        for i in range(3):
+            journal.add(Todo(f"todo #{i}"))
+        assert journal.journal_size == 3
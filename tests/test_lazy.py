@@ -0,0 +1,54 @@
+"""Tests for the LazyTodo class."""
+
+from __future__ import annotations
+
+from pytest import mark
+
+from magodo import LazyTodo, Todo
+
+from .shared import assert_todos_equal
+
+
+params = mark.parametrize
+
+
+@params(
+    "line",
+    [
+        "no priority todo",
+        "x (A) 2022-03-04 2022-01-10 done todo with +some +project",
+        "(B) 2022-01-10 todo with @ctx, a #epic and some meta:data"
+        " due:2022-12-31",
+        "todo with some dep:123,10,20,30, another dep:456 @crazy ctime:0930",
+    ],
+)
+def test_lazy_todo(line: str) -> None:
+    """Test that LazyTodo objects end up equal to their Todo counterparts."""
+    lazy = LazyTodo.from_line(line).unwrap()
+    todo = Todo.from_line(line).unwrap()
+
+    assert lazy.done == todo.done
+    assert lazy.priority == todo.priority
+    assert lazy.create_date == todo.create_date
+    assert lazy.done_date == todo.done_date
+    assert lazy.to_line() == todo.to_line()
+    assert not lazy.parsed
+
+    assert lazy.projects == todo.projects
+    assert lazy.contexts == todo.contexts
+    assert lazy.epics == todo.epics
+    assert lazy.metadata.keys() == todo.metadata.keys()
+    assert_todos_equal(lazy, todo.new(metadata=lazy.metadata))
+
+
+def test_lazy_new() -> None:
+    """Test that LazyTodo.new() only extracts tags when it has to."""
+    lazy = LazyTodo.from_line("(A) foo +bar").unwrap()
+
+    lazy_copy = lazy.new(priority="B")
+    assert not lazy_copy.parsed
+    assert lazy_copy.projects == ("bar",)
+
+    renamed = lazy.new(desc="foo +baz")
+    assert lazy.parsed
+    assert renamed.projects == ("bar",)
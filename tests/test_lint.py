@@ -0,0 +1,83 @@
+"""Tests for the magodo.lint module."""
+
+from __future__ import annotations
+
+import datetime as dt
+from pathlib import Path
+
+from magodo import clock, lint
+
+from .shared import TickingClock
+
+
+LINES = [
+    "(A) 2022-01-10 a valid todo +proj\n",
+    "\n",
+    "  (B) -not a valid description\n",
+    "x 2022-02-30 2022-01-10 done on a date that does not exist\n",
+    "2022-01-10 another valid todo\n",
+]
+
+
+def test_lint(tmp_path: Path) -> None:
+    """Test that lint() reports the location and kind of each problem."""
+    todo_txt = tmp_path / "todo.txt"
+    todo_txt.write_text("".join(LINES))
+
+    diagnostics = lint.lint_file(todo_txt)
+
+    assert [(d.lineno, d.column, d.kind) for d in diagnostics] == [
+        (3, 7, "bad_description"),
+        (4, 3, "invalid_date"),
+    ]
+    assert diagnostics[0].line == LINES[2].rstrip("\n")
+    assert diagnostics[1].message == "4:3: This date does not exist."
+
+
+def test_load() -> None:
+    """Test strict and lenient loading of todos."""
+    todos, diagnostics = lint.load(LINES)
+    assert [todo.desc for todo in todos] == [
+        "a valid todo +proj",
+        "another valid todo",
+    ]
+    assert len(diagnostics) == 2
+
+    todos, _ = lint.load(iter(LINES), lenient=True)
+    assert [todo.desc for todo in todos] == [
+        "a valid todo +proj",
+        "(B) -not a valid description",
+        "x 2022-02-30 2022-01-10 done on a date that does not exist",
+        "another valid todo",
+    ]
+
+
+def test_lenient_round_trip(tmp_path: Path) -> None:
+    """Test that recovered todos keep their tags and are written verbatim."""
+    todo_txt = tmp_path / "todo.txt"
+    todo_txt.write_text("".join(LINES) + "-call mom +family @phone due:fri\n")
+
+    with todo_txt.open() as lines:
+        todos, _ = lint.load(lines, lenient=True)
+
+    recovered = todos[-1]
+    assert recovered.projects == ("family",)
+    assert recovered.contexts == ("phone",)
+    assert recovered.metadata["due"] == "fri"
+
+    # Every non-blank line is written back exactly as it was read.
+    contents = todo_txt.read_text()
+    assert "".join(todo.to_source_line() + "\n" for todo in todos) == (
+        contents.replace("\n\n", "\n")
+    )
+
+
+def test_load_reads_clock_once() -> None:
+    """Test that load() only reads the clock once per call."""
+    ticking_clock = TickingClock(dt.datetime(2022, 1, 31, 9, 30))
+    with clock.use_clock(ticking_clock):
+        todos, _ = lint.load(["foo\n", "  -bad\n", "x bar\n"], lenient=True)
+
+    assert ticking_clock.calls == 1
+    assert len({todo.create_date for todo in todos}) == 1
+    assert len({todo.metadata["ctime"] for todo in todos}) == 1
@@ -2,12 +2,13 @@
 
 from __future__ import annotations
 
-from typing import List
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
 
 from pytest import mark
 
-from magodo import MagicTodoMixin
-from magodo.types import TodoSpell
+from magodo import MagicTodoMixin, Todo
+from magodo.types import BatchTodoSpell, EnchantedTodo, TodoSpell
 
 
 params = mark.parametrize
@@ -39,3 +40,84 @@ def test_line_todo(line: str) -> None:
     todo = LineTodo.from_line(line).unwrap()
     assert todo.desc == "foo bar baz"
     assert todo.to_line() == "test | 1900-01-01 foo bar baz"
+
+
+def test_line_todo_source_line() -> None:
+    """Test that unchanged MagicTodos are written back verbatim."""
+    todo = LineTodo.from_line("1900-01-01  foo").unwrap()
+    assert not todo.dirty
+    assert todo.to_source_line() == "1900-01-01  foo"
+    assert todo.new().to_source_line() == "1900-01-01  foo"
+
+    new_todo = todo.new(desc="bar")
+    assert new_todo.dirty
+    assert new_todo.to_source_line() == "test | 1900-01-01 bar"
+
+
+def upper_desc_batch(
+    etodos: List[EnchantedTodo[Todo]],
+) -> List[EnchantedTodo[Todo]]:
+    """Batch spell that upper-cases each todo's description."""
+    BatchTodo.batch_sizes.append(len(etodos))
+    return [
+        EnchantedTodo(etodo.todo.new(desc=etodo.todo.desc.upper()), True)
+        for etodo in etodos
+    ]
+
+
+class BatchTodo(MagicTodoMixin):
+    """MagicTodo that casts a batch spell."""
+
+    batch_todo_spells: List[BatchTodoSpell] = [upper_desc_batch]
+    batch_sizes: List[int] = []
+
+
+@params("use_executor", [False, True])
+def test_from_lines(use_executor: bool) -> None:
+    """Test that batch spells are cast once per chunk."""
+    BatchTodo.batch_sizes.clear()
+    lines = [f"foo {i}" for i in range(5)] + ["  "]
+
+    if use_executor:
+        with ThreadPoolExecutor(2) as executor:
+            todos = BatchTodo.from_lines(
+                lines, chunk_size=2, executor=executor
+            )
+    else:
+        todos = BatchTodo.from_lines(lines, chunk_size=2)
+
+    assert [todo.desc for todo in todos] == [f"FOO {i}" for i in range(5)]
+    assert all(todo.dirty for todo in todos)
+    assert sorted(BatchTodo.batch_sizes) == [1, 2, 2]
+
+    # Batch spells are also cast (on a single todo) when using from_line().
+    assert BatchTodo.from_line("bar").unwrap().desc == "BAR"
+
+
+class WordCountTodo(MagicTodoMixin):
+    """MagicTodo that extends __init__() (and so also _from_parts())."""
+
+    def __init__(self, todo: Todo) -> None:
+        super().__init__(todo)
+        self.word_count = len(self.desc.split())
+
+    @classmethod
+    def _from_parts(
+        cls,
+        todo: Todo,
+        etodo: EnchantedTodo[Todo],
+        source_line: Optional[str],
+    ) -> WordCountTodo:
+        magic_todo = super()._from_parts(todo, etodo, source_line)
+        magic_todo.word_count = len(magic_todo.desc.split())
+        return magic_todo
+
+
+def test_from_parts() -> None:
+    """Test that from_lines() builds todos using the _from_parts() hook."""
+    lines = ["foo", "foo bar"]
+    assert [todo.word_count for todo in WordCountTodo.from_lines(lines)] == [
+        1,
+        2,
+    ]
+    assert WordCountTodo.from_line("foo bar baz").unwrap().word_count == 3
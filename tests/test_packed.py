@@ -0,0 +1,91 @@
+"""Tests for the PackedTodos class."""
+
+from __future__ import annotations
+
+import multiprocessing as mp
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from magodo import PackedTodos, Todo
+
+
+LINES = [
+    "(A) 2022-01-10 pay rent +home @bank id:1",
+    "x 2022-01-11 2022-01-10 buy milk +home @store dtime:0930 ctime:0900",
+    "2022-01-12 plan trip to Zürich #travel +vacation",
+]
+
+
+def _make_todos() -> List[Todo]:
+    todos = [Todo.from_line(line).unwrap() for line in LINES]
+    todos.append(Todo("never parsed", metadata={"ctime": "1200"}))
+    return todos
+
+
+def test_views() -> None:
+    """Test that views are equal to the todos they were packed from."""
+    todos = _make_todos()
+    packed = PackedTodos.from_todos(todos)
+
+    assert len(packed) == len(todos)
+    assert todos == list(packed)
+    assert todos[1:] == packed[1:]
+    assert [todo.ident for todo in todos] == [view.ident for view in packed]
+    assert [todo.to_source_line() for todo in todos] == [
+        view.to_source_line() for view in packed
+    ]
+    assert packed[-1].dirty
+    assert sorted(todos) == sorted(packed)
+
+    view = packed[0]
+    with pytest.raises(AttributeError):
+        view.done = True
+
+    done_todo = view.new(done=True)
+    assert isinstance(done_todo, Todo)
+    assert done_todo.done and not view.done
+
+    with pytest.raises(IndexError):
+        packed[len(todos)]  # pylint: disable=pointless-statement
+
+
+def test_file(tmp_path: Path) -> None:
+    """Test that packed todos can be memory-mapped from a file."""
+    todos = _make_todos()
+    path = tmp_path / "todo.packed"
+    PackedTodos.write(path, todos)
+
+    with PackedTodos.open(path) as packed:
+        assert packed.nbytes == path.stat().st_size
+        assert todos == list(packed)
+
+
+def test_invalid_buffer() -> None:
+    """Test that buffers that do not hold packed todos are rejected."""
+    with pytest.raises(ValueError):
+        PackedTodos(b"not packed todos")
+
+
+@pytest.mark.parametrize("start_method", ["fork", "spawn"])
+def test_shared_memory(start_method: str) -> None:
+    """Test that other processes can attach to packed todos."""
+    todos = _make_todos()
+    with PackedTodos.create_shared_memory(todos) as packed:
+        try:
+            assert packed.name is not None
+            ctx = mp.get_context(start_method)
+            with ctx.Pool(2) as pool:
+                lines = pool.map(_read_lines, [packed.name] * 2)
+            assert lines == [[todo.to_line() for todo in todos]] * 2
+
+            # The workers exited without removing the block.
+            assert _read_lines(packed.name) == lines[0]
+        finally:
+            packed.unlink()
+
+
+def _read_lines(name: str) -> List[str]:
+    with PackedTodos.attach_shared_memory(name) as packed:
+        return [view.to_line() for view in packed]
@@ -0,0 +1,64 @@
+"""Tests for the PersistentTodos class."""
+
+from __future__ import annotations
+
+import random
+from typing import Any, Dict
+
+from magodo import PersistentTodos, Todo
+from magodo.types import TodoProto
+
+
+def test_versions() -> None:
+    """Test that older versions are unaffected by newer ones."""
+    foo, bar = Todo("foo"), Todo("bar")
+    v1 = PersistentTodos.from_todos([foo, bar])
+    v2 = v1.set(foo.ident, foo.new(desc="baz")).remove(bar.ident)
+    qux = Todo("qux")
+    v3 = v2.add(qux)
+
+    assert len(v1) == 2 and v1[foo.ident] is foo
+    assert len(v2) == 1 and v2[foo.ident].desc == "baz"
+    assert bar.ident in v1 and bar.ident not in v2
+    assert v1.set(foo.ident, foo) is v1
+
+    diff = v1.diff(v3)
+    assert diff.added == [qux.ident]
+    assert diff.removed == [bar.ident]
+    assert diff.changed == [foo.ident]
+    assert not v3.diff(v3)
+
+
+def test_against_dict() -> None:
+    """Test many random changes (including hash collisions)."""
+    rnd = random.Random(42)
+    todos = PersistentTodos()
+    expected: Dict[Any, TodoProto] = {}
+    versions = []
+    for step in range(2000):
+        # These keys collide a lot, since hash(-1) == hash(-2) in CPython.
+        key: Any = (
+            str(rnd.randrange(300)) if step % 2 else rnd.choice([-1, -2])
+        )
+        if key in expected and rnd.random() < 0.3:
+            todos = todos.remove(key)
+            del expected[key]
+        else:
+            todo = Todo(f"todo #{step}")
+            todos = todos.set(key, todo)
+            expected[key] = todo
+
+        assert len(todos) == len(expected)
+        if step % 250 == 0:
+            versions.append((todos, dict(expected)))
+
+    assert dict(todos.items()) == expected
+    for old_todos, old_expected in versions:
+        diff = old_todos.diff(todos)
+        assert set(diff.added) == expected.keys() - old_expected.keys()
+        assert set(diff.removed) == old_expected.keys() - expected.keys()
+        assert set(diff.changed) == {
+            key
+            for key in expected.keys() & old_expected.keys()
+            if expected[key] is not old_expected[key]
+        }
@@ -0,0 +1,49 @@
+"""Tests for the NextActions class."""
+
+from __future__ import annotations
+
+import random
+from typing import List
+
+from magodo import NextActions, Todo
+
+
+PRIORITIES = "ABCO"
+
+
+def _make_todos(n: int) -> List[Todo]:
+    rand = random.Random(n)
+    return [
+        Todo(
+            f"todo #{i}",
+            priority=rand.choice(PRIORITIES),  # type: ignore[arg-type]
+            done=(i % 7 == 0),
+            metadata={"ctime": "0000"},
+        )
+        for i in range(n)
+    ]
+
+
+def test_top_matches_sorted() -> None:
+    """Test that top(k) agrees with sorted() as todos change."""
+    todos = _make_todos(200)
+    queue = NextActions(todos)
+    open_todos = [todo for todo in todos if not todo.done]
+
+    assert len(queue) == len(open_todos)
+    assert queue.top(10) == sorted(open_todos)[:10]
+
+    for todo in sorted(open_todos)[:5]:
+        queue.complete(todo.ident)
+        open_todos.remove(todo)
+    assert queue.top(10) == sorted(open_todos)[:10]
+
+    old_todo = open_todos.pop()
+    bumped = old_todo.new(priority="A", desc="a todo that now comes first")
+    queue.update(old_todo.ident, bumped)
+    assert old_todo.ident not in queue
+    assert queue.top(1) == [bumped]
+
+    queue.update(bumped.ident, bumped.new(done=True))
+    assert len(queue) == len(open_todos)
+    assert queue.top(len(open_todos) + 1) == sorted(open_todos)
@@ -0,0 +1,87 @@
+"""Tests for the magodo.records module."""
+
+from __future__ import annotations
+
+import datetime as dt
+import io
+from typing import Callable, Iterable, Iterator, List, TextIO
+
+from pytest import mark
+
+from magodo import Todo, clock, records
+from magodo.types import TodoProto
+
+from .shared import MagicTodo, TickingClock, assert_todos_equal
+
+
+params = mark.parametrize
+
+LINES = [
+    "(A) 2022-01-10 todo for +some +project and a @context due:2022-12-31",
+    'x 2022-03-04 2022-01-10 done todo with "quotes", #epic and ünïcödé',
+    "no priority todo ctime:0930 url:https://example.com/a,b",
+]
+
+
+@params(
+    "dump,load",
+    [
+        (records.dump_jsonl, records.load_jsonl),
+        (records.dump_csv, records.load_csv),
+    ],
+)
+def test_round_trip(
+    dump: Callable[..., int],
+    load: Callable[[Iterable[str]], Iterator[Todo]],
+) -> None:
+    """Test that todos survive being exported and then imported."""
+    todos: List[TodoProto] = list(records.parse_lines(LINES + [""]))
+    todos.append(MagicTodo(Todo.from_line(LINES[0]).unwrap()))
+
+    fp: TextIO = io.StringIO()
+    assert dump(iter(todos), fp, batch_size=2) == len(todos)
+
+    fp.seek(0)
+    loaded = list(load(fp))
+
+    assert len(loaded) == len(todos)
+    for actual, expected in zip(loaded, todos):
+        assert_todos_equal(actual, expected)
+        assert actual.epics == expected.epics
+        assert actual.to_line() == expected.to_line()
+
+
+@params(
+    "load,text",
+    [
+        (records.parse_lines, "foo\nx bar\n"),
+        (
+            records.load_jsonl,
+            '{"done":false,"priority":"O","create_date":null,'
+            '"done_date":null,"desc":"foo","projects":[],"contexts":[],'
+            '"epics":[],"metadata":{}}\n'
+            * 2,
+        ),
+        (
+            records.load_csv,
+            ",".join(records.FIELDS) + "\n" + ",O,,,foo,,,,\n" * 2,
+        ),
+    ],
+)
+def test_load_reads_clock_once(
+    load: Callable[[Iterable[str]], Iterator[Todo]], text: str
+) -> None:
+    """Test that each loader only reads the clock once per call."""
+    ticking_clock = TickingClock(dt.datetime(2022, 1, 31, 9, 30))
+    with clock.use_clock(ticking_clock):
+        todos = list(load(io.StringIO(text)))
+
+    assert len(todos) == 2
+    assert ticking_clock.calls == 1
+    assert len({todo.create_date for todo in todos}) == 1
+    assert len({todo.metadata["ctime"] for todo in todos}) == 1
+
+    # The clock is only active while the loader constructs a todo.
+    loader = load(io.StringIO(text))
+    next(loader)
+    assert clock.active_clock() is clock.system_clock
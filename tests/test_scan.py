@@ -0,0 +1,84 @@
+"""Tests for the magodo.scan module."""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Dict, List, Sequence
+
+from eris import Err
+import pytest
+
+from magodo import Todo, scan
+
+
+LINES = [
+    "(A) 2022-01-10 pay rent +home @bank\n",
+    "x 2022-01-11 2022-01-10 buy milk +home. @store\n",
+    "\n",
+    "  (B) -not a valid todo +home\n",
+    "xylophone lessons +music's\n",
+    "x (A) call mom @phone +family\n",
+    "fix bike ++home +bike!\r\n",
+    "(C) plan trip +travel #vacation",
+]
+KWARGS_LIST: List[Dict[str, Any]] = [
+    {},
+    {"done": True},
+    {"done": False},
+    {"priority": "A"},
+    {"priority": "A", "done": False},
+    {"priority": "O"},
+    {"tags": ["+home"]},
+    {"tags": ["+home", "@store"]},
+    {"tags": ["+music"]},
+    {"tags": ["+bike"], "done": False},
+    {"tags": ["#vacation"], "priority": "C"},
+]
+
+
+@pytest.mark.parametrize("kwargs", KWARGS_LIST)
+def test_scan_matches_todo(tmp_path: Path, kwargs: Dict[str, Any]) -> None:
+    """Test that scan() selects the same lines that Todo objects would."""
+    todo_txt = tmp_path / "todo.txt"
+    todo_txt.write_text("".join(LINES))
+
+    expected = []
+    offset = 0
+    for line in LINES:
+        todo_result = Todo.from_line(line)
+        if not isinstance(todo_result, Err) and _is_match(
+            todo_result.ok(), **kwargs
+        ):
+            expected.append((offset, line.rstrip("\r\n").encode()))
+        offset += len(line.encode())
+
+    assert list(scan.scan(todo_txt, **kwargs)) == expected
+    assert scan.count(todo_txt, **kwargs) == len(expected)
+
+
+def test_scan_empty_file(tmp_path: Path) -> None:
+    """Test that empty files are handled gracefully."""
+    todo_txt = tmp_path / "todo.txt"
+    todo_txt.write_text("")
+    assert list(scan.scan(todo_txt, done=False)) == []
+
+
+@pytest.mark.parametrize("tag", ["home", "++home", "+"])
+def test_scan_invalid_tag(tag: str) -> None:
+    """Test that invalid tags are rejected."""
+    with pytest.raises(ValueError):
+        list(scan.scan_bytes(b"foo +home\n", tags=[tag]))
+
+
+def _is_match(
+    todo: Todo,
+    done: bool = None,
+    priority: str = None,
+    tags: Sequence[str] = (),
+) -> bool:
+    tag_attrs = {"+": todo.projects, "@": todo.contexts, "#": todo.epics}
+    return (
+        (done is None or todo.done == done)
+        and (priority is None or todo.priority == priority)
+        and all(tag[1:] in tag_attrs[tag[0]] for tag in tags)
+    )
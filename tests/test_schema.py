@@ -0,0 +1,139 @@
+"""Tests for the magodo.schema module."""
+
+from __future__ import annotations
+
+import datetime as dt
+import random
+from typing import ClassVar, List
+
+import pytest
+
+from magodo import MagicTodoMixin, Todo
+from magodo.schema import (
+    DEFAULT_SCHEMA,
+    MetadataSchema,
+    decode_date,
+    decode_duration,
+    decode_int,
+    decode_time,
+    enum_decoder,
+)
+
+
+class SchemaTodo(MagicTodoMixin):
+    """MagicTodo that decodes due dates, estimates, and effort levels."""
+
+    metadata_schema: ClassVar[MetadataSchema] = {
+        **DEFAULT_SCHEMA,
+        "due": decode_date,
+        "est": decode_duration,
+        "effort": enum_decoder(["low", "high"]),
+    }
+
+
+@pytest.mark.parametrize(
+    "decode,value",
+    [
+        (decode_date, "2022-13-01"),
+        (decode_date, "20221201"),
+        (decode_time, "2460"),
+        (decode_int, "-1"),
+        (decode_duration, ""),
+        (decode_duration, "1y"),
+        (enum_decoder(["low"]), "medium"),
+    ],
+)
+def test_invalid_values(decode: object, value: str) -> None:
+    """Test that decoders reject invalid values."""
+    with pytest.raises(ValueError):
+        decode(value)  # type: ignore[operator]
+
+
+def test_typed_metadata() -> None:
+    """Test that metadata values are decoded using the todo's schema."""
+    line = "2022-01-01 foo due:2022-12-31 est:1d2h effort:huge ctime:0930"
+    todo = SchemaTodo.from_line(line).unwrap()
+    assert todo.typed_metadata == {
+        "ctime": dt.time(9, 30),
+        "due": dt.date(2022, 12, 31),
+        "est": dt.timedelta(days=1, hours=2),
+    }
+    # Typed metadata never changes how a todo is written.
+    assert todo.to_line() == line
+
+    basic_todo = Todo.from_line(line).unwrap()
+    assert basic_todo.typed_metadata == {"ctime": dt.time(9, 30)}
+    assert basic_todo.typed_metadata is basic_todo.typed_metadata
+
+    basic_todo.metadata = {"id": "7"}
+    assert basic_todo.typed_metadata == {"id": 7}
+
+
+def test_sort_by_typed_id() -> None:
+    """Test that numeric ids are compared as numbers."""
+    todos = [
+        Todo.from_line(f"2022-01-01 foo id:{i} ctime:0930").unwrap()
+        for i in [10, 9, 100]
+    ]
+    assert [todo.metadata["id"] for todo in sorted(todos)] == [
+        "9",
+        "10",
+        "100",
+    ]
+
+
+def test_typed_metadata_edited_in_place() -> None:
+    """Test that decoded values follow in-place edits to the metadata."""
+    todo = Todo.from_line("2022-01-01 foo id:100 ctime:0930").unwrap()
+    other = Todo.from_line("2022-01-01 foo id:9 ctime:0930").unwrap()
+    assert todo.typed_metadata == {"ctime": dt.time(9, 30), "id": 100}
+    assert other < todo
+
+    todo.metadata["id"] = "05"
+    assert todo.typed_metadata == {"ctime": dt.time(9, 30), "id": 5}
+    assert todo < other
+
+
+def test_sort_decodes_each_id_once() -> None:
+    """Test that sorting decodes each todo's (mixed-width) id only once."""
+    decoded_values: List[str] = []
+
+    def decode_counted_int(value: str) -> int:
+        decoded_values.append(value)
+        return decode_int(value)
+
+    class CountingTodo(Todo):
+        """Todo that records every id it decodes."""
+
+        metadata_schema: ClassVar[MetadataSchema] = {
+            **DEFAULT_SCHEMA,
+            "id": decode_counted_int,
+        }
+
+    rng = random.Random(0)
+    ids = [rng.randrange(10 ** rng.randint(1, 5)) for _ in range(2_000)]
+    todos = [
+        CountingTodo.from_line(f"2022-01-01 foo id:{i} ctime:0930").unwrap()
+        for i in ids
+    ]
+    sorted_todos = sorted(todos)
+    assert [int(todo.metadata["id"]) for todo in sorted_todos] == sorted(ids)
+    assert len(decoded_values) <= len(todos)
+
+    # Ids that are edited in place are decoded again.
+    todo = sorted_todos[0]
+    todo.metadata["id"] = str(max(ids) + 1)
+    assert sorted(todos)[-1] is todo
+
+
+def test_sort_by_typed_ctime() -> None:
+    """Test that times written in different formats are compared as times."""
+    todos = [
+        Todo.from_line(f"2022-01-01 foo ctime:{ctime}").unwrap()
+        for ctime in ["1015", "09:30", "0945"]
+    ]
+    assert [todo.metadata["ctime"] for todo in sorted(todos)] == [
+        "09:30",
+        "0945",
+        "1015",
+    ]
@@ -0,0 +1,64 @@
+"""Tests for the SearchIndex class."""
+
+from __future__ import annotations
+
+import random
+
+from magodo import SearchIndex, Todo
+
+
+def test_search() -> None:
+    """Test exact, prefix, substring, and fuzzy matches."""
+    report = Todo("Write the quarterly report +work @office")
+    support = Todo("Call support about the printer")
+    groceries = Todo("Buy groceries, then write a +report due:2022-12-31")
+    index = SearchIndex.from_todos([report, support, groceries])
+
+    assert len(index) == 3
+    assert index.search("report") == [report.ident]
+    assert index.search("write") == [report.ident, groceries.ident]
+    assert index.search("WRI") == [report.ident, groceries.ident]
+    assert index.search("port") == [report.ident, support.ident]
+    assert index.search("groceris") == [groceries.ident]
+    assert index.search("write quart") == [report.ident]
+    assert index.search("office") == []
+    assert index.search("write", limit=1) == [report.ident]
+
+    [(_, exact_score)] = index.scored_search("groceries")
+    [(_, fuzzy_score)] = index.scored_search("groceris")
+    assert exact_score > fuzzy_score
+
+
+def test_incremental_updates() -> None:
+    """Test that the index stays correct as todos change."""
+    foo = Todo("foo bar")
+    index = SearchIndex.from_todos([foo])
+
+    baz = foo.new(desc="foo baz")
+    index.update(foo.ident, baz)
+    assert foo.ident not in index
+    assert index.search("bar") == []
+    assert index.search("baz") == [baz.ident]
+    assert index[baz.ident] is baz
+
+    index.remove(baz.ident)
+    assert index.search("foo") == []
+
+
+def test_limited_search() -> None:
+    """Test that a limited search returns the start of the full ranking."""
+    rng = random.Random(42)
+    vocab = ["report", "reports", "reporter", "weekly", "week", "printer"]
+    todos = [
+        Todo(" ".join(rng.choices(vocab, k=rng.randint(1, 4))))
+        for _ in range(300)
+    ]
+    index = SearchIndex.from_todos(todos)
+
+    for query in ["report", "repo week", "weekly report", "rep", "printr"]:
+        ranking = index.scored_search(query)
+        assert ranking, query
+        for limit in [1, 5, 20, len(ranking) + 1]:
+            assert index.scored_search(query, limit=limit) == (
+                ranking[:limit]
+            ), (query, limit)
@@ -0,0 +1,50 @@
+"""Tests for the TodoStats class."""
+
+from __future__ import annotations
+
+from magodo import Todo, TodoStats
+from magodo.dates import to_date
+
+
+def test_stats() -> None:
+    """Test that statistics are kept up-to-date as todos change."""
+    foo = Todo(
+        "foo +work @home",
+        create_date=to_date("2023-01-02"),
+        priority="A",
+        projects=("work",),
+        contexts=("home",),
+    )
+    bar = Todo(
+        "bar +work #q1",
+        create_date=to_date("2023-01-03"),
+        projects=("work",),
+        epics=("q1",),
+    )
+    stats = TodoStats.from_todos([foo, bar])
+
+    snapshot = stats.snapshot()
+    assert snapshot.total == 2
+    assert snapshot.done == 0
+    assert snapshot.projects == {"work": 2}
+    assert snapshot.contexts == {"home": 1}
+    assert snapshot.epics == {"q1": 1}
+    assert snapshot.priorities == {"A": 1, "O": 1}
+    assert snapshot.created_per_week == {"2023-W01": 2}
+    assert snapshot.completion_rate("2023-W01") == 0.0
+    assert snapshot.completion_rate("2023-W02") is None
+
+    done_foo = foo.new(done=True, done_date=to_date("2023-01-04"))
+    stats.update(foo.ident, done_foo)
+    stats.remove(bar.ident)
+
+    # Older snapshots are not affected by later changes.
+    assert snapshot.total == 2
+
+    snapshot = stats.snapshot()
+    assert len(stats) == snapshot.total == 1
+    assert snapshot.done == 1
+    assert snapshot.projects == {"work": 1}
+    assert snapshot.epics == {}
+    assert snapshot.done_per_week == {"2023-W01": 1}
+    assert snapshot.completion_rate("2023-W01") == 1.0
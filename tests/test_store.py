@@ -0,0 +1,79 @@
+"""Tests for the TodoStore class."""
+
+from __future__ import annotations
+
+import threading
+from typing import List
+
+import pytest
+
+from magodo import Todo, TodoStore
+
+
+def test_snapshots() -> None:
+    """Test that snapshots are not affected by later changes."""
+    foo, bar = Todo("foo"), Todo("bar")
+    store = TodoStore([foo, bar])
+    snapshot = store.snapshot()
+
+    baz = foo.new(desc="baz")
+    with store.batch() as batch:
+        batch.update(foo.ident, baz)
+        batch.remove(bar.ident)
+        batch.add(Todo("qux"))
+
+    assert snapshot.version == 0
+    assert [todo.desc for todo in snapshot.todos()] == ["foo", "bar"]
+
+    new_snapshot = store.snapshot()
+    assert new_snapshot.version == 1
+    assert [todo.desc for todo in new_snapshot.todos()] == ["baz", "qux"]
+    assert new_snapshot[baz.ident] is baz
+    assert foo.ident not in new_snapshot
+
+    # Batches that do not change anything do not create new snapshots.
+    with store.batch():
+        pass
+    assert store.snapshot() is new_snapshot
+
+
+def test_failed_batch() -> None:
+    """Test that a batch that raises an exception is not applied."""
+    foo = Todo("foo")
+    store = TodoStore([foo])
+    with pytest.raises(KeyError):
+        with store.batch() as batch:
+            batch.add(Todo("bar"))
+            batch.remove("does-not-exist")
+
+    assert store.snapshot().todos() == [foo]
+
+
+def test_concurrent_access() -> None:
+    """Test that readers always see whole batches."""
+    store = TodoStore()
+    errors: List[str] = []
+
+    def write() -> None:
+        for i in range(200):
+            with store.batch() as batch:
+                batch.add(Todo(f"a{i}"))
+                batch.add(Todo(f"b{i}"))
+
+    def read() -> None:
+        for _ in range(200):
+            snapshot = store.snapshot()
+            if len(snapshot) % 2:
+                errors.append(f"Partial batch: {len(snapshot)}")
+            for ident in snapshot:
+                assert snapshot[ident].ident == ident
+
+    threads = [threading.Thread(target=write) for _ in range(2)]
+    threads.extend(threading.Thread(target=read) for _ in range(4))
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    assert len(store) == 800
@@ -160,3 +160,32 @@ def test_sort(todos: Sequence[Todo], idxs: Sequence[int]) -> None:
     magic_todos = [MagicTodo(todo) for todo in todos]
     magic_expected = [magic_todos[idxs[i]] for i in range(N)]
     assert sorted(magic_todos) == magic_expected
+
+
+def test_source_line() -> None:
+    """Test that unchanged todos are written back verbatim."""
+    line = "(A)  Call mom  due:2022-12-31\n"
+    todo = Todo.from_line(line).unwrap()
+    assert not todo.dirty
+    assert todo.to_source_line() == "(A)  Call mom  due:2022-12-31"
+    assert todo.to_line() != todo.to_source_line()
+
+    copy = todo.new()
+    assert copy.to_source_line() == todo.to_source_line()
+
+    assert todo.new(priority="B").dirty
+    assert Todo("Call mom").dirty
+
+    # Changing any field invalidates the source line.
+    todo.priority = "B"
+    assert todo.to_source_line() == todo.to_line()
+    assert todo.to_source_line().startswith("(B) ")
+
+
+def test_new_copies_metadata() -> None:
+    """Test that new() never shares a metadata dict with the old todo."""
+    todo = Todo("foo", metadata={"due": "2022-12-31"})
+    done_todo = todo.new(done=True)
+    assert "dtime" in done_todo.metadata
+    assert "dtime" not in todo.metadata
+    assert done_todo.metadata is not todo.metadata
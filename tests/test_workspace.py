@@ -0,0 +1,112 @@
+"""Tests for the Workspace class."""
+
+from __future__ import annotations
+
+import datetime as dt
+import os
+from pathlib import Path
+from typing import Any, List
+
+import pytest
+
+from magodo import Workspace, clock
+
+from .shared import TickingClock
+
+
+def test_workspace(tmp_path: Path) -> None:
+    """Test discovery, merged views, and mtime / size based caching."""
+    (tmp_path / "proj_a").mkdir()
+    (tmp_path / "proj_b" / "nested").mkdir(parents=True)
+    todo_a = tmp_path / "proj_a" / "todo.txt"
+    todo_b = tmp_path / "proj_b" / "nested" / "todo.txt"
+    todo_a.write_text("(B) foo\n\n(A) bar\n")
+    todo_b.write_text("(C) baz\n")
+    (tmp_path / "proj_a" / "notes.txt").write_text("(A) not a todo file\n")
+
+    workspace = Workspace(tmp_path, max_workers=2)
+    assert workspace.discover() == [todo_a, todo_b]
+
+    todos = workspace.load()
+    assert [(st.todo.desc, st.path, st.lineno) for st in todos] == [
+        ("foo", todo_a, 1),
+        ("bar", todo_a, 3),
+        ("baz", todo_b, 1),
+    ]
+    assert [
+        st.todo.desc for st in workspace.query(lambda t: True, sort=True)
+    ] == ["bar", "foo", "baz"]
+
+    # Unchanged files are not reparsed...
+    first_foo = todos[0].todo
+    assert workspace.load()[0].todo is first_foo
+
+    # ...but changed and deleted files are.
+    todo_a.write_text("(B) foo\n(D) new\n")
+    os.utime(todo_a, ns=(0, 0))
+    todo_b.unlink()
+    assert [st.todo.desc for st in workspace.load()] == ["foo", "new"]
+
+
+def test_discovery_cache(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that only directories that have changed are re-scanned."""
+    (tmp_path / "proj_a").mkdir()
+    (tmp_path / "proj_b").mkdir()
+    todo_a = tmp_path / "proj_a" / "todo.txt"
+    todo_a.write_text("foo\n")
+
+    scanned: List[str] = []
+    real_scandir = os.scandir
+
+    def counting_scandir(path: Any) -> Any:
+        scanned.append(Path(path).name)
+        return real_scandir(path)
+
+    monkeypatch.setattr(os, "scandir", counting_scandir)
+    workspace = Workspace(tmp_path)
+    assert workspace.discover() == [todo_a]
+    assert sorted(scanned) == sorted([tmp_path.name, "proj_a", "proj_b"])
+
+    scanned.clear()
+    assert workspace.discover() == [todo_a]
+    assert not scanned
+
+    todo_b = tmp_path / "proj_b" / "todo.txt"
+    todo_b.write_text("bar\n")
+    assert workspace.discover() == [todo_a, todo_b]
+    assert scanned == ["proj_b"]
+
+
+def test_vanished_file(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that files removed after they are discovered are skipped."""
+    todo_txt = tmp_path / "todo.txt"
+    todo_txt.write_text("foo\n")
+    workspace = Workspace(tmp_path)
+    assert [st.todo.desc for st in workspace.load()] == ["foo"]
+
+    # Simulate a file that is removed right after discover() finds it.
+    missing = tmp_path / "missing" / "todo.txt"
+    monkeypatch.setattr(workspace, "discover", lambda: [missing, todo_txt])
+    todo_txt.unlink()
+    assert workspace.load() == []
+
+
+def test_load_reads_clock_once(tmp_path: Path) -> None:
+    """Test that load() reads the clock once (even from worker threads)."""
+    (tmp_path / "a").mkdir()
+    (tmp_path / "b").mkdir()
+    (tmp_path / "a" / "todo.txt").write_text("foo\nbar\n")
+    (tmp_path / "b" / "todo.txt").write_text("baz\n")
+
+    ticking_clock = TickingClock(dt.datetime(2022, 1, 31, 9, 30))
+    with clock.use_clock(ticking_clock):
+        todos = Workspace(tmp_path, max_workers=2).load()
+
+    assert len(todos) == 3
+    assert ticking_clock.calls == 1
+    assert {st.todo.create_date for st in todos} == {dt.date(2022, 2, 1)}
+    assert {st.todo.metadata["ctime"] for st in todos} == {"0931"}